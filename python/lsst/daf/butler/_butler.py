@@ -551,6 +551,77 @@ class Butler:
 
         return ref
 
+    @transactional
+    def putMany(self, datasets: Iterable[Tuple[Any, Union[DatasetRef, DatasetType, str], Optional[DataId]]],
+                *, producer: Optional[Quantum] = None,
+                run: Optional[str] = None) -> List[DatasetRef]:
+        """Store and register multiple datasets in a single transaction.
+
+        Parameters
+        ----------
+        datasets : iterable of `tuple`
+            Datasets to store.  Each element is an
+            ``(obj, datasetRefOrType, dataId)`` tuple with the same meaning
+            as the corresponding arguments to `put`; ``dataId`` should be
+            `None` when ``datasetRefOrType`` is a `DatasetRef`.
+        producer : `Quantum`, optional
+            The producer of all datasets.
+        run : `str`, optional
+            The name of the run the datasets should be added to, overriding
+            ``self.run``.
+
+        Returns
+        -------
+        refs : `list` [`DatasetRef`]
+            References to the stored datasets, in the same order as
+            ``datasets``.
+
+        Raises
+        ------
+        TypeError
+            Raised if the butler is read-only or if no run has been provided.
+        ValueError
+            Raised if a given `DatasetRef` already has an id.
+
+        Notes
+        -----
+        Datasets are grouped by `DatasetType` so that each group is inserted
+        into the `Registry` with a single call to `Registry.insertDatasets`.
+        Virtual composites are disassembled one at a time via `put`.
+        """
+        if not self.isWriteable():
+            raise TypeError("Butler is read-only.")
+        if run is None:
+            if self.run is None:
+                raise TypeError("No run provided.")
+            run = self.run
+
+        refs: List[Optional[DatasetRef]] = []
+        # Indices into ``refs``, data IDs and objects for each DatasetType.
+        grouped: MutableMapping[DatasetType, List[Tuple[int, DataCoordinate, Any]]] = defaultdict(list)
+        for obj, datasetRefOrType, dataId in datasets:
+            datasetType, dataId = self._standardizeArgs(datasetRefOrType, dataId)
+            if isinstance(datasetRefOrType, DatasetRef) and datasetRefOrType.id is not None:
+                raise ValueError("DatasetRef must not be in registry, must have None id")
+            if self._composites.shouldBeDisassembled(datasetType):
+                refs.append(self.put(obj, datasetType, dataId, producer=producer, run=run))
+                continue
+            dataId = self.registry.expandDataId(dataId, graph=datasetType.dimensions)
+            grouped[datasetType].append((len(refs), dataId, obj))
+            refs.append(None)
+        log.debug("Butler putMany: %d datasets of %d types, producer=%s, run=%s",
+                  len(refs), len(grouped), producer, run)
+
+        for datasetType, group in grouped.items():
+            inserted = self.registry.insertDatasets(datasetType, run=run,
+                                                    dataIds=[dataId for _, dataId, _ in group],
+                                                    producer=producer, recursive=True)
+            for (index, _, obj), ref in zip(group, inserted):
+                self.datastore.put(obj, ref)
+                refs[index] = ref
+
+        return refs
+
     def getDirect(self, ref: DatasetRef, *, parameters: Optional[Dict[str, Any]] = None):
         """Retrieve a stored dataset.
 
@@ -571,21 +642,30 @@ class Butler:
         obj : `object`
             The dataset.
         """
-        # if the ref exists in the store we return it directly
-        if self.datastore.exists(ref):
-            return self.datastore.get(ref, parameters=parameters)
+        # if the ref exists in the store we return it directly, without
+        # looking it up again
+        located = self.datastore.locate(ref)
+        if located is not None:
+            return self.datastore.getLocated(located, parameters=parameters)
         elif ref.isComposite():
             # Check that we haven't got any unknown parameters
             ref.datasetType.storageClass.validateParameters(parameters)
             # Reconstruct the composite
             usedParams = set()
-            components = {}
+            compNames = []
+            compRefs = []
+            compParams = []
             for compName, compRef in ref.components.items():
                 # make a dictionary of parameters containing only the subset
                 # supported by the StorageClass of the components
-                compParams = compRef.datasetType.storageClass.filterParameters(parameters)
-                usedParams.update(set(compParams))
-                components[compName] = self.datastore.get(compRef, parameters=compParams)
+                params = compRef.datasetType.storageClass.filterParameters(parameters)
+                usedParams.update(set(params))
+                compNames.append(compName)
+                compRefs.append(compRef)
+                compParams.append(params)
+            # Read all components at once, so the datastore can read them
+            # concurrently.
+            components = dict(zip(compNames, self.datastore.getMany(compRefs, parameters=compParams)))
 
             # Any unused parameters will have to be passed to the assembler
             if parameters:
@@ -692,6 +772,84 @@ class Butler:
         ref = self._findDatasetRef(datasetRefOrType, dataId, collection=collection, **kwds)
         return self.getDirect(ref, parameters=parameters)
 
+    def getMany(self, datasets: Iterable[Union[DatasetRef, Tuple[Union[DatasetType, str], DataId]]], *,
+                parameters: Optional[Dict[str, Any]] = None,
+                collection: Optional[str] = None) -> List[Any]:
+        """Retrieve multiple stored datasets.
+
+        Parameters
+        ----------
+        datasets : iterable of `DatasetRef` or `tuple`
+            Datasets to retrieve.  Each element is either a `DatasetRef` or a
+            ``(datasetTypeOrName, dataId)`` tuple, where ``dataId`` is a
+            `dict` or `DataCoordinate`.
+        parameters : `dict`
+            Additional StorageClass-defined options to control reading,
+            applied to every dataset.
+        collection : `str`, optional
+            Collection to search, overriding ``self.collection``.
+
+        Returns
+        -------
+        objs : `list` [`object`]
+            The datasets, in the same order as ``datasets``.
+
+        Raises
+        ------
+        ValueError
+            Raised if a resolved `DatasetRef` was passed as an input, but it
+            differs from the one found in the registry in this collection.
+        LookupError
+            Raised if no matching dataset exists in the `Registry`.
+        TypeError
+            Raised if ``collection`` and ``self.collection`` are both `None`.
+        """
+        if collection is None:
+            collection = self.collection
+            if collection is None:
+                raise TypeError("No collection provided.")
+        # Group the datasets by DatasetType, so each type can be expanded and
+        # looked up in the registry with a few bulk queries.  This mirrors
+        # what _findDatasetRef does for a single dataset.
+        grouped: MutableMapping[DatasetType, List[Tuple[int, DataId, Optional[int]]]] = defaultdict(list)
+        nDatasets = 0
+        for index, dataset in enumerate(datasets):
+            if isinstance(dataset, DatasetRef):
+                datasetType, dataId = self._standardizeArgs(dataset)
+                idNumber = dataset.id
+            else:
+                datasetType, dataId = self._standardizeArgs(*dataset)
+                idNumber = None
+            grouped[datasetType].append((index, dataId, idNumber))
+            nDatasets += 1
+        refs = [None]*nDatasets
+        for datasetType, items in grouped.items():
+            dataIds = self.registry.expandDataIds([dataId for _, dataId, _ in items],
+                                                  graph=datasetType.dimensions)
+            found = self.registry.findDatasets(datasetType, dataIds, [collection])
+            for (index, _, idNumber), dataId in zip(items, dataIds):
+                ref = found.get(dataId)
+                if ref is None:
+                    raise LookupError(f"Dataset {datasetType.name} with data ID {dataId} "
+                                      f"could not be found in collection '{collection}'.")
+                if idNumber is not None and idNumber != ref.id:
+                    raise ValueError(f"DatasetRef.id provided ({idNumber}) does not match "
+                                     f"id ({ref.id}) in registry in collection '{collection}'.")
+                refs[index] = ref
+        log.debug("Butler getMany: %d datasets, parameters=%s", len(refs), parameters)
+        # Datasets that cannot be composites must be stored directly, so the
+        # datastore can read them all at once; composites may need to be
+        # reassembled from their components, which getDirect handles.
+        results = [None]*len(refs)
+        simple = [index for index, ref in enumerate(refs) if not ref.isComposite()]
+        for index, obj in zip(simple, self.datastore.getMany([refs[i] for i in simple],
+                                                             parameters=parameters)):
+            results[index] = obj
+        for index, ref in enumerate(refs):
+            if ref.isComposite():
+                results[index] = self.getDirect(ref, parameters=parameters)
+        return results
+
     def getUri(self, datasetRefOrType: Union[DatasetRef, DatasetType, str],
                dataId: Optional[DataId] = None, *,
                predict: bool = False,
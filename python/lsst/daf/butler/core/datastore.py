@@ -25,13 +25,17 @@ Support for generic data stores.
 
 from __future__ import annotations
 
-__all__ = ("DatastoreConfig", "Datastore", "DatastoreValidationError")
+__all__ = ("DatastoreConfig", "Datastore", "DatastoreValidationError", "DatastoreVerifyReport",
+           "LocatedDataset")
 
+import concurrent.futures
 import contextlib
 import logging
+import threading
 from collections import defaultdict
-from typing import TYPE_CHECKING, Optional, Type, Callable, ClassVar, Any, Generator, Iterable
-from dataclasses import dataclass
+from typing import (TYPE_CHECKING, Optional, Type, Callable, ClassVar, Any, Dict, Generator, Iterable, List,
+                    Mapping, Set)
+from dataclasses import dataclass, field
 from abc import ABCMeta, abstractmethod
 
 from lsst.utils import doImport
@@ -85,6 +89,61 @@ class IngestPrepData:
         self.refs = {ref.id: ref for ref in refs}
 
 
+@dataclass
+class DatastoreVerifyReport:
+    """Problems found by `Datastore.verify`.
+    """
+
+    missing: Dict[str, Set[int]] = field(default_factory=dict)
+    """Artifacts that are recorded by the datastore but do not exist, keyed
+    by their path within the datastore, with the IDs of the datasets stored
+    in them.
+    """
+
+    mismatched: Dict[str, str] = field(default_factory=dict)
+    """Artifacts whose size or checksum does not match the datastore's
+    records, keyed by their path within the datastore, with a description of
+    the problem.
+    """
+
+    orphaned: List[str] = field(default_factory=list)
+    """Paths within the datastore of artifacts that are not associated with
+    any dataset.  Only searched for when verifying all datasets.
+    """
+
+    nArtifacts: int = 0
+    """Number of recorded artifacts that were checked."""
+
+    def hasProblems(self) -> bool:
+        """Return `True` if any missing, mismatched or orphaned artifacts were
+        found.
+        """
+        return bool(self.missing or self.mismatched or self.orphaned)
+
+
+@dataclass(frozen=True)
+class LocatedDataset:
+    """A dataset found by `Datastore.locate`, with everything needed to read
+    it without looking it up again.
+    """
+
+    datastore: Datastore
+    """The datastore holding the dataset; a child datastore if it was
+    located through a `ChainedDatastore`.
+    """
+
+    ref: DatasetRef
+    """Reference to the dataset."""
+
+    info: Any = None
+    """The datastore's internal record of the dataset, if any."""
+
+    stat: Any = None
+    """Result of checking the stored artifact (e.g. an `os.stat_result`, or
+    the response of an S3 HEAD request), if the datastore has one.
+    """
+
+
 class DatastoreTransaction:
     """Keeps a log of `Datastore` activity and allow rollback.
 
@@ -101,10 +160,14 @@ class DatastoreTransaction:
     def __init__(self, parent=None):
         self.parent = parent
         self._log = []
+        self._lock = threading.Lock()
 
     def registerUndo(self, name: str, undoFunc: Callable, *args: Any, **kwargs: Any) -> None:
         """Register event with undo function.
 
+        This may be called from multiple threads; events are undone in the
+        reverse of the order in which they were registered.
+
         Parameters
         ----------
         name : `str`
@@ -116,7 +179,8 @@ class DatastoreTransaction:
         kwargs : `dict`
             Keyword arguments to `undoFunc`.
         """
-        self._log.append(self.Event(name, undoFunc, args, kwargs))
+        with self._lock:
+            self._log.append(self.Event(name, undoFunc, args, kwargs))
 
     @contextlib.contextmanager
     def undoWith(self, name: str, undoFunc: Callable, *args: Any, **kwargs: Any) -> Generator:
@@ -272,6 +336,11 @@ class Datastore(metaclass=ABCMeta):
         self.name = "ABCDataStore"
         self._transaction = None
 
+        # Number of threads used to read datasets concurrently; the pool
+        # itself is only created when first needed.
+        self.threads = self.config.get("threads", 1)
+        self._executor = None
+
         # All Datastores need storage classes and constraints
         self.storageClassFactory = StorageClassFactory()
 
@@ -306,11 +375,75 @@ class Datastore(metaclass=ABCMeta):
             yield self._transaction
         except BaseException:
             self._transaction.rollback()
+            self.clearCaches()
             raise
         else:
             self._transaction.commit()
         self._transaction = self._transaction.parent
 
+    def _map(self, func: Callable, *iterables: Iterable) -> List[Any]:
+        """Apply a function to every item of the given iterables, using this
+        datastore's thread pool if it has been configured with more than one
+        thread.
+
+        Parameters
+        ----------
+        func : `Callable`
+            Function to call.  When run in the thread pool it must not use
+            the registry, since its database connection is not shared between
+            threads.
+        *iterables
+            Iterables providing the positional arguments for ``func``, as for
+            the builtin `map`.
+
+        Returns
+        -------
+        results : `list`
+            Results of calling ``func``, in the order of the inputs.
+
+        Raises
+        ------
+        Exception
+            The first exception raised by ``func`` (in input order) is
+            re-raised, but only after all calls have finished, so that any
+            undo actions they register are in place before a transaction is
+            rolled back.
+        """
+        if self.threads is None or self.threads <= 1:
+            return list(map(func, *iterables))
+        futures = [self._submit(func, *args) for args in zip(*iterables)]
+        concurrent.futures.wait(futures)
+        return [future.result() for future in futures]
+
+    def _submit(self, func: Callable, *args: Any) -> concurrent.futures.Future:
+        """Schedule a function call on this datastore's thread pool.
+
+        Parameters
+        ----------
+        func : `Callable`
+            Function to call.  It must not use the registry.
+        *args
+            Positional arguments for ``func``.
+
+        Returns
+        -------
+        future : `concurrent.futures.Future`
+            Future holding the result of the call.
+        """
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(self.threads or 1, 1),
+                                                                   thread_name_prefix=self.name)
+        return self._executor.submit(func, *args)
+
+    def clearCaches(self):
+        """Clear any in-memory caches held by this datastore.
+
+        This is called when a transaction is rolled back, since cached
+        information may then describe datasets that were never stored.  The
+        default implementation does nothing.
+        """
+        pass
+
     @abstractmethod
     def exists(self, datasetRef):
         """Check if the dataset exists in the datastore.
@@ -327,6 +460,27 @@ class Datastore(metaclass=ABCMeta):
         """
         raise NotImplementedError("Must be implemented by subclass")
 
+    def existsMany(self, datasetRefs):
+        """Check if multiple datasets exist in the datastore.
+
+        Parameters
+        ----------
+        datasetRefs : iterable of `DatasetRef`
+            References to the datasets.
+
+        Returns
+        -------
+        exists : `list` [`bool`]
+            Whether each dataset exists in the `Datastore`, in the same order
+            as ``datasetRefs``.
+
+        Notes
+        -----
+        The default implementation calls `exists` for each dataset in turn.
+        Subclasses may override it to check many datasets with few requests.
+        """
+        return [self.exists(ref) for ref in datasetRefs]
+
     @abstractmethod
     def get(self, datasetRef, parameters=None):
         """Load an `InMemoryDataset` from the store.
@@ -346,6 +500,117 @@ class Datastore(metaclass=ABCMeta):
         """
         raise NotImplementedError("Must be implemented by subclass")
 
+    def locate(self, datasetRef: DatasetRef) -> Optional[LocatedDataset]:
+        """Check if the dataset exists in the datastore and find what is
+        needed to read it.
+
+        Parameters
+        ----------
+        datasetRef : `DatasetRef`
+            Reference to the required dataset.
+
+        Returns
+        -------
+        located : `LocatedDataset` or `None`
+            Handle to pass to `getLocated`, or `None` if the dataset does not
+            exist in the datastore.
+
+        Notes
+        -----
+        Checking that a dataset exists generally requires the same lookups
+        as reading it, so ``getLocated(locate(ref))`` avoids repeating them
+        where ``exists(ref)`` followed by ``get(ref)`` would not.  The
+        default implementation calls `exists`.
+        """
+        return LocatedDataset(self, datasetRef) if self.exists(datasetRef) else None
+
+    def getLocated(self, located: LocatedDataset, parameters: Optional[Mapping[str, Any]] = None) -> Any:
+        """Load an `InMemoryDataset` found by `locate`.
+
+        Parameters
+        ----------
+        located : `LocatedDataset`
+            Handle returned by `locate`.
+        parameters : `dict`
+            `StorageClass`-specific parameters that specify a slice of the
+            Dataset to be loaded.
+
+        Returns
+        -------
+        inMemoryDataset : `object`
+            Requested Dataset or slice thereof as an InMemoryDataset.
+
+        Raises
+        ------
+        FileNotFoundError
+            The dataset was removed after it was located.
+
+        Notes
+        -----
+        The default implementation delegates to the datastore that located
+        the dataset if it is not this one, and otherwise calls `get`.
+        """
+        if located.datastore is not self:
+            return located.datastore.getLocated(located, parameters)
+        return self.get(located.ref, parameters)
+
+    def getMany(self, datasetRefs, parameters=None):
+        """Load multiple `InMemoryDataset` objects from the store.
+
+        Parameters
+        ----------
+        datasetRefs : iterable of `DatasetRef`
+            References to the required Datasets.
+        parameters : `dict` or sequence of `dict`, optional
+            `StorageClass`-specific parameters that specify a slice of each
+            Dataset to be loaded.  If a sequence, it must have one element
+            (which may be `None`) for each entry in ``datasetRefs``.
+
+        Returns
+        -------
+        inMemoryDatasets : `list`
+            Requested Datasets or slices thereof, in the same order as
+            ``datasetRefs``.
+
+        Notes
+        -----
+        The default implementation calls `get` for each dataset in turn.
+        Subclasses may override it to retrieve their internal records for
+        all datasets at once and to read the datasets themselves in parallel.
+        """
+        datasetRefs = list(datasetRefs)
+        return [self.get(ref, params) for ref, params in
+                zip(datasetRefs, self._expandParameters(parameters, len(datasetRefs)))]
+
+    @staticmethod
+    def _expandParameters(parameters: Any, n: int) -> List[Optional[Mapping[str, Any]]]:
+        """Standardize the ``parameters`` argument to `getMany` into a list
+        with one element per dataset.
+
+        Parameters
+        ----------
+        parameters : `dict` or sequence of `dict`, optional
+            Parameters shared by all datasets, or per-dataset parameters.
+        n : `int`
+            Number of datasets.
+
+        Returns
+        -------
+        parameters : `list` [`dict` or `None`]
+            Parameters for each dataset.
+
+        Raises
+        ------
+        ValueError
+            Raised if a sequence of parameters has the wrong length.
+        """
+        if parameters is None or isinstance(parameters, Mapping):
+            return [parameters]*n
+        parameters = list(parameters)
+        if len(parameters) != n:
+            raise ValueError(f"Got {len(parameters)} sets of parameters for {n} datasets.")
+        return parameters
+
     @abstractmethod
     def put(self, inMemoryDataset, datasetRef):
         """Write a `InMemoryDataset` with a given `DatasetRef` to the store.
@@ -516,6 +781,36 @@ class Datastore(metaclass=ABCMeta):
             )
         self._finishIngest(prepData, transfer=transfer)
 
+    def verify(self, refs: Optional[Iterable[DatasetRef]] = None, checksum: bool = False,
+               workers: Optional[int] = None) -> DatastoreVerifyReport:
+        """Check that the artifacts stored by this datastore are consistent
+        with its internal records.
+
+        Parameters
+        ----------
+        refs : iterable of `DatasetRef`, optional
+            Datasets to verify.  If `None` (default), every dataset known to
+            the datastore is verified, and artifacts that are not associated
+            with any dataset are reported as well.
+        checksum : `bool`, optional
+            If `True`, recompute the checksums of artifacts that have one
+            recorded, instead of only checking their existence and size.
+        workers : `int`, optional
+            Number of threads used to check artifacts concurrently.  Defaults
+            to the number configured for this datastore.
+
+        Returns
+        -------
+        report : `DatastoreVerifyReport`
+            Description of any problems found.
+
+        Raises
+        ------
+        NotImplementedError
+            Raised if the datastore does not support verification.
+        """
+        raise NotImplementedError(f"Datastore {self.name} does not support verification.")
+
     @abstractmethod
     def getUri(self, datasetRef):
         """URI to the Dataset.
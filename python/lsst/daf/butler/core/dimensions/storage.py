@@ -35,7 +35,7 @@ from typing import Optional, Dict, Iterable
 from sqlalchemy.sql import FromClause, select, and_, union_all
 from sqlalchemy.engine import Connection
 
-from ..utils import NamedKeyDict
+from ..utils import NamedKeyDict, chunkIterable
 from .schema import OVERLAP_TABLE_NAME_PATTERN
 from .elements import DimensionElement, SkyPixDimension
 from .universe import DimensionUniverse
@@ -202,6 +202,30 @@ class DimensionRecordStorage(ABC):
         """
         raise NotImplementedError()
 
+    @abstractmethod
+    def fetchMany(self, dataIds: Iterable[DataCoordinate]) -> Dict[DataCoordinate, DimensionRecord]:
+        """Retrieve multiple records from storage.
+
+        Parameters
+        ----------
+        dataIds : iterable of `DataCoordinate`
+            Data IDs that identify the records to be retrieved.  Each must
+            identify exactly the required dimensions of ``self.element``.
+
+        Returns
+        -------
+        records : `dict` [`DataCoordinate`, `DimensionRecord`]
+            Records retrieved from storage, keyed by their data IDs.  Data IDs
+            with no matching record are not included.
+
+        Notes
+        -----
+        Implementations should use a number of queries that scales with the
+        number of distinct data IDs only weakly (e.g. by batching them into
+        ``IN`` expressions), as this is used to expand many data IDs at once.
+        """
+        raise NotImplementedError()
+
 
 class DatabaseDimensionRecordStorage(DimensionRecordStorage):
     """A record storage implementation that uses a SQL database by sharing
@@ -307,6 +331,42 @@ class DatabaseDimensionRecordStorage(DimensionRecordStorage):
             return None
         return RecordClass(*row)
 
+    def fetchMany(self, dataIds: Iterable[DataCoordinate]) -> Dict[DataCoordinate, DimensionRecord]:
+        # Docstring inherited from DimensionRecordStorage.fetchMany.
+        RecordClass = self.element.RecordClass
+        required = list(self.element.graph.required)
+        nRequired = len(required)
+        if self.element.viewOf is not None:
+            whereColumns = [self._elementTable.columns[dimension.name] for dimension in required]
+        else:
+            whereColumns = [self._elementTable.columns[fieldName]
+                            for fieldName in RecordClass.__slots__[:nRequired]]
+        selectColumns = whereColumns + [self._elementTable.columns[name]
+                                        for name in RecordClass.__slots__[nRequired:]]
+        # Group the values of the last required dimension by the values of
+        # all of the others, so we can use one IN expression per group (in
+        # practice, there is usually only one group, because the leading
+        # dimension is usually instrument or skymap).
+        groups = {}
+        for dataId in dataIds:
+            values = tuple(dataId[dimension.name] for dimension in required)
+            groups.setdefault(values[:-1], set()).add(values[-1])
+        result = {}
+        for leading, lastValues in groups.items():
+            for chunk in chunkIterable(lastValues, self._FETCH_CHUNK_SIZE):
+                terms = [column == value for column, value in zip(whereColumns, leading)]
+                terms.append(whereColumns[-1].in_(chunk))
+                query = select(selectColumns).select_from(self._elementTable).where(and_(*terms))
+                for row in self._connection.execute(query):
+                    record = RecordClass(*row)
+                    result[record.dataId] = record
+        return result
+
+    _FETCH_CHUNK_SIZE = 500
+    """Maximum number of values in a single ``IN`` expression in `fetchMany`
+    (`int`).
+    """
+
 
 class CachingDimensionRecordStorage(DimensionRecordStorage):
     """A record storage implementation that adds caching to some other nested
@@ -361,6 +421,23 @@ class CachingDimensionRecordStorage(DimensionRecordStorage):
             self._cache[dataId] = record
         return record
 
+    def fetchMany(self, dataIds: Iterable[DataCoordinate]) -> Dict[DataCoordinate, DimensionRecord]:
+        # Docstring inherited from DimensionRecordStorage.fetchMany.
+        result = {}
+        missing = set()
+        for dataId in dataIds:
+            dataId = DataCoordinate.standardize(dataId, graph=self.element.graph)
+            record = self._cache.get(dataId)
+            if record is None:
+                missing.add(dataId)
+            else:
+                result[dataId] = record
+        if missing:
+            fetched = self._nested.fetchMany(missing)
+            self._cache.update(fetched)
+            result.update(fetched)
+        return result
+
 
 class SkyPixDimensionRecordStorage(DimensionRecordStorage):
     """A storage implementation specialized for `SkyPixDimension` records.
@@ -408,6 +485,11 @@ class SkyPixDimensionRecordStorage(DimensionRecordStorage):
         return self._dimension.RecordClass(dataId[self._dimension.name],
                                            self._dimension.pixelization.pixel(dataId[self._dimension.name]))
 
+    def fetchMany(self, dataIds: Iterable[DataCoordinate]) -> Dict[DataCoordinate, DimensionRecord]:
+        # Docstring inherited from DimensionRecordStorage.fetchMany.
+        records = (self.fetch(dataId) for dataId in dataIds)
+        return {record.dataId: record for record in records}
+
 
 def setupDimensionStorage(connection: Connection,
                           universe: DimensionUniverse,
@@ -526,3 +608,15 @@ class ChainedDimensionRecordStorage(DimensionRecordStorage):
                 if result is not None:
                     return result
         return None
+
+    def fetchMany(self, dataIds: Iterable[DataCoordinate]) -> Dict[DataCoordinate, DimensionRecord]:
+        # Docstring inherited from DimensionRecordStorage.fetchMany.
+        result = {}
+        missing = set(dataIds)
+        for link in self._chain:
+            if not missing:
+                break
+            fetched = link.fetchMany(dataId for dataId in missing if link.matches(dataId))
+            result.update(fetched)
+            missing.difference_update(fetched.keys())
+        return result
@@ -26,7 +26,8 @@ __all__ = ("Formatter", "FormatterFactory")
 from abc import ABCMeta, abstractmethod
 import logging
 import copy
-from typing import ClassVar, Set, FrozenSet, Union, Optional, Dict, Any, Tuple, Type, TYPE_CHECKING
+from typing import (BinaryIO, ClassVar, Set, FrozenSet, Union, Optional, Dict, Any, Tuple, Type,
+                    TYPE_CHECKING)
 
 from .configSupport import processLookupConfigs, LookupKey
 from .mappingFactory import MappingFactory
@@ -155,6 +156,31 @@ class Formatter(metaclass=ABCMeta):
         """
         raise NotImplementedError("Type does not support reading from bytes.")
 
+    def fromFile(self, fileObj: BinaryIO, component: Optional[str] = None) -> object:
+        """Read a Dataset or its component from a seekable file-like object.
+
+        Formatters that only need part of a file to honour their parameters
+        (or to read a component) should implement this, allowing datastores
+        backed by remote storage to download only the byte ranges read.
+
+        Parameters
+        ----------
+        fileObj : file-like object
+            Seekable binary file-like object to read from.  Each read may
+            be expensive, so it is best to read few, large blocks.
+        component : `str`, optional
+            Component to read from the Dataset. Only used if the `StorageClass`
+            for reading differed from the `StorageClass` used to write the
+            file.
+
+        Returns
+        -------
+        inMemoryDataset : `object`
+            The requested data as a Python object, taking into account the
+            parameters of the associated `FileDescriptor`.
+        """
+        raise NotImplementedError("Type does not support reading from a file object.")
+
     def toBytes(self, inMemoryDataset: Any) -> bytes:
         """Serialize the Dataset to bytes based on formatter.
 
@@ -177,18 +177,18 @@ class RepoExport:
         """
         dataIds = set()
         datasets: Mapping[Tuple[DatasetType, str], List[FileDataset]] = defaultdict(list)
-        for ref in refs:
-            # The query interfaces that are often used to generate the refs
-            # passed here often don't remove duplicates, so do that here for
-            # convenience.
-            if ref.id in self._dataset_ids:
-                continue
+        # The query interfaces that are often used to generate the refs
+        # passed here often don't remove duplicates, so do that here for
+        # convenience.
+        refs = {ref.id: ref for ref in refs if ref.id not in self._dataset_ids}
+        # TODO: we need to look up the datasets here because most ways of
+        # obtaining a DatasetRef (including queryDataset) don't populate
+        # the run attribute.  We should address that upstream in the
+        # future.
+        resolved = self._registry.getDatasets(refs.keys())
+        for ref in refs.values():
             dataIds.add(ref.dataId)
-            # TODO: we need to call getDataset here because most ways of
-            # obtaining a DatasetRef (including queryDataset) don't populate
-            # the run attribute.  We should address that upstream in the
-            # future.
-            ref = self._registry.getDataset(ref.id, dataId=ref.dataId, datasetType=ref.datasetType)
+            ref = resolved[ref.id]
             # `exports` is a single-element list here, because we anticipate
             # a future where more than just Datastore.export has a vectorized
             # API and we can pull this out of the loop.
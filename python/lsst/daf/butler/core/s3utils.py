@@ -20,8 +20,9 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 __all__ = ("s3CheckFileExists", "bucketExists", "setAwsEnvCredentials",
-           "unsetAwsEnvCredentials")
+           "unsetAwsEnvCredentials", "S3RangeFile")
 
+import io
 import os
 
 try:
@@ -131,6 +132,98 @@ def bucketExists(bucketName, client=None):
         return False
 
 
+class S3RangeFile(io.RawIOBase):
+    """A read-only, seekable file-like view of an S3 object that downloads
+    only the bytes that are actually read, using HTTP Range requests.
+
+    Parameters
+    ----------
+    client : `boto3.client`
+        S3 Client object used to read the object.
+    bucket : `str`
+        Name of the bucket holding the object.
+    key : `str`
+        Key of the object.
+    size : `int`, optional
+        Expected size of the object in bytes.  If not given it is obtained
+        with a HEAD request.  Every response is checked against it.
+
+    Notes
+    -----
+    Every call to ``readinto`` issues a separate request, so callers making
+    many small reads should wrap this object in an `io.BufferedReader`.
+    """
+
+    def __init__(self, client, bucket, key, size=None):
+        super().__init__()
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        if size is None:
+            exists, size = s3CheckFileExists(key, bucket=bucket, client=client)
+            if not exists:
+                raise FileNotFoundError(f"No object s3://{bucket}/{key}")
+        self.size = size
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence ({whence})")
+        if pos < 0:
+            raise ValueError(f"Negative seek position {pos}")
+        self._pos = pos
+        return pos
+
+    def _readRange(self, start, stop):
+        """Download the bytes from ``start`` up to (not including) ``stop``.
+        """
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self.key,
+                                              Range=f"bytes={start}-{stop - 1}")
+        except self.client.exceptions.ClientError as err:
+            # See s3CheckFileExists for why 403 is treated as missing.
+            if err.response["ResponseMetadata"]["HTTPStatusCode"] in (403, 404):
+                raise FileNotFoundError(f"No object s3://{self.bucket}/{self.key}") from err
+            raise
+        total = int(response["ContentRange"].rsplit("/", 1)[1])
+        if total != self.size:
+            raise RuntimeError(f"Integrity failure. Size of object s3://{self.bucket}/{self.key} "
+                               f"({total}) does not match expected size of {self.size}")
+        return response["Body"].read()
+
+    def readinto(self, b):
+        stop = min(self._pos + len(b), self.size)
+        if stop <= self._pos:
+            return 0
+        data = self._readRange(self._pos, stop)
+        b[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def readall(self):
+        # Read the remainder with a single request rather than in blocks.
+        if self._pos >= self.size:
+            return b""
+        data = self._readRange(self._pos, self.size)
+        self._pos += len(data)
+        return data
+
+
 def setAwsEnvCredentials(accessKeyId='dummyAccessKeyId', secretAccessKey="dummySecretAccessKey"):
     """Set AWS credentials environmental variables AWS_ACCESS_KEY_ID and
     AWS_SECRET_ACCESS_KEY.
@@ -38,11 +38,11 @@ class StoredDatastoreItemInfo:
     __slots__ = ()
 
 
-@dataclass
+@dataclass(init=False)
 class StoredFileInfo(StoredDatastoreItemInfo):
     """Datastore-private metadata associated with a file stored in a Datastore.
     """
-    __slots__ = {"formatter", "path", "storageClass", "checksum", "file_size"}
+    __slots__ = {"formatter", "path", "storageClass", "checksum", "file_size", "checksum_algorithm"}
 
     formatter: str
     """Fully-qualified name of Formatter."""
@@ -59,6 +59,22 @@ class StoredFileInfo(StoredDatastoreItemInfo):
     file_size: int
     """Size of the serialized dataset in bytes."""
 
+    checksum_algorithm: Optional[str]
+    """Name of the `hashlib` algorithm used to compute ``checksum``, or
+    `None` if no checksum was computed.
+    """
+
+    # The default for checksum_algorithm would conflict with its slot, so the
+    # constructor is written out rather than generated.
+    def __init__(self, formatter, path, storageClass, checksum, file_size, checksum_algorithm=None):
+        self.formatter = formatter
+        self.path = path
+        self.storageClass = storageClass
+        self.checksum = checksum
+        self.file_size = file_size
+        self.checksum_algorithm = checksum_algorithm
+        self.__post_init__()
+
     def __post_init__(self):
         # This modification prevents the data class from being frozen.
         if isinstance(self.formatter, str):
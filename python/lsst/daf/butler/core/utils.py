@@ -22,6 +22,7 @@ from __future__ import annotations
 
 __all__ = (
     "allSlots",
+    "chunkIterable",
     "getClassOf",
     "getFullTypeName",
     "getInstanceOf",
@@ -43,7 +44,7 @@ import builtins
 import sys
 import functools
 from typing import (TypeVar, MutableMapping, Iterator, KeysView, ValuesView, ItemsView, Dict, Union,
-                    MutableSet, Iterable, Mapping, Tuple)
+                    MutableSet, Iterable, Mapping, Tuple, List)
 from types import MappingProxyType
 
 from lsst.utils import doImport
@@ -82,6 +83,33 @@ def iterable(a):
         yield a
 
 
+def chunkIterable(data: Iterable, chunkSize: int) -> Iterator[List]:
+    """Return successive chunks of an iterable as lists.
+
+    Parameters
+    ----------
+    data : iterable
+        Elements to be chunked.  Will be consumed lazily.
+    chunkSize : `int`
+        Maximum number of elements in each chunk.
+
+    Yields
+    ------
+    chunk : `list`
+        The next chunk of at most ``chunkSize`` elements.  Only the last chunk
+        may be smaller than ``chunkSize``, and an empty chunk is never
+        returned.
+    """
+    chunk = []
+    for element in data:
+        chunk.append(element)
+        if len(chunk) >= chunkSize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
 def allSlots(self):
     """
     Return combined ``__slots__`` for all classes in objects mro.
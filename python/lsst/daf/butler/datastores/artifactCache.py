@@ -0,0 +1,301 @@
+# This file is part of daf_butler.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Local on-disk cache of datastore artifacts held in remote storage."""
+
+__all__ = ("LocalArtifactCache", )
+
+import contextlib
+import logging
+import os
+import posixpath
+import shutil
+import tempfile
+import threading
+import weakref
+
+from collections import Counter, OrderedDict
+from typing import Callable, Iterator, Optional
+
+from lsst.daf.butler import Location, StoredFileInfo
+from lsst.daf.butler.core.safeFileIo import safeMakeDir
+
+log = logging.getLogger(__name__)
+
+
+class LocalArtifactCache:
+    """A local directory holding copies of remote datastore artifacts, with a
+    byte-size budget and least-recently-used eviction.
+
+    Parameters
+    ----------
+    root : `str`, optional
+        Directory in which to store the cached files.  It is created if it
+        does not exist, and any files already in it are adopted by the cache.
+        If `None`, a temporary directory is used and removed when the cache
+        is garbage collected.
+    maxSize : `int`
+        Maximum total size of the cached files, in bytes.
+
+    Notes
+    -----
+    Artifacts are cached under ``<root>/<netloc>/<key>``, with the recorded
+    file size and checksum prefixed to the file name.  Artifacts without a
+    recorded checksum are only cached if the caller supplies a version
+    identifier that changes whenever the artifact is written (e.g. an S3
+    ETag), which is used instead.  A cached file is hence only ever reused
+    for the same content, and an artifact that is replaced at the same key
+    is downloaded again, even if it was replaced by another process.  The
+    original file name is kept at the end so that formatters can rely on its
+    extension.
+
+    Accounting of the cache size is per-process: several processes can share
+    a cache directory, but each only evicts the files it knows about.
+    """
+
+    def __init__(self, root: Optional[str], maxSize: int):
+        if root is None:
+            root = tempfile.mkdtemp(prefix="butler-artifact-cache-")
+            self._finalizer = weakref.finalize(self, shutil.rmtree, root, ignore_errors=True)
+        else:
+            safeMakeDir(root)
+        self.root = root
+        self.maxSize = maxSize
+        self._entries = OrderedDict()
+        self._pins = Counter()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        # Adopt files left by previous processes, oldest first.
+        existing = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.startswith("."):
+                    # Incomplete download.
+                    continue
+                path = os.path.join(dirpath, name)
+                stat = os.stat(path)
+                existing.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(existing):
+            self._entries[path] = size
+            self._size += size
+        with self._lock:
+            self._evict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """Total size of the cached files, in bytes (`int`)."""
+        return self._size
+
+    def _pathFor(self, location: Location, info: StoredFileInfo, version: Optional[str]) -> str:
+        """Return the path of the cached copy of an artifact.
+
+        Parameters
+        ----------
+        location : `Location`
+            Location of the artifact in remote storage.
+        info : `StoredFileInfo`
+            Stored information about the artifact.
+        version : `str` or `None`
+            Version identifier of the artifact, used if it has no checksum.
+
+        Returns
+        -------
+        path : `str`
+            Path of the (possibly not yet existing) cached file.
+        """
+        head, tail = posixpath.split(location.relativeToPathRoot)
+        tag = f"{info.file_size}"
+        if info.checksum is not None:
+            tag += f"-{info.checksum}"
+        else:
+            tag += f"-{version}"
+        return os.path.join(self.root, location.netloc, *head.split("/"), f"{tag}-{tail}")
+
+    def accepts(self, info: StoredFileInfo, version: Optional[str] = None) -> bool:
+        """Return whether an artifact can be cached.
+
+        Parameters
+        ----------
+        info : `StoredFileInfo`
+            Stored information about the artifact.
+        version : `str`, optional
+            Version identifier of the artifact, which must change whenever it
+            is written.  Only needed if ``info`` has no checksum.
+
+        Returns
+        -------
+        accepts : `bool`
+            `True` if the artifact has a known size within the cache budget,
+            and a checksum or version identifying its content.
+        """
+        if info.checksum is None and not version:
+            return False
+        return info.file_size is not None and 0 <= info.file_size <= self.maxSize
+
+    def contains(self, location: Location, info: StoredFileInfo, version: Optional[str] = None) -> bool:
+        """Return whether an artifact is currently in the cache.
+
+        Parameters
+        ----------
+        location : `Location`
+            Location of the artifact in remote storage.
+        info : `StoredFileInfo`
+            Stored information about the artifact.
+        version : `str`, optional
+            Version identifier of the artifact, as for `accepts`.
+
+        Returns
+        -------
+        contains : `bool`
+            `True` if a cached copy exists.  It may still be evicted before
+            it is used.
+        """
+        return self.accepts(info, version) and os.path.exists(self._pathFor(location, info, version))
+
+    @contextlib.contextmanager
+    def use(self, location: Location, info: StoredFileInfo, download: Callable[[str], None],
+            version: Optional[str] = None) -> Iterator[Optional[str]]:
+        """Provide a local copy of an artifact, downloading it on a miss.
+
+        Parameters
+        ----------
+        location : `Location`
+            Location of the artifact in remote storage.
+        info : `StoredFileInfo`
+            Stored information about the artifact.
+        download : callable
+            Called with a local file name on a cache miss; it must write the
+            artifact to that file, and should check it against ``info`` and
+            ``version``.
+        version : `str`, optional
+            Version identifier of the artifact, as for `accepts`.
+
+        Yields
+        ------
+        path : `str` or `None`
+            Path of the cached file, which is not evicted until the context
+            exits.  `None` if the artifact cannot be cached, in which case
+            ``download`` is not called.
+        """
+        if not self.accepts(info, version):
+            yield None
+            return
+
+        path = self._pathFor(location, info, version)
+        with self._lock:
+            # Check the file itself rather than our entries, since another
+            # process sharing the directory may have added or removed it.
+            try:
+                size = os.path.getsize(path)
+            except FileNotFoundError:
+                size = None
+            self._size -= self._entries.pop(path, 0)
+            if size is not None:
+                self._entries[path] = size
+                self._size += size
+                self._pins[path] += 1
+
+        if size is not None:
+            log.debug("Reading %s from cached copy %s", location.uri, path)
+            with contextlib.suppress(OSError):
+                os.utime(path)
+        else:
+            self._insert(path, download)
+
+        try:
+            yield path
+        finally:
+            with self._lock:
+                self._pins[path] -= 1
+                if not self._pins[path]:
+                    del self._pins[path]
+                self._evict()
+
+    def _insert(self, path: str, download: Callable[[str], None]):
+        """Download an artifact into the cache and pin it.
+
+        Parameters
+        ----------
+        path : `str`
+            Path of the cached file.
+        download : callable
+            Called with a temporary file name to which the artifact should be
+            written.
+        """
+        dirname, basename = os.path.split(path)
+        safeMakeDir(dirname)
+        # Download to a hidden temporary file and rename it, so that no other
+        # reader ever sees an incomplete file.
+        fd, tmpPath = tempfile.mkstemp(prefix=".", suffix=f"-{basename}", dir=dirname)
+        os.close(fd)
+        try:
+            download(tmpPath)
+            os.replace(tmpPath, path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmpPath)
+            raise
+        size = os.path.getsize(path)
+        with self._lock:
+            # Another thread may have cached the same artifact meanwhile.
+            self._size -= self._entries.pop(path, 0)
+            self._entries[path] = size
+            self._size += size
+            self._pins[path] += 1
+
+    def _evict(self):
+        """Remove least recently used, unpinned files until the cache fits
+        its budget.  Must be called with the lock held.
+        """
+        for path in list(self._entries):
+            if self._size <= self.maxSize:
+                break
+            if self._pins[path]:
+                continue
+            self._size -= self._entries.pop(path)
+            log.debug("Evicting %s from artifact cache", path)
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+    def discard(self, location: Location, info: StoredFileInfo, version: Optional[str] = None):
+        """Remove the cached copy of an artifact, if any.
+
+        Parameters
+        ----------
+        location : `Location`
+            Location of the artifact in remote storage.
+        info : `StoredFileInfo`
+            Stored information about the artifact.
+        version : `str`, optional
+            Version identifier of the artifact, as for `accepts`.
+        """
+        if not self.accepts(info, version):
+            return
+        path = self._pathFor(location, info, version)
+        with self._lock:
+            if path in self._entries and not self._pins[path]:
+                self._size -= self._entries.pop(path)
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
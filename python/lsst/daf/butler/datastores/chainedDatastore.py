@@ -23,6 +23,7 @@
 
 __all__ = ("ChainedDatastore",)
 
+import contextlib
 import time
 import logging
 import warnings
@@ -33,6 +34,9 @@ from lsst.utils import doImport
 from lsst.daf.butler import Datastore, DatastoreConfig, DatasetTypeNotSupportedError, \
     DatastoreValidationError, Constraints, FileDataset
 
+from lsst.daf.butler.core.datastore import DatastoreTransaction
+from .fileLikeDatastore import FileLikeDatastore
+
 log = logging.getLogger(__name__)
 
 
@@ -201,6 +205,10 @@ class ChainedDatastore(Datastore):
         else:
             self.datastoreConstraints = (None,) * len(self.datastores)
 
+        # Whether datasets read from a child are copied into the earlier
+        # children.
+        self.promote = self.config.get("promote", False)
+
         log.debug("Created %s (%s)", self.name, ("ephemeral" if self.isEphemeral else "permanent"))
 
     @property
@@ -211,6 +219,11 @@ class ChainedDatastore(Datastore):
         chainName = ", ".join(str(ds) for ds in self.datastores)
         return chainName
 
+    def clearCaches(self):
+        # Docstring inherited from Datastore.clearCaches.
+        for datastore in self.datastores:
+            datastore.clearCaches()
+
     def exists(self, ref):
         """Check if the dataset exists in one of the datastores.
 
@@ -230,11 +243,27 @@ class ChainedDatastore(Datastore):
                 return True
         return False
 
+    def existsMany(self, refs):
+        # Docstring inherited from Datastore.existsMany.
+        refs = list(refs)
+        result = [False]*len(refs)
+        remaining = list(range(len(refs)))
+        for datastore in self.datastores:
+            if not remaining:
+                break
+            exists = datastore.existsMany([refs[i] for i in remaining])
+            for i, e in zip(remaining, exists):
+                result[i] = e
+            remaining = [i for i, e in zip(remaining, exists) if not e]
+        return result
+
     def get(self, ref, parameters=None):
         """Load an InMemoryDataset from the store.
 
         The dataset is returned from the first datastore that has
-        the dataset.
+        the dataset.  If this datastore is configured to promote datasets,
+        a complete dataset read from a later child is also written to the
+        earlier children that accept it.
 
         Parameters
         ----------
@@ -258,16 +287,96 @@ class ChainedDatastore(Datastore):
         ValueError
             Formatter failed to process the dataset.
         """
+        located = self.locate(ref)
+        if located is None:
+            raise FileNotFoundError("Dataset {} could not be found in any of the datastores".format(ref))
+        return self.getLocated(located, parameters)
 
+    def locate(self, ref):
+        # Docstring inherited from Datastore.locate.
         for datastore in self.datastores:
-            try:
-                inMemoryObject = datastore.get(ref, parameters)
+            located = datastore.locate(ref)
+            if located is not None:
                 log.debug("Found Dataset %s in datastore %s", ref, datastore.name)
-                return inMemoryObject
-            except FileNotFoundError:
+                return located
+        return None
+
+    def getLocated(self, located, parameters=None):
+        # Docstring inherited from Datastore.getLocated.
+        inMemoryObject = located.datastore.getLocated(located, parameters)
+        ref = located.ref
+        index = next((i for i, d in enumerate(self.datastores) if d is located.datastore), 0)
+        # Only a complete dataset can be stored elsewhere.
+        if self.promote and index > 0 and parameters is None and not ref.isComponent():
+            self._promote(inMemoryObject, ref, index)
+        return inMemoryObject
+
+    def _promote(self, inMemoryDataset, ref, index):
+        """Copy a dataset into the children preceding the one it was read
+        from.
+
+        Parameters
+        ----------
+        inMemoryDataset : `object`
+            The dataset that was read.
+        ref : `DatasetRef`
+            Reference to the dataset.
+        index : `int`
+            Index of the child datastore the dataset was read from.
+
+        Notes
+        -----
+        Promotion is a best-effort optimization, so failures are only logged.
+        The copies are complete before `get` returns, so the caller cannot
+        modify the dataset while it is being written.  If this datastore is
+        configured with more than one thread, the artifacts of file-based
+        children are written concurrently.  Promotions are not part of any
+        transaction, so they are skipped while one is open.
+        """
+        if self._transaction is not None:
+            return
+
+        targets = [datastore for datastore, constraints in zip(self.datastores[:index],
+                                                               self.datastoreConstraints[:index])
+                   if constraints is None or constraints.isAcceptable(ref)]
+        if self.threads is not None and self.threads > 1:
+            concurrent = [d for d in targets if isinstance(d, FileLikeDatastore)]
+        else:
+            concurrent = []
+
+        for datastore in targets:
+            if datastore in concurrent:
+                continue
+            try:
+                datastore.put(inMemoryDataset, ref)
+            except DatasetTypeNotSupportedError:
                 pass
+            except Exception as e:
+                log.warning("Unable to promote %s to datastore %s: %s", ref, datastore.name, e)
+            else:
+                log.debug("Promoted %s to datastore %s", ref, datastore.name)
 
-        raise FileNotFoundError("Dataset {} could not be found in any of the datastores".format(ref))
+        # Each write has its own transaction, so that a failure in one child
+        # only undoes the write to that child.
+        def write(datastore):
+            transaction = DatastoreTransaction()
+            try:
+                return datastore._write_artifact(inMemoryDataset, ref, transaction), transaction, None
+            except Exception as e:
+                transaction.rollback()
+                return None, transaction, e
+
+        for datastore, (info, transaction, error) in zip(concurrent, self._map(write, concurrent)):
+            if info is not None:
+                try:
+                    datastore._register_datasets([(ref, info)])
+                except Exception as e:
+                    transaction.rollback()
+                    error = e
+            if error is None:
+                log.debug("Promoted %s to datastore %s", ref, datastore.name)
+            elif not isinstance(error, DatasetTypeNotSupportedError):
+                log.warning("Unable to promote %s to datastore %s: %s", ref, datastore.name, error)
 
     def put(self, inMemoryDataset, ref):
         """Write a InMemoryDataset with a given `DatasetRef` to each
@@ -276,7 +385,9 @@ class ChainedDatastore(Datastore):
         The put() to child datastores can fail with
         `DatasetTypeNotSupportedError`.  The put() for this datastore will be
         deemed to have succeeded so long as at least one child datastore
-        accepted the inMemoryDataset.
+        accepted the inMemoryDataset.  If this datastore is configured with
+        more than one thread, the artifacts of file-based children are
+        written concurrently.
 
         Parameters
         ----------
@@ -300,8 +411,7 @@ class ChainedDatastore(Datastore):
             raise DatasetTypeNotSupportedError(f"Dataset {ref} has been rejected by this datastore via"
                                                " configuration.")
 
-        isPermanent = False
-        nsuccess = 0
+        accepting = []
         npermanent = 0
         nephemeral = 0
         for datastore, constraints in zip(self.datastores, self.datastoreConstraints):
@@ -314,14 +424,47 @@ class ChainedDatastore(Datastore):
                 nephemeral += 1
             else:
                 npermanent += 1
+            accepting.append(datastore)
+
+        # With more than one thread, file artifacts are written to the
+        # children concurrently; they are then registered from this thread,
+        # since the registry connection cannot be shared between threads.
+        # Other children are written to serially.
+        if self.threads is not None and self.threads > 1:
+            concurrent = [d for d in accepting if isinstance(d, FileLikeDatastore)]
+        else:
+            concurrent = []
+        serial = [d for d in accepting if d not in concurrent]
+
+        succeeded = []
+        for datastore in serial:
             try:
                 datastore.put(inMemoryDataset, ref)
-                nsuccess += 1
-                if not datastore.isEphemeral:
-                    isPermanent = True
+                succeeded.append(datastore)
             except DatasetTypeNotSupportedError:
                 pass
 
+        def write(datastore):
+            try:
+                return datastore._write_artifact(inMemoryDataset, ref)
+            except DatasetTypeNotSupportedError:
+                return None
+
+        with contextlib.ExitStack() as stack:
+            # Each child registers the undo of its write on its own
+            # transaction, and rolls it back if any write or registration
+            # fails.
+            for datastore in concurrent:
+                stack.enter_context(datastore.transaction())
+            infos = self._map(write, concurrent)
+            for datastore, info in zip(concurrent, infos):
+                if info is not None:
+                    datastore._register_datasets([(ref, info)])
+                    succeeded.append(datastore)
+
+        nsuccess = len(succeeded)
+        isPermanent = any(not d.isEphemeral for d in succeeded)
+
         if nsuccess == 0:
             raise DatasetTypeNotSupportedError(f"None of the chained datastores supported ref {ref}")
 
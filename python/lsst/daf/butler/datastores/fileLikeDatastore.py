@@ -23,14 +23,19 @@
 
 __all__ = ("FileLikeDatastore", )
 
+import concurrent.futures
+import contextlib
+import hashlib
 import logging
 import itertools
+import threading
 from abc import abstractmethod
 
 from sqlalchemy import Integer, String
 
+from collections import OrderedDict, defaultdict
 from dataclasses import dataclass
-from typing import Optional, List, Type
+from typing import Any, Dict, Iterable, Iterator, Optional, List, Tuple, Type
 
 from lsst.daf.butler import (
     Config,
@@ -40,11 +45,13 @@ from lsst.daf.butler import (
     Datastore,
     DatastoreConfig,
     DatastoreValidationError,
+    DatastoreVerifyReport,
     FileDescriptor,
     FileTemplates,
     FileTemplateValidationError,
     Formatter,
     FormatterFactory,
+    LocatedDataset,
     Location,
     LocationFactory,
     StorageClass,
@@ -54,12 +61,50 @@ from lsst.daf.butler import (
 from lsst.daf.butler import ddl
 from lsst.daf.butler.registry.interfaces import ReadOnlyDatabaseError
 
+from lsst.daf.butler.core.datastore import DatastoreTransaction
 from lsst.daf.butler.core.repoRelocation import replaceRoot
-from lsst.daf.butler.core.utils import getInstanceOf, NamedValueSet, getClassOf, transactional
+from lsst.daf.butler.core.utils import (getInstanceOf, NamedValueSet, getClassOf, transactional,
+                                        chunkIterable)
 from .genericDatastore import GenericBaseDatastore
 
 log = logging.getLogger(__name__)
 
+_RECORD_FETCH_BATCH_SIZE = 500
+"""Maximum number of dataset IDs to include in a single ``IN`` constraint
+when fetching records from the opaque table.
+"""
+
+_CHECKSUM_LENGTH = 128
+"""Maximum length of the ``checksum`` column of the records table."""
+
+_DEFAULT_CHECKSUM_ALGORITHM = "blake2b"
+"""Algorithm of the checksums that are recorded without an algorithm prefix.
+"""
+
+
+def _unrecordedPaths(listed: Iterable[str], recorded: Iterable[str]) -> Iterator[str]:
+    """Find the paths in one sorted sequence that are not in another.
+
+    Parameters
+    ----------
+    listed : iterable of `str`
+        Sorted paths to check.
+    recorded : iterable of `str`
+        Sorted paths to check against, possibly with duplicates.
+
+    Yields
+    ------
+    path : `str`
+        Paths in ``listed`` that are not in ``recorded``.
+    """
+    recorded = iter(recorded)
+    current = next(recorded, None)
+    for path in listed:
+        while current is not None and current < path:
+            current = next(recorded, None)
+        if current != path:
+            yield path
+
 
 class _IngestPrepData(Datastore.IngestPrepData):
     """Helper class for FileLikeDatastore ingest implementation.
@@ -98,6 +143,10 @@ class DatastoreFileGetInformation:
     readStorageClass: StorageClass
     """The `StorageClass` of the dataset being read."""
 
+    stat: Any = None
+    """Result of `FileLikeDatastore._stat_artifact` if the artifact has
+    already been checked, or `None`."""
+
 
 class FileLikeDatastore(GenericBaseDatastore):
     """Generic Datastore for file-based implementations.
@@ -133,6 +182,9 @@ class FileLikeDatastore(GenericBaseDatastore):
     templates: FileTemplates
     """File templates that can be used by this `Datastore`."""
 
+    checksumAlgorithm: str
+    """Name of the `hashlib` algorithm used for new checksums."""
+
     @classmethod
     def setConfigRoot(cls, root, config, full, overwrite=True):
         """Set any filesystem-dependent config options for this Datastore to
@@ -177,7 +229,7 @@ class FileLikeDatastore(GenericBaseDatastore):
                 ddl.FieldSpec(name="formatter", dtype=String, length=128, nullable=False),
                 ddl.FieldSpec(name="storage_class", dtype=String, length=64, nullable=False),
                 # TODO: should checksum be Base64Bytes instead?
-                ddl.FieldSpec(name="checksum", dtype=String, length=128, nullable=True),
+                ddl.FieldSpec(name="checksum", dtype=String, length=_CHECKSUM_LENGTH, nullable=True),
                 ddl.FieldSpec(name="file_size", dtype=Integer, nullable=True),
             ]),
             unique=frozenset(),
@@ -228,8 +280,24 @@ class FileLikeDatastore(GenericBaseDatastore):
             # configuration.
             pass
 
-        # Determine whether checksums should be used
+        # Determine whether checksums should be used, and how they are
+        # computed.  The algorithm is recorded with each checksum, so it can
+        # be changed without invalidating existing records.
         self.useChecksum = self.config.get("checksum", True)
+        self.checksumAlgorithm = self.config.get("checksumAlgorithm", _DEFAULT_CHECKSUM_ALGORITHM)
+        if self.checksumAlgorithm not in hashlib.algorithms_guaranteed or \
+                hashlib.new(self.checksumAlgorithm).digest_size == 0:
+            raise ValueError(f"Checksum algorithm '{self.checksumAlgorithm}' is not a fixed-length "
+                             "algorithm supported by hashlib.")
+        if len(self._encodeChecksum("0"*2*hashlib.new(self.checksumAlgorithm).digest_size,
+                                    self.checksumAlgorithm)) > _CHECKSUM_LENGTH:
+            raise ValueError(f"Checksums computed with '{self.checksumAlgorithm}' are too long to be "
+                             "recorded.")
+
+        # Bounded LRU cache of StoredFileInfo, keyed by dataset_id.
+        self._recordCacheSize = self.config.get(("records", "cacheSize"), 0)
+        self._recordCache = OrderedDict()
+        self._recordCacheLock = threading.Lock()
 
     def __str__(self):
         return self.root
@@ -241,24 +309,174 @@ class FileLikeDatastore(GenericBaseDatastore):
             records.append(
                 dict(dataset_id=ref.id, formatter=info.formatter, path=info.path,
                      storage_class=info.storageClass.name,
-                     checksum=info.checksum, file_size=info.file_size)
+                     checksum=self._encodeChecksum(info.checksum, info.checksum_algorithm),
+                     file_size=info.file_size)
             )
         self.registry.insertOpaqueData(self._tableName, *records)
+        self._cacheStoredItemInfos((ref.id, info) for ref, info in zip(refs, infos))
 
     def getStoredItemInfo(self, ref):
         # Docstring inherited from GenericBaseDatastore
+        info = self._getCachedStoredItemInfo(ref.id)
+        if info is not None:
+            return info
         records = list(self.registry.fetchOpaqueData(self._tableName, dataset_id=ref.id))
         if len(records) == 0:
             raise KeyError(f"Unable to retrieve location associated with Dataset {ref}.")
         assert len(records) == 1, "Primary key constraint should make more than one result impossible."
-        record = records[0]
+        info = self._infoFromRecord(records[0])
+        self._cacheStoredItemInfos([(ref.id, info)])
+        return info
+
+    def getStoredItemInfos(self, refs: Iterable[DatasetRef]) -> Dict[int, StoredFileInfo]:
+        # Docstring inherited from GenericBaseDatastore
+        infos = {}
+        missing = set()
+        for ref in refs:
+            info = self._getCachedStoredItemInfo(ref.id)
+            if info is not None:
+                infos[ref.id] = info
+            else:
+                missing.add(ref.id)
+        fetched = {record["dataset_id"]: self._infoFromRecord(record)
+                   for record in self._fetchRecords(missing)}
+        self._cacheStoredItemInfos(fetched.items())
+        infos.update(fetched)
+        return infos
+
+    def _fetchRecords(self, datasetIds: Iterable[int]) -> Iterator[dict]:
+        """Fetch the records for many datasets from the opaque table, using
+        a few queries with ``IN`` constraints.
+
+        Parameters
+        ----------
+        datasetIds : iterable of `int`
+            IDs of the datasets whose records should be returned.
+
+        Yields
+        ------
+        record : `dict`
+            A row of this datastore's records table.  Datasets without
+            records are silently skipped.
+        """
+        for chunk in chunkIterable(datasetIds, _RECORD_FETCH_BATCH_SIZE):
+            yield from self.registry.fetchOpaqueData(self._tableName, dataset_id=list(chunk))
+
+    def _getCachedStoredItemInfo(self, datasetId: int) -> Optional[StoredFileInfo]:
+        """Return the cached stored information for a dataset, if any.
+
+        Parameters
+        ----------
+        datasetId : `int`
+            ID of the dataset.
+
+        Returns
+        -------
+        info : `StoredFileInfo` or `None`
+            Cached information, or `None` if the dataset is not in the cache
+            (or caching is disabled).
+        """
+        if not self._recordCacheSize:
+            return None
+        with self._recordCacheLock:
+            info = self._recordCache.get(datasetId)
+            if info is not None:
+                self._recordCache.move_to_end(datasetId)
+            return info
+
+    def _cacheStoredItemInfos(self, items: Iterable[Tuple[int, StoredFileInfo]]):
+        """Add stored information to the record cache, evicting the least
+        recently used entries if it grows beyond its configured size.
+
+        Parameters
+        ----------
+        items : iterable of `tuple` [`int`, `StoredFileInfo`]
+            Dataset IDs and the stored information associated with them.
+        """
+        if not self._recordCacheSize:
+            return
+        with self._recordCacheLock:
+            for datasetId, info in items:
+                self._recordCache[datasetId] = info
+                self._recordCache.move_to_end(datasetId)
+            while len(self._recordCache) > self._recordCacheSize:
+                self._recordCache.popitem(last=False)
+
+    def clearCaches(self):
+        # Docstring inherited from Datastore.clearCaches.
+        with self._recordCacheLock:
+            self._recordCache.clear()
+
+    def _infoFromRecord(self, record: dict) -> StoredFileInfo:
+        """Convert a record from the opaque table to a `StoredFileInfo`.
+
+        Parameters
+        ----------
+        record : `dict`
+            A single row of this datastore's records table.
+
+        Returns
+        -------
+        info : `StoredFileInfo`
+            Stored information about the file and its formatter.
+        """
         # Convert name of StorageClass to instance
         storageClass = self.storageClassFactory.getStorageClass(record["storage_class"])
+        checksum, algorithm = self._decodeChecksum(record["checksum"])
         return StoredFileInfo(formatter=record["formatter"],
                               path=record["path"],
                               storageClass=storageClass,
-                              checksum=record["checksum"],
-                              file_size=record["file_size"])
+                              checksum=checksum,
+                              file_size=record["file_size"],
+                              checksum_algorithm=algorithm)
+
+    @staticmethod
+    def _encodeChecksum(checksum: Optional[str], algorithm: Optional[str]) -> Optional[str]:
+        """Combine a checksum and its algorithm into a ``checksum`` column
+        value.
+
+        Parameters
+        ----------
+        checksum : `str` or `None`
+            Hexadecimal digest, or `None` if there is no checksum.
+        algorithm : `str` or `None`
+            Name of the `hashlib` algorithm that computed ``checksum``.
+
+        Returns
+        -------
+        value : `str` or `None`
+            ``<algorithm>:<checksum>``, or just the digest for the default
+            algorithm (which is how checksums were originally recorded, and
+            leaves room for the 128 characters of a ``blake2b`` digest).
+        """
+        if checksum is None:
+            return None
+        if algorithm is None or algorithm == _DEFAULT_CHECKSUM_ALGORITHM:
+            return checksum
+        return f"{algorithm}:{checksum}"
+
+    @staticmethod
+    def _decodeChecksum(value: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+        """Split a ``checksum`` column value into a checksum and its
+        algorithm.
+
+        Parameters
+        ----------
+        value : `str` or `None`
+            Value written by `_encodeChecksum`.
+
+        Returns
+        -------
+        checksum : `str` or `None`
+            Hexadecimal digest, or `None` if there is no checksum.
+        algorithm : `str` or `None`
+            Name of the `hashlib` algorithm that computed ``checksum``, or
+            `None` if there is no checksum.
+        """
+        if value is None:
+            return None, None
+        algorithm, _, checksum = value.rpartition(":")
+        return checksum, algorithm or _DEFAULT_CHECKSUM_ALGORITHM
 
     def _registered_refs_per_artifact(self, pathInStore):
         """Return all dataset refs associated with the supplied path.
@@ -280,6 +498,8 @@ class FileLikeDatastore(GenericBaseDatastore):
     def removeStoredItemInfo(self, ref):
         # Docstring inherited from GenericBaseDatastore
         self.registry.deleteOpaqueData(self._tableName, dataset_id=ref.id)
+        with self._recordCacheLock:
+            self._recordCache.pop(ref.id, None)
 
     def _get_dataset_location_info(self, ref):
         """Find the `Location` of the requested dataset in the
@@ -341,7 +561,7 @@ class FileLikeDatastore(GenericBaseDatastore):
             return False
         return True
 
-    def _prepare_for_get(self, ref, parameters=None):
+    def _prepare_for_get(self, ref, parameters=None, storedFileInfo=None, stat=None):
         """Check parameters for ``get`` and obtain formatter and
         location.
 
@@ -352,6 +572,11 @@ class FileLikeDatastore(GenericBaseDatastore):
         parameters : `dict`
             `StorageClass`-specific parameters that specify, for example,
             a slice of the Dataset to be loaded.
+        storedFileInfo : `StoredFileInfo`, optional
+            Stored information about the file, if already retrieved (e.g.
+            by `getStoredItemInfos`).  If `None` it is looked up.
+        stat : `object`, optional
+            Result of `_stat_artifact`, if already called.
 
         Returns
         -------
@@ -361,9 +586,12 @@ class FileLikeDatastore(GenericBaseDatastore):
         log.debug("Retrieve %s from %s with parameters %s", ref, self.name, parameters)
 
         # Get file metadata and internal metadata
-        location, storedFileInfo = self._get_dataset_location_info(ref)
-        if location is None:
-            raise FileNotFoundError(f"Could not retrieve Dataset {ref}.")
+        if storedFileInfo is None:
+            location, storedFileInfo = self._get_dataset_location_info(ref)
+            if location is None:
+                raise FileNotFoundError(f"Could not retrieve Dataset {ref}.")
+        else:
+            location = self.locationFactory.fromPath(storedFileInfo.path)
 
         # We have a write storage class and a read storage class and they
         # can be different for concrete composites.
@@ -383,7 +611,98 @@ class FileLikeDatastore(GenericBaseDatastore):
         formatterParams, assemblerParams = formatter.segregateParameters()
 
         return DatastoreFileGetInformation(location, formatter, storedFileInfo,
-                                           assemblerParams, component, readStorageClass)
+                                           assemblerParams, component, readStorageClass, stat)
+
+    @abstractmethod
+    def _read_artifact_into_memory(self, getInfo, ref):
+        """Read the artifact from datastore into in memory object.
+
+        Parameters
+        ----------
+        getInfo : `DatastoreFileGetInformation`
+            Information about the artifact within the datastore, as returned
+            by `_prepare_for_get`.
+        ref : `DatasetRef`
+            The registry information associated with this artifact.
+
+        Returns
+        -------
+        inMemoryDataset : `object`
+            The artifact as a python object.
+
+        Raises
+        ------
+        FileNotFoundError
+            Requested dataset can not be retrieved.
+        ValueError
+            Formatter failed to process the dataset.
+        """
+        raise NotImplementedError()
+
+    def get(self, ref, parameters=None):
+        """Load an InMemoryDataset from the store.
+
+        Parameters
+        ----------
+        ref : `DatasetRef`
+            Reference to the required Dataset.
+        parameters : `dict`
+            `StorageClass`-specific parameters that specify, for example,
+            a slice of the Dataset to be loaded.
+
+        Returns
+        -------
+        inMemoryDataset : `object`
+            Requested Dataset or slice thereof as an InMemoryDataset.
+
+        Raises
+        ------
+        FileNotFoundError
+            Requested dataset can not be retrieved.
+        TypeError
+            Return value from formatter has unexpected type.
+        ValueError
+            Formatter failed to process the dataset.
+        """
+        getInfo = self._prepare_for_get(ref, parameters)
+        return self._read_artifact_into_memory(getInfo, ref)
+
+    def locate(self, ref):
+        # Docstring inherited from Datastore.locate.
+        location, storedFileInfo = self._get_dataset_location_info(ref)
+        if location is None:
+            return None
+        try:
+            stat = self._stat_artifact(location)
+        except NotImplementedError:
+            # Subclasses that do not implement _stat_artifact still locate
+            # datasets with exists.
+            return super().locate(ref)
+        if stat is None:
+            return None
+        return LocatedDataset(self, ref, storedFileInfo, stat)
+
+    def getLocated(self, located, parameters=None):
+        # Docstring inherited from Datastore.getLocated.
+        if located.datastore is not self:
+            return super().getLocated(located, parameters)
+        getInfo = self._prepare_for_get(located.ref, parameters, storedFileInfo=located.info,
+                                        stat=located.stat)
+        return self._read_artifact_into_memory(getInfo, located.ref)
+
+    def getMany(self, refs, parameters=None):
+        # Docstring inherited from Datastore.getMany.
+        # Everything that needs the registry happens here, so only the reads
+        # themselves are handed to the thread pool.
+        refs = list(refs)
+        infos = self.getStoredItemInfos(refs)
+        getInfos = []
+        for ref, params in zip(refs, self._expandParameters(parameters, len(refs))):
+            storedFileInfo = infos.get(ref.id)
+            if storedFileInfo is None:
+                raise FileNotFoundError(f"Could not retrieve Dataset {ref}.")
+            getInfos.append(self._prepare_for_get(ref, params, storedFileInfo=storedFileInfo))
+        return self._map(self._read_artifact_into_memory, getInfos, refs)
 
     def _prepare_for_put(self, inMemoryDataset, ref):
         """Check the arguments for ``put`` and obtain formatter and
@@ -432,6 +751,72 @@ class FileLikeDatastore(GenericBaseDatastore):
 
         return location, formatter
 
+    @abstractmethod
+    def _write_artifact(self, inMemoryDataset, ref,
+                        transaction: Optional[DatastoreTransaction] = None) -> StoredFileInfo:
+        """Write the artifact for a dataset without registering it.
+
+        Parameters
+        ----------
+        inMemoryDataset : `object`
+            The Dataset to store.
+        ref : `DatasetRef`
+            Reference to the associated Dataset.
+        transaction : `DatastoreTransaction`, optional
+            Transaction on which to register the undo of the write.  Defaults
+            to the current transaction of this datastore.
+
+        Returns
+        -------
+        info : `StoredFileInfo`
+            Information describing the written artifact, to be passed to
+            `_register_datasets`.
+
+        Raises
+        ------
+        TypeError
+            Supplied object and storage class are inconsistent.
+        DatasetTypeNotSupportedError
+            The associated `DatasetType` is not handled by this datastore.
+
+        Notes
+        -----
+        Unless ``transaction`` is given, must be called within a transaction
+        of this datastore.  This method does not use the registry,
+        so it may be called from a thread other than the one that owns the
+        registry connection.
+        """
+        raise NotImplementedError()
+
+    @transactional
+    def put(self, inMemoryDataset, ref):
+        """Write a InMemoryDataset with a given `DatasetRef` to the store.
+
+        Parameters
+        ----------
+        inMemoryDataset : `object`
+            The Dataset to store.
+        ref : `DatasetRef`
+            Reference to the associated Dataset.
+
+        Raises
+        ------
+        TypeError
+            Supplied object and storage class are inconsistent.
+        DatasetTypeNotSupportedError
+            The associated `DatasetType` is not handled by this datastore.
+
+        Notes
+        -----
+        If the datastore is configured to reject certain dataset types it
+        is possible that the put will fail and raise a
+        `DatasetTypeNotSupportedError`.  The main use case for this is to
+        allow `ChainedDatastore` to put to multiple datastores without
+        requiring that every datastore accepts the dataset.
+        """
+        info = self._write_artifact(inMemoryDataset, ref)
+        self._register_datasets([(ref, info)])
+
     @abstractmethod
     def _standardizeIngestPath(self, path: str, *, transfer: Optional[str] = None) -> str:
         """Standardize the path of a to-be-ingested file.
@@ -499,6 +884,11 @@ class FileLikeDatastore(GenericBaseDatastore):
             the caller; the `_extractIngestInfo` is only resposible for
             creating and populating the struct.
 
+        Notes
+        -----
+        This method may be called concurrently from the datastore's thread
+        pool, and hence must not use the registry.
+
         Raises
         ------
         FileNotFoundError
@@ -529,14 +919,184 @@ class FileLikeDatastore(GenericBaseDatastore):
     @transactional
     def _finishIngest(self, prepData: Datastore.IngestPrepData, *, transfer: Optional[str] = None):
         # Docstring inherited from Datastore._finishIngest.
-        refsAndInfos = []
-        for dataset in prepData.datasets:
+        def extract(dataset):
             # Do ingest as if the first dataset ref is associated with the file
-            info = self._extractIngestInfo(dataset.path, dataset.refs[0], formatter=dataset.formatter,
+            return self._extractIngestInfo(dataset.path, dataset.refs[0], formatter=dataset.formatter,
                                            transfer=transfer)
+
+        # Transfers and checksums are run in the thread pool (if configured);
+        # the records for all files are then inserted together.
+        infos = self._map(extract, prepData.datasets)
+        refsAndInfos = []
+        for dataset, info in zip(prepData.datasets, infos):
             refsAndInfos.extend([(ref, info) for ref in dataset.refs])
         self._register_datasets(refsAndInfos)
 
+    def existsMany(self, refs):
+        # Docstring inherited from Datastore.existsMany.
+        refs = list(refs)
+        infos = self.getStoredItemInfos(refs)
+        indices = []
+        items = []
+        for i, ref in enumerate(refs):
+            info = infos.get(ref.id)
+            if info is not None:
+                indices.append(i)
+                items.append((self.locationFactory.fromPath(info.path), info))
+        result = [False]*len(refs)
+        for i, exists in zip(indices, self._artifacts_exist(items)):
+            result[i] = exists
+        return result
+
+    def _stat_artifact(self, location: Location) -> Optional[Any]:
+        """Check that an artifact exists.
+
+        Parameters
+        ----------
+        location : `Location`
+            Location of the artifact.
+
+        Returns
+        -------
+        stat : `object` or `None`
+            Whatever the datastore learns about the artifact by checking it
+            (e.g. an `os.stat_result`), passed on to
+            `_read_artifact_into_memory` so that it need not be checked
+            again; `None` if the artifact does not exist.
+
+        Notes
+        -----
+        Subclasses need not implement this; if they do not, `locate` falls
+        back to calling `exists`.
+        """
+        raise NotImplementedError("Must be implemented by subclasses.")
+
+    def _artifacts_exist(self, items: List[Tuple[Location, StoredFileInfo]]) -> List[bool]:
+        """Check whether many artifacts exist.
+
+        Parameters
+        ----------
+        items : `list` [`tuple` [`Location`, `StoredFileInfo`]]
+            Locations of the artifacts and their stored information.
+
+        Returns
+        -------
+        exists : `list` [`bool`]
+            Whether each artifact exists, in the same order as ``items``.
+
+        Notes
+        -----
+        Multiple datasets may share an artifact, in which case it may appear
+        more than once in ``items``.  Like `_verify_artifact`, this must not
+        use the registry.
+        """
+        raise NotImplementedError("Must be implemented by subclasses.")
+
+    def _verify_artifact(self, location: Location, info: StoredFileInfo, checksum: bool) -> Optional[str]:
+        """Check that a stored artifact matches its record.
+
+        Parameters
+        ----------
+        location : `Location`
+            Location of the artifact.
+        info : `StoredFileInfo`
+            Stored information about the artifact.
+        checksum : `bool`
+            If `True`, recompute and compare the checksum (if one was
+            recorded).
+
+        Returns
+        -------
+        problem : `str` or `None`
+            Description of how the artifact differs from its record, or
+            `None` if it matches.
+
+        Raises
+        ------
+        FileNotFoundError
+            Raised if the artifact does not exist.
+        NotImplementedError
+            Raised if the datastore does not support verification.
+
+        Notes
+        -----
+        This method is called concurrently from multiple threads, and hence
+        must not use the registry.
+        """
+        raise NotImplementedError("Must be implemented by subclasses.")
+
+    def _list_artifacts(self) -> Iterator[str]:
+        """Iterate over all artifacts within the datastore root.
+
+        Files directly within the root are not included, since the root is
+        often shared with the butler configuration and registry database,
+        while file templates always place datasets in subdirectories.
+
+        Yields
+        ------
+        path : `str`
+            Path of an artifact, relative to the datastore root, in the same
+            form as the ``path`` column of the records table.  Paths are
+            yielded in sorted order, so that they can be compared with the
+            records without holding either in memory.
+
+        Raises
+        ------
+        NotImplementedError
+            Raised if the datastore does not support verification.
+        """
+        raise NotImplementedError("Must be implemented by subclasses.")
+
+    def verify(self, refs=None, checksum=False, workers=None):
+        # Docstring inherited from Datastore.verify.
+        if workers is None:
+            workers = self.threads
+        report = DatastoreVerifyReport()
+        if refs is None:
+            records = self.registry.fetchOpaqueData(self._tableName)
+        else:
+            records = self._fetchRecords({ref.id for ref in refs})
+
+        def check(path, info):
+            try:
+                return self._verify_artifact(self.locationFactory.fromPath(path), info, checksum)
+            except FileNotFoundError:
+                return FileNotFoundError
+
+        # Records are processed in batches, so that memory use does not
+        # depend on the size of the repository.
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers) if workers and workers > 1 \
+            else contextlib.nullcontext()
+        with pool as executor:
+            mapper = executor.map if executor is not None else map
+            for batch in chunkIterable(records, _RECORD_FETCH_BATCH_SIZE):
+                infos = {}
+                datasetIds = defaultdict(set)
+                for record in batch:
+                    infos.setdefault(record["path"], self._infoFromRecord(record))
+                    datasetIds[record["path"]].add(record["dataset_id"])
+                report.nArtifacts += len(infos)
+                for path, problem in zip(infos.keys(), mapper(check, infos.keys(), infos.values())):
+                    if problem is FileNotFoundError:
+                        report.missing.setdefault(path, set()).update(datasetIds[path])
+                    elif problem is not None:
+                        report.mismatched[path] = problem
+
+        if refs is None:
+            # The sorted listing is merged with all the recorded paths, read
+            # in a single query sorted the same way.  The database may
+            # collate paths differently from Python, in which case the merge
+            # reports recorded paths as orphans, so candidates are checked
+            # again; normally there are few.
+            recorded = (record["path"] for record in self.registry.fetchOpaqueData(self._tableName,
+                                                                                 orderBy="path"))
+            candidates = _unrecordedPaths(self._list_artifacts(), recorded)
+            for batch in chunkIterable(candidates, _RECORD_FETCH_BATCH_SIZE):
+                known = {record["path"] for record in self.registry.fetchOpaqueData(self._tableName,
+                                                                                    path=batch)}
+                report.orphaned.extend(path for path in batch if path not in known)
+        return report
+
     def getUri(self, ref, predict=False):
         """URI to the Dataset.
 
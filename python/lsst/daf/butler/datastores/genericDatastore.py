@@ -73,6 +73,35 @@ class GenericBaseDatastore(Datastore):
         """
         raise NotImplementedError()
 
+    def getStoredItemInfos(self, refs):
+        """Retrieve information associated with the files stored in this
+        `Datastore` for many datasets at once.
+
+        Parameters
+        ----------
+        refs : iterable of `DatasetRef`
+            The Datasets that are to be queried.
+
+        Returns
+        -------
+        infos : `dict` [`int`, `StoredDatastoreItemInfo`]
+            Stored information keyed by dataset ID.  Datasets not known to
+            this datastore are omitted.
+
+        Notes
+        -----
+        The default implementation calls `getStoredItemInfo` for each
+        dataset; subclasses backed by a database table should override it to
+        retrieve all records in bulk.
+        """
+        infos = {}
+        for ref in refs:
+            try:
+                infos[ref.id] = self.getStoredItemInfo(ref)
+            except KeyError:
+                pass
+        return infos
+
     @abstractmethod
     def removeStoredItemInfo(self, ref):
         """Remove information about the file associated with this dataset.
@@ -26,10 +26,12 @@ __all__ = ("StoredMemoryItemInfo", "InMemoryDatastore")
 import time
 import logging
 import itertools
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Dict, Optional, Any
 
 from lsst.daf.butler import StoredDatastoreItemInfo, StorageClass
+from lsst.daf.butler.core.utils import getClassOf, getObjectSize
 from .genericDatastore import GenericBaseDatastore
 
 log = logging.getLogger(__name__)
@@ -74,6 +76,16 @@ class InMemoryDatastore(GenericBaseDatastore):
     Notes
     -----
     InMemoryDatastore does not support any file-based ingest.
+
+    The memory used can be bounded with the ``maxSize`` configuration entry
+    (in bytes).  Sizes are estimated with
+    `~lsst.daf.butler.core.utils.getObjectSize` unless a function is
+    configured for the dataset's `StorageClass` in the ``sizeEstimators``
+    section.  When the budget is exceeded the least recently used datasets
+    are evicted, except for the one just stored.  Datasets stored more than
+    ``expiry`` seconds ago are also evicted.  Evicted datasets are removed
+    from the registry's record of this datastore, so a `ChainedDatastore`
+    will then read them from its other datastores.
     """
 
     defaultConfigFile = "datastores/inMemoryDatastore.yaml"
@@ -109,6 +121,17 @@ class InMemoryDatastore(GenericBaseDatastore):
         # Related records that share the same parent
         self.related = {}
 
+        # Estimated sizes of the stored datasets, keyed by dataset ID and
+        # ordered from least to most recently used.
+        self.maxSize = self.config.get("maxSize", 0)
+        self.expiry = self.config.get("expiry", 0)
+        self._sizes = OrderedDict()
+        self._totalSize = 0
+        # Times at which the stored datasets were put, in that order.
+        self._timestamps = {}
+        self._sizeEstimators = {name: getClassOf(func)
+                                for name, func in self.config.get("sizeEstimators", {}).items()}
+
     @classmethod
     def setConfigRoot(cls, root, config, full, overwrite=True):
         """Set any filesystem-dependent config options for this Datastore to
@@ -165,6 +188,104 @@ class InMemoryDatastore(GenericBaseDatastore):
         del self.records[ref.id]
         self.related[record.parentID].remove(ref.id)
 
+    @property
+    def totalSize(self):
+        """Estimated total size in bytes of the stored datasets (`int`).
+
+        Only tracked if ``maxSize`` is configured.
+        """
+        return self._totalSize
+
+    def _estimateSize(self, inMemoryDataset, storageClass):
+        """Estimate the memory used by a dataset.
+
+        Parameters
+        ----------
+        inMemoryDataset : `object`
+            The dataset.
+        storageClass : `StorageClass`
+            Storage class of the dataset, used to look up a configured size
+            estimator.
+
+        Returns
+        -------
+        size : `int`
+            Estimated size in bytes.
+        """
+        estimator = self._sizeEstimators.get(storageClass.name, getObjectSize)
+        return estimator(inMemoryDataset)
+
+    def _touch(self, datasetId):
+        """Mark a stored dataset as the most recently used.
+
+        Parameters
+        ----------
+        datasetId : `int`
+            ID of the stored (parent) dataset.
+        """
+        if datasetId in self._sizes:
+            self._sizes.move_to_end(datasetId)
+
+    def _discard(self, datasetId):
+        """Drop a stored dataset and forget its size.
+
+        Parameters
+        ----------
+        datasetId : `int`
+            ID of the stored (parent) dataset.
+        """
+        del self.datasets[datasetId]
+        del self._timestamps[datasetId]
+        self._totalSize -= self._sizes.pop(datasetId, 0)
+
+    def _evict(self, datasetId):
+        """Drop a stored dataset to free memory.
+
+        Parameters
+        ----------
+        datasetId : `int`
+            ID of the stored (parent) dataset.
+
+        Notes
+        -----
+        Eviction happens on read paths and inside whatever transaction is
+        open, so it only changes in-memory state: the dataset's records and
+        registry locations are kept until it is removed (or stored again),
+        while `exists` reports it missing.
+        """
+        log.debug("Evicting dataset %d from %s", datasetId, self.name)
+        self._discard(datasetId)
+
+    def _expire(self):
+        """Evict the datasets that were stored more than ``expiry`` seconds
+        ago.
+        """
+        if not self.expiry:
+            return
+        cutoff = time.time() - self.expiry
+        for datasetId, timestamp in list(self._timestamps.items()):
+            if timestamp >= cutoff:
+                break
+            self._evict(datasetId)
+
+    def _enforceBudget(self, keep):
+        """Evict the least recently used datasets until the stored datasets
+        fit within ``maxSize``.
+
+        Parameters
+        ----------
+        keep : `int`
+            ID of a dataset that must not be evicted, even if it alone
+            exceeds the budget.
+        """
+        if not self.maxSize:
+            return
+        for datasetId in list(self._sizes):
+            if self._totalSize <= self.maxSize:
+                break
+            if datasetId != keep:
+                self._evict(datasetId)
+
     def exists(self, ref):
         """Check if the dataset exists in the datastore.
 
@@ -178,6 +299,8 @@ class InMemoryDatastore(GenericBaseDatastore):
         exists : `bool`
             `True` if the entity exists in the `Datastore`.
         """
+        self._expire()
+
         # Get the stored information (this will fail if no dataset)
         try:
             storedItemInfo = self.getStoredItemInfo(ref)
@@ -237,6 +360,7 @@ class InMemoryDatastore(GenericBaseDatastore):
         if storedItemInfo.parentID is not None:
             thisID = storedItemInfo.parentID
         inMemoryDataset = self.datasets[thisID]
+        self._touch(thisID)
 
         # Different storage classes implies a component request
         if readStorageClass != writeStorageClass:
@@ -282,23 +406,40 @@ class InMemoryDatastore(GenericBaseDatastore):
         """
 
         self._validate_put_parameters(inMemoryDataset, ref)
+        self._expire()
+
+        # A dataset that was evicted is still registered, so only the object
+        # itself needs to be stored again.
+        evicted = ref.id in self.records and ref.id not in self.datasets
 
         self.datasets[ref.id] = inMemoryDataset
         log.debug("Store %s in %s", ref, self.name)
+        if self.maxSize:
+            size = self._estimateSize(inMemoryDataset, ref.datasetType.storageClass)
+            self._sizes[ref.id] = size
+            self._totalSize += size
 
         # Store time we received this content, to allow us to optionally
         # expire it. Instead of storing a filename here, we include the
         # ID of this datasetRef so we can find it from components.
         itemInfo = StoredMemoryItemInfo(time.time(), ref.datasetType.storageClass,
                                         parentID=ref.id)
+        self._timestamps[ref.id] = itemInfo.timestamp
+
+        if evicted:
+            if self._transaction is not None:
+                self._transaction.registerUndo("put", self._discard, ref.id)
+        else:
+            # We have to register this content with registry.
+            # Currently this assumes we have a file so we need to use stub
+            # entries
+            # TODO: Add to ephemeral part of registry
+            self._register_datasets([(ref, itemInfo)])
 
-        # We have to register this content with registry.
-        # Currently this assumes we have a file so we need to use stub entries
-        # TODO: Add to ephemeral part of registry
-        self._register_datasets([(ref, itemInfo)])
+            if self._transaction is not None:
+                self._transaction.registerUndo("put", self.remove, ref)
 
-        if self._transaction is not None:
-            self._transaction.registerUndo("put", self.remove, ref)
+        self._enforceBudget(keep=ref.id)
 
     def getUri(self, ref, predict=False):
         """URI to the Dataset.
@@ -355,6 +496,10 @@ class InMemoryDatastore(GenericBaseDatastore):
         FileNotFoundError
             Attempt to remove a dataset that does not exist.
 
+        Notes
+        -----
+        A dataset that has been evicted can still be removed, which removes
+        its records and registry locations.
         """
         try:
             storedItemInfo = self.getStoredItemInfo(ref)
@@ -364,15 +509,12 @@ class InMemoryDatastore(GenericBaseDatastore):
         if storedItemInfo.parentID is not None:
             thisID = storedItemInfo.parentID
 
-        if thisID not in self.datasets:
-            raise FileNotFoundError("No such file dataset in memory: {}".format(ref))
-
         # Only delete if this is the only dataset associated with this data
         allRefs = self.related[thisID]
         theseRefs = {r.id for r in itertools.chain([ref], ref.components.values())}
         remainingRefs = allRefs - theseRefs
-        if not remainingRefs:
-            del self.datasets[thisID]
+        if not remainingRefs and thisID in self.datasets:
+            self._discard(thisID)
 
         # Remove rows from registries
         self._remove_from_registry(ref)
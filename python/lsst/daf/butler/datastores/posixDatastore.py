@@ -27,13 +27,14 @@ __all__ = ("PosixDatastore", )
 
 import hashlib
 import logging
+import mmap
 import os
 import shutil
+import threading
 from typing import TYPE_CHECKING, Iterable, Optional, Type
 
 from .fileLikeDatastore import FileLikeDatastore
 from lsst.daf.butler.core.safeFileIo import safeMakeDir
-from lsst.daf.butler.core.utils import transactional
 from lsst.daf.butler import ButlerURI, FileDataset, StoredFileInfo, Formatter
 
 if TYPE_CHECKING:
@@ -85,6 +86,14 @@ class PosixDatastore(FileLikeDatastore):
                 raise ValueError(f"No valid root at: {self.root}")
             safeMakeDir(self.root)
 
+        # Serializes directory creation during (possibly parallel) ingest.
+        self._mkdirLock = threading.Lock()
+
+        # How checksums are computed.
+        self.checksumBlockSize = self.config.get("checksumBlockSize", 1 << 20)
+        self.checksumUseMmap = self.config.get("checksumUseMmap", False)
+        self.checksumOnWrite = self.config.get("checksumOnWrite", False)
+
     def exists(self, ref):
         """Check if the dataset exists in the datastore.
 
@@ -103,40 +112,29 @@ class PosixDatastore(FileLikeDatastore):
             return False
         return os.path.exists(location.path)
 
-    def get(self, ref, parameters=None):
-        """Load an InMemoryDataset from the store.
-
-        Parameters
-        ----------
-        ref : `DatasetRef`
-            Reference to the required Dataset.
-        parameters : `dict`
-            `StorageClass`-specific parameters that specify, for example,
-            a slice of the Dataset to be loaded.
+    def _stat_artifact(self, location):
+        # Docstring inherited from FileLikeDatastore._stat_artifact.
+        try:
+            return os.stat(location.path)
+        except FileNotFoundError:
+            return None
 
-        Returns
-        -------
-        inMemoryDataset : `object`
-            Requested Dataset or slice thereof as an InMemoryDataset.
+    def _artifacts_exist(self, items):
+        # Docstring inherited from FileLikeDatastore._artifacts_exist.
+        return [os.path.exists(location.path) for location, _ in items]
 
-        Raises
-        ------
-        FileNotFoundError
-            Requested dataset can not be retrieved.
-        TypeError
-            Return value from formatter has unexpected type.
-        ValueError
-            Formatter failed to process the dataset.
-        """
-        getInfo = self._prepare_for_get(ref, parameters)
+    def _read_artifact_into_memory(self, getInfo, ref):
+        # Docstring inherited from FileLikeDatastore.
         location = getInfo.location
 
         # Too expensive to recalculate the checksum on fetch
-        # but we can check size and existence
-        if not os.path.exists(location.path):
-            raise FileNotFoundError("Dataset with Id {} does not seem to exist at"
-                                    " expected location of {}".format(ref.id, location.path))
-        stat = os.stat(location.path)
+        # but we can check size and existence, unless already done by locate
+        stat = getInfo.stat
+        if stat is None:
+            stat = self._stat_artifact(location)
+            if stat is None:
+                raise FileNotFoundError("Dataset with Id {} does not seem to exist at"
+                                        " expected location of {}".format(ref.id, location.path))
         size = stat.st_size
         storedFileInfo = getInfo.info
         if size != storedFileInfo.file_size:
@@ -152,32 +150,10 @@ class PosixDatastore(FileLikeDatastore):
 
         return self._post_process_get(result, getInfo.readStorageClass, getInfo.assemblerParams)
 
-    @transactional
-    def put(self, inMemoryDataset, ref):
-        """Write a InMemoryDataset with a given `DatasetRef` to the store.
-
-        Parameters
-        ----------
-        inMemoryDataset : `object`
-            The Dataset to store.
-        ref : `DatasetRef`
-            Reference to the associated Dataset.
-
-        Raises
-        ------
-        TypeError
-            Supplied object and storage class are inconsistent.
-        DatasetTypeNotSupportedError
-            The associated `DatasetType` is not handled by this datastore.
-
-        Notes
-        -----
-        If the datastore is configured to reject certain dataset types it
-        is possible that the put will fail and raise a
-        `DatasetTypeNotSupportedError`.  The main use case for this is to
-        allow `ChainedDatastore` to put to multiple datastores without
-        requiring that every datastore accepts the dataset.
-        """
+    def _write_artifact(self, inMemoryDataset, ref, transaction=None):
+        # Docstring inherited from FileLikeDatastore._write_artifact.
+        if transaction is None:
+            transaction = self._transaction
         location, formatter = self._prepare_for_put(inMemoryDataset, ref)
 
         storageDir = os.path.dirname(location.path)
@@ -207,9 +183,25 @@ class PosixDatastore(FileLikeDatastore):
                 pass
 
         formatter_exception = None
-        with self._transaction.undoWith("write", _removeFileExists, predictedFullPath):
+        serializedDataset = None
+        with transaction.undoWith("write", _removeFileExists, predictedFullPath):
             try:
-                path = formatter.write(inMemoryDataset)
+                if self.useChecksum and self.checksumOnWrite:
+                    # Serialize in memory where the formatter supports it,
+                    # so the checksum can be computed without reading the
+                    # file back.
+                    try:
+                        serializedDataset = formatter.toBytes(inMemoryDataset)
+                    except NotImplementedError:
+                        pass
+                if serializedDataset is not None:
+                    location = formatter.fileDescriptor.location
+                    location.updateExtension(formatter.extension)
+                    with open(location.path, "wb") as fd:
+                        fd.write(serializedDataset)
+                    path = location.pathInStore
+                else:
+                    path = formatter.write(inMemoryDataset)
                 log.debug("Wrote file to %s", path)
             except Exception as e:
                 formatter_exception = e
@@ -219,8 +211,14 @@ class PosixDatastore(FileLikeDatastore):
 
         assert predictedFullPath == os.path.join(self.root, path)
 
-        info = self._extractIngestInfo(path, ref, formatter=formatter)
-        self._register_datasets([(ref, info)])
+        if serializedDataset is not None:
+            info = StoredFileInfo(formatter=formatter, path=path, storageClass=ref.datasetType.storageClass,
+                                  file_size=len(serializedDataset),
+                                  checksum=hashlib.new(self.checksumAlgorithm, serializedDataset).hexdigest(),
+                                  checksum_algorithm=self.checksumAlgorithm)
+        else:
+            info = self._extractIngestInfo(path, ref, formatter=formatter)
+        return info
 
     def _standardizeIngestPath(self, path: str, *, transfer: Optional[str] = None) -> str:
         # Docstring inherited from FileLikeDatastore._standardizeIngestPath.
@@ -250,9 +248,13 @@ class PosixDatastore(FileLikeDatastore):
             if os.path.exists(newFullPath):
                 raise FileExistsError(f"File '{newFullPath}' already exists.")
             storageDir = os.path.dirname(newFullPath)
-            if not os.path.isdir(storageDir):
-                with self._transaction.undoWith("mkdir", os.rmdir, storageDir):
-                    safeMakeDir(storageDir)
+            # Ingest may run in several threads; creating the directory and
+            # registering its removal must happen before any other thread
+            # registers the removal of a file within it.
+            with self._mkdirLock:
+                if not os.path.isdir(storageDir):
+                    with self._transaction.undoWith("mkdir", os.rmdir, storageDir):
+                        safeMakeDir(storageDir)
             if transfer == "move":
                 with self._transaction.undoWith("move", shutil.move, newFullPath, fullPath):
                     shutil.move(fullPath, newFullPath)
@@ -270,13 +272,16 @@ class PosixDatastore(FileLikeDatastore):
             path = newPath
             fullPath = newFullPath
         if self.useChecksum:
-            checksum = self.computeChecksum(fullPath)
+            algorithm = self.checksumAlgorithm
+            checksum = self.computeChecksum(fullPath, algorithm=algorithm, block_size=self.checksumBlockSize,
+                                            use_mmap=self.checksumUseMmap)
         else:
+            algorithm = None
             checksum = None
         stat = os.stat(fullPath)
         size = stat.st_size
         return StoredFileInfo(formatter=formatter, path=path, storageClass=ref.datasetType.storageClass,
-                              file_size=size, checksum=checksum)
+                              file_size=size, checksum=checksum, checksum_algorithm=algorithm)
 
     def remove(self, ref):
         """Indicate to the Datastore that a Dataset can be removed.
@@ -313,8 +318,39 @@ class PosixDatastore(FileLikeDatastore):
         # Remove rows from registries
         self._remove_from_registry(ref)
 
+    def _verify_artifact(self, location, info, checksum):
+        # Docstring inherited from FileLikeDatastore._verify_artifact.
+        size = os.stat(location.path).st_size
+        if info.file_size is not None and size != info.file_size:
+            return f"size {size} does not match recorded size {info.file_size}"
+        if checksum and info.checksum is not None:
+            # Each record names the algorithm of its own checksum.
+            algorithm = info.checksum_algorithm
+            actual = self.computeChecksum(location.path, algorithm=algorithm,
+                                          block_size=self.checksumBlockSize, use_mmap=self.checksumUseMmap)
+            if actual != info.checksum:
+                return f"{algorithm} checksum {actual} does not match recorded checksum {info.checksum}"
+        return None
+
+    def _list_artifacts(self):
+        # Docstring inherited from FileLikeDatastore._list_artifacts.
+        def walk(directory, prefix):
+            # Sorting directories by their name with a trailing separator
+            # interleaves them with files in the order of the full paths,
+            # which os.walk does not.
+            with os.scandir(directory) as it:
+                entries = sorted((entry.name + os.sep if entry.is_dir(follow_symlinks=False) else entry.name,
+                                  entry.path) for entry in it)
+            for name, path in entries:
+                if name.endswith(os.sep):
+                    yield from walk(path, prefix + name)
+                elif prefix:
+                    yield prefix + name
+
+        yield from walk(self.root, "")
+
     @staticmethod
-    def computeChecksum(filename, algorithm="blake2b", block_size=8192):
+    def computeChecksum(filename, algorithm="blake2b", block_size=1 << 20, use_mmap=False):
         """Compute the checksum of the supplied file.
 
         Parameters
@@ -326,6 +362,9 @@ class PosixDatastore(FileLikeDatastore):
             by :py:class`hashlib`.
         block_size : `int`
             Number of bytes to read from file at one time.
+        use_mmap : `bool`, optional
+            If `True`, memory-map the file and hash it in a single call
+            instead of reading it in blocks.
 
         Returns
         -------
@@ -338,18 +377,33 @@ class PosixDatastore(FileLikeDatastore):
         hasher = hashlib.new(algorithm)
 
         with open(filename, "rb") as f:
-            for chunk in iter(lambda: f.read(block_size), b""):
-                hasher.update(chunk)
+            if use_mmap:
+                # Empty files cannot be mapped.
+                if os.fstat(f.fileno()).st_size > 0:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        hasher.update(mapped)
+            else:
+                # Reuse a single buffer rather than allocating for each block.
+                buffer = bytearray(block_size)
+                view = memoryview(buffer)
+                while True:
+                    nbytes = f.readinto(buffer)
+                    if not nbytes:
+                        break
+                    hasher.update(view[:nbytes])
 
         return hasher.hexdigest()
 
     def export(self, refs: Iterable[DatasetRef], *,
                directory: Optional[str] = None, transfer: Optional[str] = None) -> Iterable[FileDataset]:
         # Docstring inherited from Datastore.export.
+        refs = list(refs)
+        infos = self.getStoredItemInfos(refs)
         for ref in refs:
-            location, storedFileInfo = self._get_dataset_location_info(ref)
-            if location is None:
+            storedFileInfo = infos.get(ref.id)
+            if storedFileInfo is None:
                 raise FileNotFoundError(f"Could not retrieve Dataset {ref}.")
+            location = self.locationFactory.fromPath(storedFileInfo.path)
             if transfer is None:
                 # TODO: do we also need to return the readStorageClass somehow?
                 yield FileDataset(refs=[ref], path=location.pathInStore, formatter=storedFileInfo.formatter)
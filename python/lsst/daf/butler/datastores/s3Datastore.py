@@ -24,11 +24,18 @@
 __all__ = ("S3Datastore", )
 
 import boto3
+import functools
+import hashlib
+import io
 import logging
 import os
 import pathlib
+import posixpath
+import shutil
 import tempfile
 
+from boto3.s3.transfer import TransferConfig
+from collections import defaultdict
 from typing import Optional, Type
 
 from lsst.daf.butler import (
@@ -39,12 +46,18 @@ from lsst.daf.butler import (
     StoredFileInfo,
 )
 
+from .artifactCache import LocalArtifactCache
 from .fileLikeDatastore import FileLikeDatastore
-from lsst.daf.butler.core.s3utils import s3CheckFileExists, bucketExists
-from lsst.daf.butler.core.utils import transactional
+from lsst.daf.butler.core.s3utils import s3CheckFileExists, bucketExists, S3RangeFile
 
 log = logging.getLogger(__name__)
 
+_DOWNLOAD_BLOCK_SIZE = 1 << 20
+"""Size of the blocks in which artifacts are streamed to the local cache."""
+
+_RANGE_READ_BUFFER_SIZE = 1 << 16
+"""Minimum size of the byte ranges requested for partial reads."""
+
 
 class S3Datastore(FileLikeDatastore):
     """Basic S3 Object Storage backed Datastore.
@@ -68,6 +81,28 @@ class S3Datastore(FileLikeDatastore):
     -----
     S3Datastore supports non-link transfer modes for file-based ingest:
     `"move"`, `"copy"`, and `None` (no transfer).
+
+    If the ``cache.size`` configuration entry is non-zero, artifacts that are
+    read are kept in a local directory (``cache.root``, or a temporary
+    directory if unset), so that later reads of the same artifacts do not
+    download them again.  Cached copies are keyed on the checksum that `put`
+    records (if ``checksum`` is enabled), so a cache hit needs no request.
+    Artifacts without a recorded checksum (e.g. ingested files) are keyed on
+    their ETag instead, which ensures that a replaced artifact is never read
+    from a stale copy; it comes from the HEAD request that `locate` makes,
+    or costs one per read otherwise.
+
+    Objects larger than ``uploadPartSize`` bytes are uploaded as multipart
+    uploads, with up to ``uploadConcurrency`` parts in flight at once.  If
+    ``checkExistsBeforePut`` is false, `put` does not check that its target
+    key is free; this saves a request per dataset but silently overwrites
+    any existing object, so it is only safe if the file templates guarantee
+    unique keys.
+
+    When a component or a subset of a dataset is requested (e.g. with the
+    ``columns`` parameter) and the formatter implements
+    `Formatter.fromFile`, only the byte ranges it reads are downloaded,
+    unless the artifact is already in the local cache.
     """
 
     defaultConfigFile = "datastores/s3Datastore.yaml"
@@ -87,6 +122,19 @@ class S3Datastore(FileLikeDatastore):
             # missing. Further discussion can make this happen though.
             raise IOError(f"Bucket {self.locationFactory.netloc} does not exist!")
 
+        # Objects larger than one part are uploaded in parts, concurrently.
+        partSize = self.config.get("uploadPartSize", 8*1024*1024)
+        self.transferConfig = TransferConfig(multipart_threshold=partSize, multipart_chunksize=partSize,
+                                             max_concurrency=self.config.get("uploadConcurrency", 10))
+        self.checkExistsBeforePut = self.config.get("checkExistsBeforePut", True)
+
+        # Local read-through cache of artifacts.
+        cacheSize = self.config.get(("cache", "size"), 0)
+        if cacheSize:
+            self.cache = LocalArtifactCache(self.config.get(("cache", "root")), cacheSize)
+        else:
+            self.cache = None
+
     def exists(self, ref):
         """Check if the dataset exists in the datastore.
 
@@ -105,40 +153,123 @@ class S3Datastore(FileLikeDatastore):
             return False
         return s3CheckFileExists(location, client=self.client)[0]
 
-    def get(self, ref, parameters=None):
-        """Load an InMemoryDataset from the store.
+    def _stat_artifact(self, location):
+        # Docstring inherited from FileLikeDatastore._stat_artifact.
+        # The whole HEAD response is returned, so that reads can use its
+        # ETag rather than asking for it again.
+        try:
+            return self.client.head_object(Bucket=location.netloc, Key=location.relativeToPathRoot)
+        except self.client.exceptions.ClientError as err:
+            errorcode = err.response["ResponseMetadata"]["HTTPStatusCode"]
+            if errorcode == 404:
+                return None
+            # As in s3CheckFileExists, a 403 may mean either that the object
+            # does not exist or that it may not be read.
+            if errorcode == 403:
+                raise PermissionError("Forbidden HEAD operation error occured. "
+                                      "Verify s3:ListBucket and s3:GetObject "
+                                      "permissions are granted for your IAM user. ") from err
+            raise
+
+    def _artifacts_exist(self, items):
+        # Docstring inherited from FileLikeDatastore._artifacts_exist.
+        # File templates put related datasets in the same "directory", so
+        # the keys are grouped by prefix and each group is checked with a
+        # listing instead of a HEAD request per key.
+        groups = defaultdict(list)
+        for i, (location, info) in enumerate(items):
+            key = location.relativeToPathRoot
+            groups[location.netloc, posixpath.dirname(key)].append((key, i, info))
+
+        result = [False]*len(items)
+        for found in self._map(self._keys_exist, groups.keys(), groups.values()):
+            for i, exists in found:
+                result[i] = exists
+        return result
+
+    def _keys_exist(self, group, members):
+        """Check whether keys with a common prefix exist.
+
+        Parameters
+        ----------
+        group : `tuple` [`str`, `str`]
+            Bucket and the common prefix (without a trailing separator) of the
+            keys.
+        members : `list` [`tuple` [`str`, `int`, `StoredFileInfo`]]
+            Keys to look for, with the index of the corresponding item in
+            `_artifacts_exist` and their stored information.
+
+        Returns
+        -------
+        found : `list` [`tuple` [`int`, `bool`]]
+            Whether each key exists, with the same indices.  A key whose
+            object size does not match the recorded size is reported as
+            missing.
+        """
+        bucket, prefix = group
+        if len(members) == 1:
+            # A listing is no cheaper than a HEAD request.
+            key, i, info = members[0]
+            _, size = s3CheckFileExists(key, bucket=bucket, client=self.client)
+            sizes = {key: size} if size >= 0 else {}
+        else:
+            members.sort(key=lambda member: member[0])
+            first, last = members[0][0], members[-1][0]
+            # Keys are listed in lexicographic order, so only the range that
+            # spans the requested keys is listed.  StartAfter is exclusive.
+            kwargs = dict(Bucket=bucket, Prefix=f"{prefix}/" if prefix else "", Delimiter="/")
+            if first[:-1]:
+                kwargs["StartAfter"] = first[:-1]
+            paginator = self.client.get_paginator("list_objects_v2")
+            sizes = {}
+            for page in paginator.paginate(**kwargs):
+                contents = page.get("Contents", ())
+                for obj in contents:
+                    sizes[obj["Key"]] = obj["Size"]
+                if contents and contents[-1]["Key"] >= last:
+                    break
+
+        found = []
+        for key, i, info in members:
+            size = sizes.get(key)
+            exists = size is not None and (info.file_size is None or size == info.file_size)
+            if size is not None and not exists:
+                log.warning("Size of %s (%d) does not match recorded size of %d",
+                            key, size, info.file_size)
+            found.append((i, exists))
+        return found
+
+    def _get_object(self, location, ref, head=False, **kwargs):
+        """Start downloading an artifact.
 
         Parameters
         ----------
+        location : `Location`
+            Location of the artifact.
         ref : `DatasetRef`
-            Reference to the required Dataset.
-        parameters : `dict`
-            `StorageClass`-specific parameters that specify, for example,
-            a slice of the Dataset to be loaded.
+            The dataset stored in the artifact, used in error messages.
+        head : `bool`, optional
+            If `True`, only request the artifact's metadata.
+        **kwargs
+            Additional arguments for the S3 request.
 
         Returns
         -------
-        inMemoryDataset : `object`
-            Requested Dataset or slice thereof as an InMemoryDataset.
+        response : `dict`
+            Response of the S3 ``get_object`` (or ``head_object``) call; the
+            data is read from its ``Body``.
 
         Raises
         ------
         FileNotFoundError
-            Requested dataset can not be retrieved.
-        TypeError
-            Return value from formatter has unexpected type.
-        ValueError
-            Formatter failed to process the dataset.
+            The artifact does not exist or is not accessible.
         """
-        getInfo = self._prepare_for_get(ref, parameters)
-        location = getInfo.location
-
         # since we have to make a GET request to S3 anyhow (for download) we
         # might as well use the HEADER metadata for size comparison instead.
         # s3CheckFileExists would just duplicate GET/LIST charges in this case.
+        request = self.client.head_object if head else self.client.get_object
         try:
-            response = self.client.get_object(Bucket=location.netloc,
-                                              Key=location.relativeToPathRoot)
+            return request(Bucket=location.netloc, Key=location.relativeToPathRoot, **kwargs)
         except self.client.exceptions.ClientError as err:
             errorcode = err.response["ResponseMetadata"]["HTTPStatusCode"]
             # head_object returns 404 when object does not exist only when user
@@ -161,19 +292,144 @@ class S3Datastore(FileLikeDatastore):
             # other errors are reraised also, but less descriptively
             raise err
 
-        storedFileInfo = getInfo.info
+    def _cache_version(self, location, storedFileInfo, ref, stat=None):
+        """Return the version identifier under which an artifact is cached.
+
+        Parameters
+        ----------
+        location : `Location`
+            Location of the artifact.
+        storedFileInfo : `StoredFileInfo`
+            Stored information about the artifact.
+        ref : `DatasetRef`
+            The dataset stored in the artifact, used in error messages.
+        stat : `dict`, optional
+            Response of an earlier HEAD request for the artifact (the result
+            of `_stat_artifact`), if there is one.
+
+        Returns
+        -------
+        version : `str` or `None`
+            The ETag of the artifact, which changes whenever it is written,
+            or `None` if there is no cache or the artifact's recorded
+            checksum identifies it instead.  A HEAD request is only made if
+            the ETag is needed and ``stat`` is `None`.
+
+        Raises
+        ------
+        FileNotFoundError
+            The artifact does not exist or is not accessible.
+        """
+        if self.cache is None or storedFileInfo.checksum is not None:
+            return None
+        if stat is None:
+            stat = self._get_object(location, ref, head=True)
+        return stat["ETag"].strip('"')
+
+    @staticmethod
+    def _check_object_size(response, location, storedFileInfo):
+        """Check the size of a downloaded artifact against its record.
+
+        Parameters
+        ----------
+        response : `dict`
+            Response of the S3 ``get_object`` call.
+        location : `Location`
+            Location of the artifact.
+        storedFileInfo : `StoredFileInfo`
+            Stored information about the artifact.
+
+        Raises
+        ------
+        RuntimeError
+            The sizes do not match.
+        """
         if response["ContentLength"] != storedFileInfo.file_size:
             raise RuntimeError("Integrity failure in Datastore. Size of file {} ({}) does not"
                                " match recorded size of {}".format(location.path, response["ContentLength"],
                                                                    storedFileInfo.file_size))
 
+    def _read_artifact_ranges(self, getInfo, ref):
+        """Read a dataset with the formatter's ``fromFile``, downloading only
+        the byte ranges that it reads.
+
+        Parameters
+        ----------
+        getInfo : `DatastoreFileGetInformation`
+            Information about the artifact within the datastore.
+        ref : `DatasetRef`
+            The registry information associated with this artifact.
+
+        Returns
+        -------
+        result : `object`
+            The dataset read by the formatter, before post-processing.
+
+        Raises
+        ------
+        NotImplementedError
+            The formatter does not support reading from a file object.
+        """
+        location = getInfo.location
+        raw = S3RangeFile(self.client, location.netloc, location.relativeToPathRoot,
+                          size=getInfo.info.file_size)
+        with io.BufferedReader(raw, buffer_size=_RANGE_READ_BUFFER_SIZE) as fileObj:
+            try:
+                return getInfo.formatter.fromFile(fileObj, component=getInfo.component)
+            except (NotImplementedError, FileNotFoundError):
+                raise
+            except Exception as e:
+                raise ValueError(f"Failure from formatter for Dataset {ref.id}: {e}") from e
+
+    def _read_artifact_into_memory(self, getInfo, ref):
+        # Docstring inherited from FileLikeDatastore.
+        location = getInfo.location
+        storedFileInfo = getInfo.info
+        formatter = getInfo.formatter
+
+        # Only part of the artifact is needed if the formatter has parameters
+        # to apply or a component to read.
+        formatterParams, _ = formatter.segregateParameters()
+        version = self._cache_version(location, storedFileInfo, ref, getInfo.stat)
+        if (formatterParams or getInfo.component) and \
+                not (self.cache is not None and self.cache.contains(location, storedFileInfo, version)):
+            try:
+                result = self._read_artifact_ranges(getInfo, ref)
+            except NotImplementedError:
+                pass
+            else:
+                return self._post_process_get(result, getInfo.readStorageClass, getInfo.assemblerParams)
+
+        if self.cache is not None:
+            def download(filename):
+                # Make sure the content matches the version it is cached as.
+                kwargs = {"IfMatch": f'"{version}"'} if version is not None else {}
+                response = self._get_object(location, ref, **kwargs)
+                self._check_object_size(response, location, storedFileInfo)
+                with open(filename, "wb") as fh:
+                    shutil.copyfileobj(response["Body"], fh, _DOWNLOAD_BLOCK_SIZE)
+
+            with self.cache.use(location, storedFileInfo, download, version) as cachedPath:
+                if cachedPath is not None:
+                    # Formatters read the cached copy directly, so there is
+                    # no need for fromBytes or a temporary file.
+                    formatter._fileDescriptor.location = Location(*os.path.split(cachedPath))
+                    try:
+                        result = formatter.read(component=getInfo.component)
+                    except Exception as e:
+                        raise ValueError(f"Failure from formatter for Dataset {ref.id}: {e}") from e
+                    return self._post_process_get(result, getInfo.readStorageClass,
+                                                  getInfo.assemblerParams)
+
+        response = self._get_object(location, ref)
+        self._check_object_size(response, location, storedFileInfo)
+
         # download the data as bytes
         serializedDataset = response["Body"].read()
 
         # format the downloaded bytes into appropriate object directly, or via
         # tempfile (when formatter does not support to/from/Bytes). This is S3
         # equivalent of PosixDatastore formatter.read try-except block.
-        formatter = getInfo.formatter
         try:
             result = formatter.fromBytes(serializedDataset, component=getInfo.component)
         except NotImplementedError:
@@ -186,32 +442,10 @@ class S3Datastore(FileLikeDatastore):
 
         return self._post_process_get(result, getInfo.readStorageClass, getInfo.assemblerParams)
 
-    @transactional
-    def put(self, inMemoryDataset, ref):
-        """Write a InMemoryDataset with a given `DatasetRef` to the store.
-
-        Parameters
-        ----------
-        inMemoryDataset : `object`
-            The Dataset to store.
-        ref : `DatasetRef`
-            Reference to the associated Dataset.
-
-        Raises
-        ------
-        TypeError
-            Supplied object and storage class are inconsistent.
-        DatasetTypeNotSupportedError
-            The associated `DatasetType` is not handled by this datastore.
-
-        Notes
-        -----
-        If the datastore is configured to reject certain dataset types it
-        is possible that the put will fail and raise a
-        `DatasetTypeNotSupportedError`.  The main use case for this is to
-        allow `ChainedDatastore` to put to multiple datastores without
-        requiring that every datastore accepts the dataset.
-        """
+    def _write_artifact(self, inMemoryDataset, ref, transaction=None):
+        # Docstring inherited from FileLikeDatastore._write_artifact.
+        if transaction is None:
+            transaction = self._transaction
         location, formatter = self._prepare_for_put(inMemoryDataset, ref)
 
         # in PosixDatastore a directory can be created by `safeMakeDir`. In S3
@@ -219,33 +453,69 @@ class S3Datastore(FileLikeDatastore):
         # an *exact* full key already exists before writing instead. The insert
         # key operation is equivalent to creating the dir and the file.
         location.updateExtension(formatter.extension)
-        if s3CheckFileExists(location, client=self.client,)[0]:
+        if self.checkExistsBeforePut and s3CheckFileExists(location, client=self.client,)[0]:
             raise FileExistsError(f"Cannot write file for ref {ref} as "
                                   f"output file {location.uri} exists.")
 
         # upload the file directly from bytes or by using a temporary file if
-        # _toBytes is not implemented
+        # _toBytes is not implemented.  Both are streamed in parts (and large
+        # ones uploaded concurrently) rather than sent in one request.
+        checksum = None
         try:
             serializedDataset = formatter.toBytes(inMemoryDataset)
-            self.client.put_object(Bucket=location.netloc, Key=location.relativeToPathRoot,
-                                   Body=serializedDataset)
+            size = len(serializedDataset)
+            if self.useChecksum:
+                checksum = hashlib.new(self.checksumAlgorithm, serializedDataset).hexdigest()
+            # BytesIO shares the buffer, so this does not copy the data.
+            self.client.upload_fileobj(io.BytesIO(serializedDataset), Bucket=location.netloc,
+                                       Key=location.relativeToPathRoot, Config=self.transferConfig)
+            del serializedDataset
             log.debug("Wrote file directly to %s", location.uri)
         except NotImplementedError:
             with tempfile.NamedTemporaryFile(suffix=formatter.extension) as tmpFile:
                 formatter._fileDescriptor.location = Location(*os.path.split(tmpFile.name))
                 formatter.write(inMemoryDataset)
+                size = os.path.getsize(tmpFile.name)
+                if self.useChecksum:
+                    with open(tmpFile.name, "rb") as fh:
+                        checksum = self._checksum(fh)
                 self.client.upload_file(Bucket=location.netloc, Key=location.relativeToPathRoot,
-                                        Filename=tmpFile.name)
+                                        Filename=tmpFile.name, Config=self.transferConfig)
                 log.debug("Wrote file to %s via a temporary directory.", location.uri)
 
         # Register a callback to try to delete the uploaded data if
         # the ingest fails below
-        self._transaction.registerUndo("write", self.client.delete_object,
-                                       Bucket=location.netloc, Key=location.relativeToPathRoot)
+        transaction.registerUndo("write", self.client.delete_object,
+                                 Bucket=location.netloc, Key=location.relativeToPathRoot)
 
-        # URI is needed to resolve what ingest case are we dealing with
-        info = self._extractIngestInfo(location.uri, ref, formatter=formatter)
-        self._register_datasets([(ref, info)])
+        # We know the size and checksum of what was uploaded, so there is
+        # no need for another request to find them.
+        info = StoredFileInfo(formatter=formatter, path=location.pathInStore,
+                              storageClass=ref.datasetType.storageClass,
+                              file_size=size, checksum=checksum,
+                              checksum_algorithm=self.checksumAlgorithm if checksum is not None else None)
+        return info
+
+    def _checksum(self, fileObj, algorithm=None):
+        """Compute the checksum of a file's content.
+
+        Parameters
+        ----------
+        fileObj : file-like object
+            Binary file to read to its end.
+        algorithm : `str`, optional
+            Name of the `hashlib` algorithm to use; defaults to
+            ``checksumAlgorithm``.
+
+        Returns
+        -------
+        checksum : `str`
+            Hexadecimal digest of the content.
+        """
+        hasher = hashlib.new(algorithm or self.checksumAlgorithm)
+        for block in iter(functools.partial(fileObj.read, _DOWNLOAD_BLOCK_SIZE), b""):
+            hasher.update(block)
+        return hasher.hexdigest()
 
     def _standardizeIngestPath(self, path: str, *, transfer: Optional[str] = None) -> str:
         # Docstring inherited from FileLikeDatastore._standardizeIngestPath.
@@ -294,14 +564,14 @@ class S3Datastore(FileLikeDatastore):
                 tgtPathInStore = formatter.predictPathFromLocation(location)
                 tgtLocation = self.locationFactory.fromPath(tgtPathInStore)
                 self.client.upload_file(Bucket=tgtLocation.netloc, Key=tgtLocation.relativeToPathRoot,
-                                        Filename=srcUri.ospath)
+                                        Filename=srcUri.ospath, Config=self.transferConfig)
                 if transfer == "move":
                     os.remove(srcUri.ospath)
             elif srcUri.scheme == "s3":
                 # source is another S3 Bucket
                 relpath = srcUri.relativeToPathRoot
                 copySrc = {"Bucket": srcUri.netloc, "Key": relpath}
-                self.client.copy(copySrc, self.locationFactory.netloc, relpath)
+                self.client.copy(copySrc, self.locationFactory.netloc, relpath, Config=self.transferConfig)
                 if transfer == "move":
                     # https://github.com/boto/boto3/issues/507 - there is no
                     # way of knowing if the file was actually deleted except
@@ -319,7 +589,35 @@ class S3Datastore(FileLikeDatastore):
 
         return StoredFileInfo(formatter=formatter, path=tgtLocation.pathInStore,
                               storageClass=ref.datasetType.storageClass,
-                              file_size=size, checksum=None)
+                              file_size=size, checksum=None, checksum_algorithm=None)
+
+    def _verify_artifact(self, location, info, checksum):
+        # Docstring inherited from FileLikeDatastore._verify_artifact.
+        exists, size = s3CheckFileExists(location, client=self.client)
+        if not exists:
+            raise FileNotFoundError(f"No artifact at {location.uri}.")
+        if info.file_size is not None and size != info.file_size:
+            return f"size {size} does not match recorded size {info.file_size}"
+        if checksum and info.checksum is not None:
+            # The artifact has to be downloaded to check its checksum.
+            response = self.client.get_object(Bucket=location.netloc, Key=location.relativeToPathRoot)
+            actual = self._checksum(response["Body"], info.checksum_algorithm)
+            if actual != info.checksum:
+                return (f"{info.checksum_algorithm} checksum {actual} does not match recorded "
+                        f"checksum {info.checksum}")
+        return None
+
+    def _list_artifacts(self):
+        # Docstring inherited from FileLikeDatastore._list_artifacts.
+        prefix = ButlerURI(self.root).relativeToPathRoot.strip("/")
+        prefix = f"{prefix}/" if prefix and prefix != "." else ""
+        # Keys are listed in sorted order, as _list_artifacts requires.
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.locationFactory.netloc, Prefix=prefix):
+            for obj in page.get("Contents", ()):
+                path = obj["Key"][len(prefix):]
+                if "/" in path:
+                    yield path
 
     def remove(self, ref):
         """Indicate to the Datastore that a Dataset can be removed.
@@ -341,7 +639,7 @@ class S3Datastore(FileLikeDatastore):
         FileNotFoundError
             Attempt to remove a dataset that does not exist.
         """
-        location, _ = self._get_dataset_location_info(ref)
+        location, storedFileInfo = self._get_dataset_location_info(ref)
         if location is None:
             raise FileNotFoundError(f"Requested dataset ({ref}) does not exist")
 
@@ -349,6 +647,9 @@ class S3Datastore(FileLikeDatastore):
             raise FileNotFoundError(f"No such file: {location.uri}")
 
         if self._can_remove_dataset_artifact(ref):
+            if self.cache is not None:
+                self.cache.discard(location, storedFileInfo,
+                                   self._cache_version(location, storedFileInfo, ref))
             # https://github.com/boto/boto3/issues/507 - there is no way of
             # knowing if the file was actually deleted
             self.client.delete_object(Bucket=location.netloc, Key=location.relativeToPathRoot)
@@ -30,6 +30,33 @@ class FitsExposureFormatter(Formatter):
     """
     extension = ".fits"
     _metadata = None
+    _reader = None
+
+    # Methods of `lsst.afw.image.ExposureFitsReader` that read each component
+    # held by ExposureInfo, without reading any of the image planes.
+    _infoReaders = {
+        "wcs": "readWcs",
+        "psf": "readPsf",
+        "photoCalib": "readPhotoCalib",
+        "visitInfo": "readVisitInfo",
+        "apCorrMap": "readApCorrMap",
+        "coaddInputs": "readCoaddInputs",
+        "transmissionCurve": "readTransmissionCurve",
+        "filter": "readFilter",
+        "detector": "readDetector",
+        "validPolygon": "readValidPolygon",
+    }
+
+    @property
+    def reader(self):
+        """Reader for the file, which parses the primary header only once
+        however many components are read
+        (`lsst.afw.image.ExposureFitsReader`).
+        """
+        if self._reader is None:
+            from lsst.afw.image import ExposureFitsReader
+            self._reader = ExposureFitsReader(self.fileDescriptor.location.path)
+        return self._reader
 
     @property
     def metadata(self):
@@ -57,10 +84,18 @@ class FitsExposureFormatter(Formatter):
         image : `~lsst.afw.image.Image` or `~lsst.afw.image.Mask`
             In-memory image, variance, or mask component.
         """
-        # TODO: could be made more efficient *if* Exposure type objects
-        # held the class objects of their components.
-        full = self.readFull()
-        return self.fileDescriptor.storageClass.assembler().getComponent(full, component)
+        # Only the HDU holding the component is read.
+        fileDescriptor = self.fileDescriptor
+        parameters = fileDescriptor.parameters
+        if parameters is None:
+            parameters = {}
+        fileDescriptor.storageClass.validateParameters(parameters)
+        if component == "image":
+            return self.reader.readImage(**parameters)
+        elif component == "mask":
+            return self.reader.readMask(**parameters)
+        else:
+            return self.reader.readVariance(**parameters)
 
     def readMetadata(self):
         """Read all header metadata directly into a PropertyList.
@@ -109,6 +144,10 @@ class FitsExposureFormatter(Formatter):
         obj : component-dependent
             In-memory component object.
         """
+        if component in self._infoReaders:
+            return getattr(self.reader, self._infoReaders[component])()
+
+        # Fall back to reading a single pixel of the full Exposure.
         from lsst.afw.image import LOCAL
         from lsst.geom import Box2I, Point2I
         parameters = dict(bbox=Box2I(minimum=Point2I(0, 0), maximum=Point2I(0, 0)), origin=LOCAL)
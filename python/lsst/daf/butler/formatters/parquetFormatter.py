@@ -27,6 +27,7 @@ import collections.abc
 import itertools
 from typing import (
     Any,
+    BinaryIO,
     Dict,
     Iterable,
     Iterator,
@@ -50,12 +51,13 @@ class _ParquetLoader:
 
     Parameters
     ----------
-    path : `str`
-        Full path to the file to be loaded.
+    source : `str` or file-like object
+        Full path to the file to be loaded, or a seekable binary file-like
+        object.  Only the footer and the column chunks read are accessed.
     """
 
-    def __init__(self, path: str):
-        self.file = pq.ParquetFile(path)
+    def __init__(self, source: Union[str, BinaryIO]):
+        self.file = pq.ParquetFile(source)
         self.md = json.loads(self.file.metadata.metadata[b"pandas"])
         indexes = self.md["column_indexes"]
         if len(indexes) == 1:
@@ -167,7 +169,15 @@ class ParquetFormatter(Formatter):
 
     def read(self, component: Optional[str] = None) -> object:
         # Docstring inherited from Formatter.read.
-        loader = _ParquetLoader(self.fileDescriptor.location.path)
+        return self._read(_ParquetLoader(self.fileDescriptor.location.path), component)
+
+    def fromFile(self, fileObj: BinaryIO, component: Optional[str] = None) -> object:
+        # Docstring inherited from Formatter.fromFile.
+        return self._read(_ParquetLoader(fileObj), component)
+
+    def _read(self, loader: _ParquetLoader, component: Optional[str] = None) -> object:
+        """Read the dataset or a component with the given loader.
+        """
         if component == 'columns':
             return loader.columns
 
@@ -24,15 +24,17 @@ from __future__ import annotations
 __all__ = ("Registry", "AmbiguousDatasetError", "ConflictingDefinitionError", "OrphanedRecordError")
 
 import contextlib
-import sys
+import itertools
 from typing import (
     Any,
+    Dict,
     FrozenSet,
     Iterable,
     Iterator,
     List,
     Mapping,
     Optional,
+    Sequence,
     Set,
     Type,
     TYPE_CHECKING,
@@ -57,7 +59,7 @@ from ..core import (
 )
 from ..core.dimensions.storage import setupDimensionStorage
 from ..core import ddl
-from ..core.utils import doImport, iterable, transactional, NamedKeyDict
+from ..core.utils import chunkIterable, doImport, iterable, transactional, NamedKeyDict
 from ._config import RegistryConfig
 from .queries import (
     CollectionsExpression,
@@ -76,6 +78,17 @@ if TYPE_CHECKING:
     from .interfaces import Database, OpaqueTableStorageManager
 
 
+_EXPAND_BATCH_SIZE = 1000
+"""Number of query result rows whose data IDs are expanded together by
+`Registry.queryDimensions` and `Registry.queryDatasets` (`int`).
+"""
+
+_IN_CLAUSE_BATCH_SIZE = 500
+"""Maximum number of values in a single SQL ``IN`` expression used by bulk
+lookups (`int`).
+"""
+
+
 class AmbiguousDatasetError(Exception):
     """Exception raised when a `DatasetRef` has no ID and a `Registry`
     operation requires one.
@@ -210,6 +223,7 @@ class Registry:
                                                       universe=self.dimensions,
                                                       tables=self._tables._asdict())
         self._datasetTypes = {}
+        self._datasetTypeCount = None  # number of DatasetTypes at last full load
         self._runIdsByName = {}   # key = name, value = id
         self._runNamesById = {}   # key = id, value = name
 
@@ -239,6 +253,7 @@ class Registry:
             for storage in self._dimensionStorage.values():
                 storage.clearCaches()
             self._datasetTypes.clear()
+            self._datasetTypeCount = None
             raise
 
     def registerOpaqueTable(self, tableName: str, spec: ddl.TableSpec):
@@ -273,7 +288,7 @@ class Registry:
         """
         self._opaque[tableName].insert(*data)
 
-    def fetchOpaqueData(self, tableName: str, **where: Any) -> Iterator[dict]:
+    def fetchOpaqueData(self, tableName: str, orderBy: Optional[str] = None, **where: Any) -> Iterator[dict]:
         """Retrieve records from an opaque table.
 
         Parameters
@@ -281,18 +296,22 @@ class Registry:
         tableName : `str`
             Logical name of the opaque table.  Must match the name used in a
             previous call to `registerOpaqueTable`.
+        orderBy : `str`, optional
+            Name of a column to sort the records by.  If `None`, the order is
+            undefined.
         where
             Additional keyword arguments are interpreted as equality
             constraints that restrict the returned rows (combined with AND);
             keyword arguments are column names and values are the values they
-            must have.
+            must have.  A `list`, `tuple`, or `set` value matches any of its
+            elements (an ``IN`` constraint).
 
         Yields
         ------
         row : `dict`
             A dictionary representing a single result row.
         """
-        yield from self._opaque[tableName].fetch(**where)
+        yield from self._opaque[tableName].fetch(orderBy=orderBy, **where)
 
     @transactional
     def deleteOpaqueData(self, tableName: str, **where: Any):
@@ -455,6 +474,8 @@ class Registry:
                     )
                 # Update the cache.
                 self._datasetTypes[datasetType.name] = datasetType
+                if self._datasetTypeCount is not None:
+                    self._datasetTypeCount += 1
                 # Also register component DatasetTypes (if any).
                 for compName, compStorageClass in datasetType.storageClass.components.items():
                     compType = DatasetType(datasetType.componentTypeName(compName),
@@ -489,32 +510,12 @@ class Registry:
         """
         datasetType = self._datasetTypes.get(name)
         if datasetType is None:
-            # Get StorageClass from DatasetType table
-            result = self._db.query(
-                sqlalchemy.sql.select(
-                    [self._tables.dataset_type.c.storage_class]
-                ).where(
-                    self._tables.dataset_type.columns.dataset_type_name == name
-                )
-            ).fetchone()
-
-            if result is None:
+            # The DatasetType may have been registered by another client since
+            # we last loaded them all, so load them all again.
+            self._refreshDatasetTypes()
+            datasetType = self._datasetTypes.get(name)
+            if datasetType is None:
                 raise KeyError("Could not find entry for datasetType {}".format(name))
-
-            storageClass = self.storageClasses.getStorageClass(result["storage_class"])
-            # Get Dimensions (if any) from DatasetTypeDimensions table
-            result = self._db.query(
-                sqlalchemy.sql.select(
-                    [self._tables.dataset_type_dimensions.columns.dimension_name]
-                ).where(
-                    self._tables.dataset_type_dimensions.columns.dataset_type_name == name
-                )
-            ).fetchall()
-            dimensions = DimensionGraph(self.dimensions, names=(r[0] for r in result) if result else ())
-            datasetType = DatasetType(name=name,
-                                      storageClass=storageClass,
-                                      dimensions=dimensions)
-            self._datasetTypes[name] = datasetType
         return datasetType
 
     def getAllDatasetTypes(self) -> FrozenSet[DatasetType]:
@@ -524,17 +525,62 @@ class Registry:
         -------
         types : `frozenset` of `DatasetType`
             Every `DatasetType` in the registry.
+
+        Notes
+        -----
+        DatasetTypes are cached after they are first loaded.  Because they
+        can never be removed, this only needs to count the rows in the
+        ``dataset_type`` table to determine whether the cache is up to date
+        (other clients may have registered new DatasetTypes).
         """
-        # Get all the registered names
-        result = self._db.query(
+        count = self._db.query(
             sqlalchemy.sql.select(
-                [self._tables.dataset_type.columns.dataset_type_name]
+                [sqlalchemy.sql.func.count()]
+            ).select_from(
+                self._tables.dataset_type
+            )
+        ).scalar()
+        if count != self._datasetTypeCount:
+            self._refreshDatasetTypes()
+        return frozenset(self._datasetTypes.values())
+
+    def _refreshDatasetTypes(self):
+        """Load all `DatasetType` definitions into the cache with a single
+        query.
+        """
+        t = self._tables
+        results = self._db.query(
+            sqlalchemy.sql.select([
+                t.dataset_type.columns.dataset_type_name,
+                t.dataset_type.columns.storage_class,
+                t.dataset_type_dimensions.columns.dimension_name,
+            ]).select_from(
+                t.dataset_type.outerjoin(
+                    t.dataset_type_dimensions,
+                    (t.dataset_type.columns.dataset_type_name ==
+                     t.dataset_type_dimensions.columns.dataset_type_name)
+                )
             )
         ).fetchall()
-        if result is None:
-            return frozenset()
-        datasetTypeNames = [r[0] for r in result]
-        return frozenset(self.getDatasetType(name) for name in datasetTypeNames)
+        grouped = {}
+        for datasetTypeName, storageClassName, dimensionName in results:
+            _, dimensionNames = grouped.setdefault(datasetTypeName, (storageClassName, set()))
+            if dimensionName is not None:
+                dimensionNames.add(dimensionName)
+        datasetTypes = {}
+        for datasetTypeName, (storageClassName, dimensionNames) in grouped.items():
+            datasetType = self._datasetTypes.get(datasetTypeName)
+            if datasetType is None:
+                # Pass the StorageClass by name, so it is only looked up when
+                # it is actually used.
+                datasetType = DatasetType(
+                    name=datasetTypeName,
+                    storageClass=storageClassName,
+                    dimensions=DimensionGraph(self.dimensions, names=dimensionNames)
+                )
+            datasetTypes[datasetTypeName] = datasetType
+        self._datasetTypes = datasetTypes
+        self._datasetTypeCount = len(datasetTypes)
 
     def _makeDatasetRefFromRow(self, row: sqlalchemy.engine.RowProxy,
                                datasetType: Optional[DatasetType] = None,
@@ -562,23 +608,68 @@ class Registry:
         ref : `DatasetRef`.
             A new `DatasetRef` instance.
         """
-        if datasetType is None:
-            datasetType = self.getDatasetType(row["dataset_type_name"])
-        run = self._getRunNameFromId(row["run_id"])
-        datasetRefHash = row["dataset_ref_hash"]
-        if dataId is None:
-            # TODO: should we expand here?
-            dataId = DataCoordinate.standardize(
-                row,
-                graph=datasetType.dimensions,
-                universe=self.dimensions
-            )
-        # Get components (if present)
-        components = {}
-        if datasetType.storageClass.isComposite():
-            t = self._tables
-            columns = list(t.dataset.columns)
-            columns.append(t.dataset_composition.columns.component_name)
+        ref, = self._makeDatasetRefsFromRows([row], datasetTypes=[datasetType], dataIds=[dataId])
+        return ref
+
+    def _makeDatasetRefsFromRows(self, rows: Sequence[sqlalchemy.engine.RowProxy],
+                                 datasetTypes: Optional[Sequence[Optional[DatasetType]]] = None,
+                                 dataIds: Optional[Sequence[Optional[DataCoordinate]]] = None
+                                 ) -> List[DatasetRef]:
+        """Construct DatasetRefs from the results of a query on the Dataset
+        table.
+
+        This fetches the components of all composite datasets with one query
+        per level of component nesting (per batch of parent datasets), rather
+        than one query per dataset.
+
+        Parameters
+        ----------
+        rows : sequence of `sqlalchemy.engine.RowProxy`
+            Rows of a query that contains all columns from the `Dataset`
+            table.  May include additional fields (which will be ignored).
+        datasetTypes : sequence of `DatasetType` or `None`, optional
+            `DatasetType` associated with each row.  Entries that are `None`
+            will be retrieved; others are guaranteed by the caller to be
+            consistent with what would have been retrieved.
+        dataIds : sequence of `DataCoordinate` or `None`, optional
+            Data ID associated with each row, with the same behavior as
+            ``datasetTypes``.
+
+        Returns
+        -------
+        refs : `list` of `DatasetRef`
+            New `DatasetRef` instances, in the same order as ``rows``.
+        """
+        if datasetTypes is None:
+            datasetTypes = [None]*len(rows)
+        if dataIds is None:
+            dataIds = [None]*len(rows)
+        refs = []
+        for row, datasetType, dataId in zip(rows, datasetTypes, dataIds):
+            if datasetType is None:
+                datasetType = self.getDatasetType(row["dataset_type_name"])
+            if dataId is None:
+                # TODO: should we expand here?
+                dataId = DataCoordinate.standardize(
+                    row,
+                    graph=datasetType.dimensions,
+                    universe=self.dimensions
+                )
+            refs.append(DatasetRef(datasetType=datasetType, dataId=dataId, id=row["dataset_id"],
+                                   run=self._getRunNameFromId(row["run_id"]),
+                                   hash=row["dataset_ref_hash"]))
+        # Get components (if present) for all composites at once.
+        parents = {ref.id: ref for ref in refs if ref.datasetType.storageClass.isComposite()}
+        if not parents:
+            return refs
+        t = self._tables
+        columns = list(t.dataset.columns)
+        columns.append(t.dataset_composition.columns.component_name)
+        columns.append(t.dataset_composition.columns.parent_dataset_id)
+        componentRows = []
+        componentDatasetTypes = []
+        componentDataIds = []
+        for chunk in chunkIterable(parents.keys(), _IN_CLAUSE_BATCH_SIZE):
             results = self._db.query(
                 sqlalchemy.sql.select(
                     columns
@@ -588,27 +679,31 @@ class Registry:
                         (t.dataset.columns.dataset_id == t.dataset_composition.columns.component_dataset_id)
                     )
                 ).where(
-                    t.dataset_composition.columns.parent_dataset_id == row["dataset_id"]
+                    t.dataset_composition.columns.parent_dataset_id.in_(chunk)
                 )
             ).fetchall()
             for result in results:
+                parent = parents[result["parent_dataset_id"]]
                 componentName = result["component_name"]
-                componentDatasetType = DatasetType(
-                    DatasetType.nameWithComponent(datasetType.name, componentName),
-                    dimensions=datasetType.dimensions,
-                    storageClass=datasetType.storageClass.components[componentName]
-                )
-                components[componentName] = self._makeDatasetRefFromRow(result, dataId=dataId,
-                                                                        datasetType=componentDatasetType)
-            if not components.keys() <= datasetType.storageClass.components.keys():
-                raise RuntimeError(
-                    f"Inconsistency detected between dataset and storage class definitions: "
-                    f"{datasetType.storageClass.name} has components "
-                    f"{set(datasetType.storageClass.components.keys())}, "
-                    f"but dataset has components {set(components.keys())}"
-                )
-        return DatasetRef(datasetType=datasetType, dataId=dataId, id=row["dataset_id"], run=run,
-                          hash=datasetRefHash, components=components)
+                if componentName not in parent.datasetType.storageClass.components:
+                    raise RuntimeError(
+                        f"Inconsistency detected between dataset and storage class definitions: "
+                        f"{parent.datasetType.storageClass.name} has components "
+                        f"{set(parent.datasetType.storageClass.components.keys())}, "
+                        f"but dataset has component {componentName}"
+                    )
+                componentRows.append(result)
+                componentDatasetTypes.append(DatasetType(
+                    DatasetType.nameWithComponent(parent.datasetType.name, componentName),
+                    dimensions=parent.datasetType.dimensions,
+                    storageClass=parent.datasetType.storageClass.components[componentName]
+                ))
+                componentDataIds.append(parent.dataId)
+        componentRefs = self._makeDatasetRefsFromRows(componentRows, datasetTypes=componentDatasetTypes,
+                                                      dataIds=componentDataIds)
+        for result, componentRef in zip(componentRows, componentRefs):
+            parents[result["parent_dataset_id"]]._components[result["component_name"]] = componentRef
+        return refs
 
     def find(self, collection: str, datasetType: Union[DatasetType, str], dataId: Optional[DataId] = None,
              **kwds: Any) -> Optional[DatasetRef]:
@@ -662,6 +757,71 @@ class Registry:
             return None
         return self._makeDatasetRefFromRow(result, datasetType=datasetType, dataId=dataId)
 
+    def findDatasets(self, datasetType: Union[DatasetType, str], dataIds: Iterable[DataId],
+                     collections: Sequence[str]) -> Dict[DataCoordinate, DatasetRef]:
+        """Lookup many datasets of the same type at once.
+
+        This is equivalent to calling `find` for each data ID and each
+        collection in turn (stopping at the first collection in which a
+        dataset is found), but uses a few bulk queries for all data IDs.
+
+        Parameters
+        ----------
+        datasetType : `DatasetType` or `str`
+            A `DatasetType` or the name of one.
+        dataIds : iterable of `dict` or `DataCoordinate`
+            Data IDs that identify the datasets within a collection.
+        collections : sequence of `str`
+            Names of the collections to search, in order.
+
+        Returns
+        -------
+        refs : `dict` [`DataCoordinate`, `DatasetRef`]
+            Refs for the datasets that were found, keyed by data ID.  Data IDs
+            for which no dataset was found in any collection are not included.
+            The data ID of each ref is the one given in ``dataIds`` (after
+            standardization).
+
+        Raises
+        ------
+        LookupError
+            If one or more data ID keys are missing.
+        """
+        if not isinstance(datasetType, DatasetType):
+            datasetType = self.getDatasetType(datasetType)
+        # The dataset_ref_hash column is a hash of the dataset type name and
+        # data ID, and there is a unique index on it and the collection, so we
+        # can compute it up front and search on just that.
+        remaining = {}
+        for dataId in dataIds:
+            dataId = DataCoordinate.standardize(dataId, graph=datasetType.dimensions,
+                                                universe=self.dimensions)
+            remaining[DatasetRef(datasetType, dataId).hash] = dataId
+        t = self._tables
+        results = {}
+        for collection in collections:
+            if not remaining:
+                break
+            rows = []
+            for chunk in chunkIterable(remaining.keys(), _IN_CLAUSE_BATCH_SIZE):
+                rows.extend(
+                    self._db.query(
+                        t.dataset.select().select_from(
+                            t.dataset.join(t.dataset_collection)
+                        ).where(
+                            sqlalchemy.sql.and_(
+                                t.dataset_collection.columns.collection == collection,
+                                t.dataset_collection.columns.dataset_ref_hash.in_(chunk),
+                            )
+                        )
+                    ).fetchall()
+                )
+            foundDataIds = [remaining.pop(row["dataset_ref_hash"]) for row in rows]
+            refs = self._makeDatasetRefsFromRows(rows, datasetTypes=[datasetType]*len(rows),
+                                                 dataIds=foundDataIds)
+            results.update(zip(foundDataIds, refs))
+        return results
+
     @transactional
     def insertDatasets(self, datasetType: Union[DatasetType, str], dataIds: Iterable[DataId],
                        run: str, *, producer: Optional[Quantum] = None, recursive: bool = False
@@ -777,6 +937,34 @@ class Registry:
             return None
         return self._makeDatasetRefFromRow(result, datasetType=datasetType, dataId=dataId)
 
+    def getDatasets(self, ids: Iterable[int]) -> Dict[int, DatasetRef]:
+        """Retrieve many Dataset entries at once.
+
+        This is equivalent to calling `getDataset` for each ID, but uses a
+        few bulk queries for all of them.
+
+        Parameters
+        ----------
+        ids : iterable of `int`
+            The unique identifiers for the Datasets.
+
+        Returns
+        -------
+        refs : `dict` [`int`, `DatasetRef`]
+            Refs for the Datasets, keyed by ID.  IDs for which no Dataset
+            was found are not included.
+        """
+        rows = []
+        for chunk in chunkIterable(set(ids), _IN_CLAUSE_BATCH_SIZE):
+            rows.extend(
+                self._db.query(
+                    self._tables.dataset.select().where(
+                        self._tables.dataset.columns.dataset_id.in_(chunk)
+                    )
+                ).fetchall()
+            )
+        return {ref.id: ref for ref in self._makeDatasetRefsFromRows(rows)}
+
     @transactional
     def removeDataset(self, ref: DatasetRef):
         """Remove a dataset from the Registry.
@@ -1068,6 +1256,94 @@ class Registry:
                 records.update((d, None) for d in element.implied)
         return ExpandedDataCoordinate(standardized.graph, standardized.values(), records=records)
 
+    def expandDataIds(self, dataIds: Iterable[DataId], *, graph: Optional[DimensionGraph] = None,
+                      records: Optional[Mapping[DimensionElement, DimensionRecord]] = None,
+                      dataIdRecords: Optional[Iterable[Mapping[DimensionElement,
+                                                               Optional[DimensionRecord]]]] = None
+                      ) -> List[ExpandedDataCoordinate]:
+        """Expand many dimension-based data IDs at once.
+
+        This is equivalent to calling `expandDataId` on each data ID, but it
+        fetches the dimension records for all of them with a few bulk queries
+        per `DimensionElement` instead of one query per element per data ID.
+
+        Parameters
+        ----------
+        dataIds : iterable of `DataCoordinate` or `dict`
+            Data IDs to be expanded.
+        graph : `DimensionGraph`, optional
+            Set of dimensions for the expanded IDs.  If `None`, the dimensions
+            will be inferred from the keys of each data ID.
+        records : mapping [`DimensionElement`, `DimensionRecord`], optional
+            Dimension record data to use (for all data IDs) before querying
+            the database for that data.
+        dataIdRecords : iterable of mapping, optional
+            Dimension record data to use for each data ID, in the same order
+            as ``dataIds``.  Takes precedence over ``records``.  A `None`
+            value indicates that the record is known not to exist (e.g.
+            because an implied dimension value is NULL).
+
+        Returns
+        -------
+        expanded : `list` of `ExpandedDataCoordinate`
+            Expanded data IDs, in the same order as ``dataIds``.
+
+        Raises
+        ------
+        LookupError
+            Raised if a record for a required dimension of any data ID could
+            not be found.
+        """
+        results = []
+        # Lists of (index into results, keys, records) for each graph of the
+        # data IDs that actually need to be expanded.
+        todo = {}
+        if dataIdRecords is None:
+            dataIdRecords = itertools.repeat(None)
+        for dataId, extraRecords in zip(dataIds, dataIdRecords):
+            standardized = DataCoordinate.standardize(dataId, graph=graph, universe=self.dimensions)
+            if isinstance(standardized, ExpandedDataCoordinate):
+                results.append(standardized)
+                continue
+            recordsForDataId = dict(records) if records is not None else {}
+            if isinstance(dataId, ExpandedDataCoordinate):
+                recordsForDataId.update(dataId.records)
+            if extraRecords is not None:
+                recordsForDataId.update(extraRecords)
+            todo.setdefault(standardized.graph, []).append((len(results), dict(standardized),
+                                                            recordsForDataId))
+            results.append(standardized)
+        for subgraph, group in todo.items():
+            for element in subgraph._primaryKeyTraversalOrder:
+                # Gather the data IDs we need records for, and fetch them all
+                # at once.
+                needed = {}
+                for index, keys, recordsForDataId in group:
+                    # Use ... to mean not found; None might mean NULL.
+                    if recordsForDataId.get(element.name, ...) is ...:
+                        needed[index] = DataCoordinate.standardize(keys, graph=element.graph)
+                if needed:
+                    fetched = self._dimensionStorage[element].fetchMany(set(needed.values()))
+                    for index, keys, recordsForDataId in group:
+                        elementDataId = needed.get(index)
+                        if elementDataId is not None:
+                            recordsForDataId[element] = fetched.get(elementDataId)
+                for index, keys, recordsForDataId in group:
+                    record = recordsForDataId.get(element.name)
+                    if record is not None:
+                        keys.update((d, getattr(record, d.name)) for d in element.implied)
+                    else:
+                        if element in subgraph.required:
+                            raise LookupError(
+                                f"Could not fetch record for required dimension {element.name} "
+                                f"via keys {keys}."
+                            )
+                        recordsForDataId.update((d, None) for d in element.implied)
+            for index, keys, recordsForDataId in group:
+                results[index] = ExpandedDataCoordinate(subgraph, results[index].values(),
+                                                        records=recordsForDataId)
+        return results
+
     def insertDimensionData(self, element: Union[DimensionElement, str],
                             *data: Union[dict, DimensionRecord],
                             conform: bool = True):
@@ -1181,15 +1457,20 @@ class Registry:
         builder = self.makeQueryBuilder(summary)
         for datasetType, collections in standardizedDatasets.items():
             builder.joinDataset(datasetType, collections, isResult=False)
-        query = builder.finish()
+        query = builder.finish(expand=expand)
         predicate = query.predicate()
-        for row in query.execute():
-            if predicate(row):
-                result = query.extractDataId(row)
-                if expand:
-                    yield self.expandDataId(result, records=standardizedDataId.records)
-                else:
-                    yield result
+        rows = (row for row in query.rows() if predicate(row))
+        if expand:
+            # Records for most dimension elements are included in the query
+            # results; expand data IDs in batches so any others can be
+            # fetched in bulk.
+            for chunk in chunkIterable(rows, _EXPAND_BATCH_SIZE):
+                yield from self.expandDataIds([query.extractDataId(row) for row in chunk],
+                                              records=standardizedDataId.records,
+                                              dataIdRecords=[query.extractDimensionRecords(row)
+                                                             for row in chunk])
+        else:
+            yield from (query.extractDataId(row) for row in rows)
 
     def queryDatasets(self, datasetType: DatasetTypeExpression, *,
                       collections: CollectionsExpression,
@@ -1293,41 +1574,40 @@ class Registry:
         )
         builder = self.makeQueryBuilder(summary)
         # Add the dataset subquery to the query, telling the QueryBuilder to
-        # include the rank of the selected collection in the results only if we
-        # need to deduplicate.  Note that if any of the collections are
+        # keep only the dataset from the first collection in which each data
+        # ID appears if we need to deduplicate; that happens in the database,
+        # so results can be streamed.  Note that if any of the collections are
         # actually wildcard expressions, and we've asked for deduplication,
         # this will raise TypeError for us.
-        builder.joinDataset(datasetType, collections, isResult=True, addRank=deduplicate)
-        query = builder.finish()
+        builder.joinDataset(datasetType, collections, isResult=True, deduplicate=deduplicate)
+        query = builder.finish(expand=expand)
         predicate = query.predicate()
-        if not deduplicate or len(collections) == 1:
-            # No need to de-duplicate across collections.
-            for row in query.execute():
-                if predicate(row):
-                    dataId = query.extractDataId(row, graph=datasetType.dimensions)
-                    if expand:
-                        dataId = self.expandDataId(dataId, records=standardizedDataId.records)
+        results = ((row, query.extractDataId(row, graph=datasetType.dimensions))
+                   for row in query.rows() if predicate(row))
+        if deduplicate and summary.requested != datasetType.dimensions:
+            # Each dataset may still appear in multiple rows, with different
+            # values for the extra dimensions; only yield it once.
+            def unique(results):
+                seen = set()
+                for row, dataId in results:
+                    if dataId not in seen:
+                        seen.add(dataId)
+                        yield row, dataId
+            results = unique(results)
+        if expand:
+            # Records for most dimension elements are included in the query
+            # results; expand data IDs in batches so any others can be fetched
+            # in bulk.
+            for chunk in chunkIterable(results, _EXPAND_BATCH_SIZE):
+                dataIds = self.expandDataIds([dataId for _, dataId in chunk],
+                                             records=standardizedDataId.records,
+                                             dataIdRecords=[query.extractDimensionRecords(row)
+                                                            for row, _ in chunk])
+                for (row, _), dataId in zip(chunk, dataIds):
                     yield query.extractDatasetRef(row, datasetType, dataId)[0]
         else:
-            # For each data ID, yield only the DatasetRef with the lowest
-            # collection rank.
-            bestRefs = {}
-            bestRanks = {}
-            for row in query.execute():
-                if predicate(row):
-                    ref, rank = query.extractDatasetRef(row, datasetType)
-                    bestRank = bestRanks.get(ref.dataId, sys.maxsize)
-                    if rank < bestRank:
-                        bestRefs[ref.dataId] = ref
-                        bestRanks[ref.dataId] = rank
-            # If caller requested expanded data IDs, we defer that until here
-            # so we do as little expansion as possible.
-            if expand:
-                for ref in bestRefs.values():
-                    dataId = self.expandDataId(ref.dataId, records=standardizedDataId.records)
-                    yield ref.expanded(dataId)
-            else:
-                yield from bestRefs.values()
+            for row, dataId in results:
+                yield query.extractDatasetRef(row, datasetType, dataId)[0]
 
     dimensions: DimensionUniverse
     """The universe of all dimensions known to the registry
@@ -24,7 +24,7 @@ __all__ = ["OracleDatabase"]
 
 from contextlib import closing, contextmanager
 import copy
-from typing import Optional
+from typing import List, Optional
 
 import sqlalchemy
 import sqlalchemy.ext.compiler
@@ -201,6 +201,21 @@ class OracleDatabase(Database):
             name = self.prefix + name
         return super().getExistingTable(name, spec)
 
+    def insert(self, table: sqlalchemy.schema.Table, *rows: dict, returnIds: bool = False,
+               ) -> Optional[List[int]]:
+        column = self._getAutoincrementColumn(table)
+        if not returnIds or not rows or column is None or column.name in rows[0]:
+            return super().insert(table, *rows, returnIds=returnIds)
+        if not self.isWriteable():
+            raise ReadOnlyDatabaseError(f"Attempt to insert into read-only database '{self}'.")
+        # Prefetch all of the sequence values we need in one query, then do a
+        # bulk insert with the IDs set explicitly.
+        sequence = self._connection.dialect.identifier_preparer.format_sequence(column.default)
+        query = sqlalchemy.sql.text(f"SELECT {sequence}.NEXTVAL FROM DUAL CONNECT BY LEVEL <= :n")
+        ids = [row[0] for row in self._connection.execute(query, n=len(rows)).fetchall()]
+        super().insert(table, *[dict(row, **{column.name: id}) for row, id in zip(rows, ids)])
+        return ids
+
     def replace(self, table: sqlalchemy.schema.Table, *rows: dict):
         if not self.isWriteable():
             raise ReadOnlyDatabaseError(f"Attempt to replace into read-only database '{self}'.")
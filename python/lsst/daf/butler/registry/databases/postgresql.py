@@ -23,7 +23,7 @@ from __future__ import annotations
 __all__ = ["PostgresqlDatabase"]
 
 from contextlib import contextmanager, closing
-from typing import Optional
+from typing import List, Optional
 
 import sqlalchemy
 
@@ -101,6 +101,20 @@ class PostgresqlDatabase(Database):
     def expandDatabaseEntityName(self, shrunk: str) -> str:
         return self._shrinker.expand(shrunk)
 
+    def insert(self, table: sqlalchemy.schema.Table, *rows: dict, returnIds: bool = False,
+               ) -> Optional[List[int]]:
+        column = self._getAutoincrementColumn(table)
+        if not returnIds or not rows or column is None or column.name in rows[0]:
+            return super().insert(table, *rows, returnIds=returnIds)
+        if not self.isWriteable():
+            raise ReadOnlyDatabaseError(f"Attempt to insert into read-only database '{self}'.")
+        # Use a single multi-row INSERT ... RETURNING, with the sequence
+        # called explicitly for each row.  PostgreSQL returns rows in the
+        # order of the VALUES clause.
+        nextval = column.default.next_value()
+        query = table.insert().values([dict(row, **{column.name: nextval}) for row in rows])
+        return [row[0] for row in self._connection.execute(query.returning(column)).fetchall()]
+
     def replace(self, table: sqlalchemy.schema.Table, *rows: dict):
         if not self.isWriteable():
             raise ReadOnlyDatabaseError(f"Attempt to replace into read-only database '{self}'.")
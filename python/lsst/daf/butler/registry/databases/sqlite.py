@@ -82,6 +82,12 @@ def _replace(insert, compiler, **kw):
     return result
 
 
+_SQLITE_MAX_VARIABLE_NUMBER = 999
+"""The maximum number of bound parameters in a single SQLite statement, using
+the (conservative) default for SQLite versions older than 3.32.
+"""
+
+
 _AUTOINCR_TABLE_SPEC = ddl.TableSpec(
     fields=[ddl.FieldSpec(name="id", dtype=sqlalchemy.Integer, primaryKey=True)]
 )
@@ -304,8 +310,42 @@ class SqliteDatabase(Database):
             )
         return super()._convertTableSpec(name, spec, metadata, **kwds)
 
+    def _insertWithRowIds(self, table: sqlalchemy.schema.Table, rows: List[dict]) -> List[int]:
+        """Insert rows into a table whose autoincrement key is the SQLite
+        rowid, returning the generated values.
+
+        Parameters
+        ----------
+        table : `sqlalchemy.schema.Table`
+            Table rows should be inserted into.
+        rows : `list` of `dict`
+            Rows to insert, none of which may include the autoincrement key.
+
+        Returns
+        -------
+        ids : `list` of `int`
+            The generated autoincrement values, in the same order as ``rows``.
+
+        Notes
+        -----
+        Rows are inserted with multi-row ``INSERT`` statements.  Because each
+        statement is executed while holding the write lock (we always
+        ``BEGIN IMMEDIATE``), SQLite assigns it a contiguous range of rowids
+        ending at ``lastrowid``.
+        """
+        ids = []
+        chunkSize = max(1, _SQLITE_MAX_VARIABLE_NUMBER // max(1, len(rows[0])))
+        with self.transaction():
+            for start in range(0, len(rows), chunkSize):
+                chunk = rows[start:start + chunkSize]
+                last = self._connection.execute(table.insert().values(chunk)).lastrowid
+                ids.extend(range(last - len(chunk) + 1, last + 1))
+        return ids
+
     def insert(self, table: sqlalchemy.schema.Table, *rows: dict, returnIds: bool = False,
                ) -> Optional[List[int]]:
+        if not self.isWriteable():
+            raise ReadOnlyDatabaseError(f"Attempt to insert into read-only database '{self}'.")
         autoincr = self._autoincr.get(table.name)
         if autoincr is not None:
             # This table has a compound primary key that includes an
@@ -336,18 +376,12 @@ class SqliteDatabase(Database):
                 # because we can't safely generate autoincrement values
                 # otherwise.
                 assert all(autoincr.column not in row and row["origin"] == self.origin for row in rows)
-                # Insert into the autoincr table one by one to get the
-                # primary key values back, then insert into the target table
+                # Insert NULLs into the autoincr table in bulk to get a block
+                # of primary key values, then insert into the target table
                 # in the same transaction.
                 with self.transaction():
-                    newRows = []
-                    ids = []
-                    for row in rows:
-                        newRow = row.copy()
-                        id = self._connection.execute(autoincr.table.insert()).inserted_primary_key[0]
-                        newRow[autoincr.column] = id
-                        newRows.append(newRow)
-                        ids.append(id)
+                    ids = self._insertWithRowIds(autoincr.table, [{"id": sqlalchemy.sql.null()}] * len(rows))
+                    newRows = [dict(row, **{autoincr.column: id}) for row, id in zip(rows, ids)]
                     # Don't ever ask to returnIds here, because we've already
                     # got them.
                     super().insert(table, *newRows)
@@ -355,8 +389,10 @@ class SqliteDatabase(Database):
                     return ids
                 else:
                     return None
-        else:
-            return super().insert(table, *rows, returnIds=returnIds)
+        column = self._getAutoincrementColumn(table)
+        if returnIds and rows and column is not None and column.name not in rows[0]:
+            return self._insertWithRowIds(table, list(rows))
+        return super().insert(table, *rows, returnIds=returnIds)
 
     def replace(self, table: sqlalchemy.schema.Table, *rows: dict):
         if not self.isWriteable():
@@ -555,6 +555,30 @@ class Database(ABC):
         assert spec.doc is None or isinstance(spec.doc, str), f"Bad doc for {name}."
         return sqlalchemy.schema.Table(name, metadata, *args, comment=spec.doc, info=spec, **kwds)
 
+    def _getAutoincrementColumn(self, table: sqlalchemy.schema.Table) -> Optional[sqlalchemy.schema.Column]:
+        """Return the autoincrement column of a table created by this
+        `Database`.
+
+        Parameters
+        ----------
+        table : `sqlalchemy.schema.Table`
+            Table to inspect; must have been created by `_convertTableSpec`.
+
+        Returns
+        -------
+        column : `sqlalchemy.schema.Column` or `None`
+            The column whose `ddl.FieldSpec` has ``autoincrement=True``, or
+            `None` if there is no such column.  Its ``default`` attribute is
+            the `sqlalchemy.Sequence` added by `_convertFieldSpec`.
+        """
+        spec = table.info
+        if not isinstance(spec, ddl.TableSpec):
+            return None
+        for fieldSpec in spec.fields:
+            if fieldSpec.autoincrement:
+                return table.columns[fieldSpec.name]
+        return None
+
     def ensureTableExists(self, name: str, spec: ddl.TableSpec) -> sqlalchemy.sql.FromClause:
         """Ensure that a table with the given name and specification exists,
         creating it if necessary.
@@ -856,7 +880,10 @@ class Database(ABC):
         `True`.
 
         Derived classes should reimplement when they can provide a more
-        efficient implementation (especially for the latter case).
+        efficient implementation (especially for the latter case).  All
+        implementations provided with daf_butler do so, and issue a number of
+        statements that scales with the number of batches rather than the
+        number of rows.
 
         May be used inside transaction contexts, so implementations may not
         perform operations that interrupt transactions.
@@ -61,16 +61,21 @@ class OpaqueTableStorage(ABC):
         raise NotImplementedError()
 
     @abstractmethod
-    def fetch(self, **where: Any) -> Iterator[dict]:
+    def fetch(self, orderBy: Optional[str] = None, **where: Any) -> Iterator[dict]:
         """Retrieve records from an opaque table.
 
         Parameters
         ----------
+        orderBy : `str`, optional
+            Name of a column to sort the records by.  If `None`, the order is
+            undefined.
         **where
             Additional keyword arguments are interpreted as equality
             constraints that restrict the returned rows (combined with AND);
             keyword arguments are column names and values are the values they
-            must have.
+            must have.  If a value is a `list`, `tuple`, or `set`, the column
+            must instead match any of the given values (an ``IN`` constraint),
+            allowing many records to be retrieved in a single query.
 
         Yields
         ------
@@ -65,11 +65,18 @@ class ByNameOpaqueTableStorage(OpaqueTableStorage):
         # Docstring inherited from OpaqueTableStorage.
         self._db.insert(self._table, *data)
 
-    def fetch(self, **where: Any) -> Iterator[dict]:
+    def fetch(self, orderBy: Optional[str] = None, **where: Any) -> Iterator[dict]:
         # Docstring inherited from OpaqueTableStorage.
-        sql = self._table.select().where(
-            sqlalchemy.sql.and_(*[self._table.columns[k] == v for k, v in where.items()])
-        )
+        terms = []
+        for k, v in where.items():
+            column = self._table.columns[k]
+            if isinstance(v, (list, tuple, set, frozenset)):
+                terms.append(column.in_(v))
+            else:
+                terms.append(column == v)
+        sql = self._table.select().where(sqlalchemy.sql.and_(*terms))
+        if orderBy is not None:
+            sql = sql.order_by(self._table.columns[orderBy])
         for row in self._db.query(sql):
             yield dict(row)
 
@@ -140,7 +140,7 @@ class QueryBuilder:
         self.joinTable(table, dimensions)
 
     def joinDataset(self, datasetType: DatasetType, collections: CollectionsExpression, *,
-                    isResult: bool = True, addRank: bool = False):
+                    isResult: bool = True, addRank: bool = False, deduplicate: bool = False):
         """Add a dataset search or constraint to the query.
 
         Unlike other `QueryBuilder` join methods, this *must* be called
@@ -169,11 +169,17 @@ class QueryBuilder:
             is better).  Requires that all entries in ``collections`` be
             regular strings, so there is a clear search order.  Ignored if
             ``isResult`` is `False`.
+        deduplicate : `bool`, optional
+            If `True` (`False` is default), only include the dataset from the
+            first collection in which a dataset with a particular data ID
+            appears.  Requires that all entries in ``collections`` be regular
+            strings.  Ignored if ``isResult`` is `False`.
         """
         assert datasetType.dimensions.issubset(self.summary.requested)
         table = self._datasetStorage.getDatasetSubquery(datasetType, collections=collections,
                                                         dataId=self.summary.dataId,
-                                                        isResult=isResult, addRank=addRank)
+                                                        isResult=isResult, addRank=addRank,
+                                                        deduplicate=deduplicate)
         self.joinTable(table, datasetType.dimensions)
         if isResult:
             self._columns.datasets[datasetType] = (table.columns["dataset_id"],
@@ -364,6 +370,43 @@ class QueryBuilder:
         self._sql = self._sql.where(and_(*whereTerms))
         return parameters
 
+    def _joinDimensionRecords(self):
+        """Include the fields of the records of the requested dimension
+        elements in the query, so `Query.extractDimensionRecords` can be used
+        to build them.
+
+        For internal use by `QueryBuilder` only; will be called (and should
+        only by called) by `finish` when ``expand=True``.
+
+        Notes
+        -----
+        Elements whose records are cached in memory, that are views into
+        other elements, or that are already identified by
+        `QuerySummary.dataId` are skipped, as their records can be obtained
+        without querying the database.  Tables for other elements that have
+        not already been joined are joined with a LEFT OUTER JOIN, so they
+        never change the rows returned by the query (implied dimension values
+        may be NULL).
+        """
+        for element in self.summary.requested.elements:
+            if (not element.hasTable() or element.viewOf is not None or element.cached or
+                    element in self.summary.dataId.graph.elements):
+                continue
+            fieldNames = element.RecordClass.__slots__
+            table = self._elements.get(element)
+            if table is None:
+                if self._sql is None or not all(dimension in self._columns.keys
+                                                for dimension in element.graph.required):
+                    continue
+                table = self._dimensionStorage[element].getElementTable(self.summary.dataId)
+                joinOn = [table.columns[fieldName] == self._columns.getKeyColumn(dimension)
+                          for dimension, fieldName in zip(element.graph.required, fieldNames)]
+                self._sql = self._sql.outerjoin(table, and_(*joinOn))
+            self._columns.records[element] = [
+                table.columns[fieldName].label(f"_record_{element.name}_{fieldName}")
+                for fieldName in fieldNames
+            ]
+
     def _addSelectClause(self):
         """Add a SELECT clause to the query under construction containing all
         output columns identified by the `QuerySummary` and requested in calls
@@ -379,9 +422,11 @@ class QueryBuilder:
             columns.extend(columnPair)
         for element, column in self._columns.regions.items():
             columns.append(column)
+        for element, recordColumns in self._columns.records.items():
+            columns.extend(recordColumns)
         self._sql = select(columns).select_from(self._sql)
 
-    def finish(self) -> Query:
+    def finish(self, *, expand: bool = False) -> Query:
         """Finish query constructing, returning a new `Query` instance.
 
         This automatically joins any missing dimension element tables
@@ -391,6 +436,14 @@ class QueryBuilder:
         This consumes the `QueryBuilder`; no other methods should be called
         after this one.
 
+        Parameters
+        ----------
+        expand : `bool`, optional
+            If `True` (`False` is default), also include the fields of the
+            records of the dimension elements in `QuerySummary.requested` in
+            the query results, allowing `Query.extractDimensionRecords` to
+            be used to expand data IDs without additional queries.
+
         Returns
         -------
         query : `Query`
@@ -399,6 +452,8 @@ class QueryBuilder:
             rows.
         """
         self._joinMissingDimensionElements()
+        if expand:
+            self._joinDimensionRecords()
         self._addSelectClause()
         parameters = self._addWhereClause()
         return Query(summary=self.summary, connection=self._connection,
@@ -25,7 +25,7 @@ __all__ = ("DatasetRegistryStorage", "Like", "DatasetTypeExpression", "Collectio
 from dataclasses import dataclass
 from typing import Mapping, Optional, Sequence, List, Union
 
-from sqlalchemy.sql import FromClause, select, case, and_, or_, ColumnElement
+from sqlalchemy.sql import FromClause, select, case, and_, or_, func, ColumnElement
 from sqlalchemy.engine import Connection
 
 from ...core import (
@@ -105,6 +105,17 @@ def makeCollectionsWhereExpression(column: ColumnElement,
     return or_(*terms)
 
 
+def _supportsWindowFunctions(connection: Connection) -> bool:
+    """Return `True` if the database behind a connection supports SQL window
+    functions.
+
+    All supported databases do, except SQLite before version 3.25.
+    """
+    if connection.dialect.name == "sqlite":
+        return connection.dialect.dbapi.sqlite_version_info >= (3, 25)
+    return True
+
+
 class DatasetRegistryStorage:
     """An object managing ``dataset`` and related tables in a `Registry`.
 
@@ -138,6 +149,7 @@ class DatasetRegistryStorage:
         self._datasetTypeDimensionsTable = tables["dataset_type_dimensions"]
         self._datasetTable = tables["dataset"]
         self._datasetCollectionTable = tables["dataset_collection"]
+        self._useWindowFunctions = _supportsWindowFunctions(connection)
 
     def fetchDatasetTypes(self, datasetType: DatasetTypeExpression = ..., *,
                           collections: CollectionsExpression = ...,
@@ -216,7 +228,8 @@ class DatasetRegistryStorage:
                            collections: CollectionsExpression,
                            dataId: Optional[ExpandedDataCoordinate] = None,
                            isResult: bool = True,
-                           addRank: bool = False) -> FromClause:
+                           addRank: bool = False,
+                           deduplicate: bool = False) -> FromClause:
         """Return a SQL expression that searches for a dataset of a particular
         type in one or more collections.
 
@@ -246,6 +259,15 @@ class DatasetRegistryStorage:
             is better).  Requires that all entries in ``collections`` be
             regular strings, so there is a clear search order.  Ignored if
             ``isResult`` is `False`.
+        deduplicate : `bool`, optional
+            If `True` (`False` is default), only include the dataset from the
+            first collection (in the order of ``collections``) in which a
+            dataset with a particular data ID appears.  Requires that all
+            entries in ``collections`` be regular strings, so there is a clear
+            search order.  Ignored if ``isResult`` is `False`.  A window
+            function is used to select the best dataset when the database
+            supports them; otherwise the minimum rank for each data ID is
+            computed with a GROUP BY subquery and joined back to the datasets.
 
         Returns
         -------
@@ -261,9 +283,11 @@ class DatasetRegistryStorage:
         # Only include dataset_id and the rank of the collection in the given
         # list if caller has indicated that they're going to be actually
         # selecting columns from this subquery in the larger query.
+        dimensionColumns = list(columns)
+        rank = None
         if isResult:
             columns.append(self._datasetTable.columns.dataset_id)
-            if addRank:
+            if addRank or deduplicate:
                 if collections is ...:
                     raise TypeError("Cannot rank collections when no collections are provided.")
                 ranks = {}
@@ -273,21 +297,60 @@ class DatasetRegistryStorage:
                             f"Cannot rank collections that include LIKE pattern '{collection.pattern}'."
                         )
                     ranks[collection] = n
-                columns.append(
-                    case(
-                        ranks,
-                        value=self._datasetCollectionTable.columns.collection
-                    ).label("rank")
+                rank = case(
+                    ranks,
+                    value=self._datasetCollectionTable.columns.collection
                 )
+                if addRank:
+                    columns.append(rank.label("rank"))
         whereTerms = [self._datasetTable.columns.dataset_type_name == datasetType.name]
         collectionsTerm = makeCollectionsWhereExpression(self._datasetCollectionTable.columns.collection,
                                                          collections)
         if collectionsTerm is not None:
             whereTerms.append(collectionsTerm)
+        fromClause = self._datasetTable.join(self._datasetCollectionTable)
+        if rank is not None and deduplicate and len(collections) > 1:
+            # Only the dataset from the best-ranked collection for each data
+            # ID should leave the database.
+            if self._useWindowFunctions:
+                # Number the datasets for each data ID in order of collection
+                # rank, and keep only the first.
+                columns.append(
+                    func.row_number().over(partition_by=dimensionColumns, order_by=rank).label("row_number")
+                )
+                ranked = select(
+                    columns
+                ).select_from(
+                    fromClause
+                ).where(
+                    and_(*whereTerms)
+                ).alias(f"{datasetType.name}_ranked")
+                return select(
+                    [column for column in ranked.columns if column.name != "row_number"]
+                ).where(
+                    ranked.columns.row_number == 1
+                ).alias(datasetType.name)
+            else:
+                # Find the best rank for each data ID, and join that back
+                # against the datasets; there is at most one dataset of a
+                # particular type and data ID in any collection, so this
+                # selects exactly one.
+                best = select(
+                    dimensionColumns + [func.min(rank).label("rank")]
+                ).select_from(
+                    fromClause
+                ).where(
+                    and_(*whereTerms)
+                ).group_by(
+                    *dimensionColumns
+                ).alias(f"{datasetType.name}_best")
+                joinOn = [best.columns[column.name] == column for column in dimensionColumns]
+                joinOn.append(best.columns.rank == rank)
+                fromClause = fromClause.join(best, and_(*joinOn))
         return select(
             columns
         ).select_from(
-            self._datasetTable.join(self._datasetCollectionTable)
+            fromClause
         ).where(
             and_(*whereTerms)
         ).alias(datasetType.name)
@@ -23,7 +23,7 @@ from __future__ import annotations
 __all__ = ("Query",)
 
 import itertools
-from typing import Optional, Dict, Any, Tuple, Callable
+from typing import Optional, Dict, Any, Iterator, Tuple, Callable
 
 from sqlalchemy.sql import FromClause
 from sqlalchemy.engine import RowProxy, ResultProxy, Connection
@@ -34,9 +34,12 @@ from ...core import (
     DataCoordinate,
     DatasetRef,
     DatasetType,
+    DimensionElement,
     DimensionGraph,
+    DimensionRecord,
     ExpandedDataCoordinate,
 )
+from ...core.utils import NamedKeyDict
 from ._structs import QuerySummary, QueryColumns, QueryParameters
 
 
@@ -81,6 +84,7 @@ class Query:
         self._columns = columns
         self._parameters = parameters
         self._connection = connection
+        self._records = NamedKeyDict()
 
     def predicate(self, region: Optional[Region] = None) -> Callable[[RowProxy], bool]:
         """Return a callable that can perform extra Python-side filtering of
@@ -175,6 +179,44 @@ class Query:
         values = tuple(row[self._columns.getKeyColumn(dimension)] for dimension in graph.required)
         return DataCoordinate(graph, values)
 
+    def extractDimensionRecords(self, row: RowProxy) -> NamedKeyDict[DimensionElement,
+                                                                     Optional[DimensionRecord]]:
+        """Extract dimension records from a result row.
+
+        Parameters
+        ----------
+        row : `sqlalchemy.engine.RowProxy`
+            A result row from a SQLAlchemy SELECT query.
+
+        Returns
+        -------
+        records : `NamedKeyDict`
+            Dictionary mapping `DimensionElement` to `DimensionRecord` (or
+            `None`, if the element's primary key values were NULL in the
+            row).  Only elements whose fields were included by calling
+            `QueryBuilder.finish` with ``expand=True`` are present; these may
+            be a subset of the elements in `QuerySummary.requested`.
+
+        Notes
+        -----
+        Records that appear in multiple rows are only constructed once per
+        `Query`, with later rows returning the same instance.
+        """
+        result = NamedKeyDict()
+        for element, columns in self._columns.records.items():
+            nRequired = len(element.graph.required)
+            key = tuple(row[column] for column in columns[:nRequired])
+            if any(value is None for value in key):
+                result[element] = None
+                continue
+            cache = self._records.setdefault(element, {})
+            record = cache.get(key)
+            if record is None:
+                record = element.RecordClass(*[row[column] for column in columns])
+                cache[key] = record
+            result[element] = record
+        return result
+
     def extractDatasetRef(self, row: RowProxy, datasetType: DatasetType,
                           dataId: Optional[DataCoordinate] = None) -> Tuple[DatasetRef, Optional[int]]:
         """Extract a `DatasetRef` from a result row.
@@ -230,9 +272,43 @@ class Query:
         results : `sqlalchemy.engine.ResultProxy`
             Object representing the query results; see SQLAlchemy documentation
             for more information.
+
+        Notes
+        -----
+        The query is executed with the ``stream_results`` execution option,
+        so databases that support server-side cursors (e.g. PostgreSQL) do not
+        load the full result set into client memory up front.
         """
+        connection = self._connection.execution_options(stream_results=True)
         if dataId is not None:
             params = self.bind(dataId)
-            return self._connection.execute(self.sql, params)
+            return connection.execute(self.sql, params)
         else:
-            return self._connection.execute(self.sql)
+            return connection.execute(self.sql)
+
+    def rows(self, dataId: Optional[ExpandedDataCoordinate] = None, *,
+             batchSize: int = 1000) -> Iterator[RowProxy]:
+        """Execute the query and iterate over its result rows.
+
+        Parameters
+        ----------
+        dataId : `ExpandedDataCoordinate`, optional
+            Data ID to transform into bind parameters; see `execute`.
+        batchSize : `int`, optional
+            Number of rows to fetch from the database at a time.
+
+        Yields
+        ------
+        row : `sqlalchemy.engine.RowProxy`
+            A result row.  Python-side filtering via `predicate` is not
+            applied.
+        """
+        results = self.execute(dataId)
+        try:
+            while True:
+                batch = results.fetchmany(batchSize)
+                if not batch:
+                    break
+                yield from batch
+        finally:
+            results.close()
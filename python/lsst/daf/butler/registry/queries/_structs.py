@@ -23,6 +23,7 @@ from __future__ import annotations
 __all__ = ["QuerySummary"]  # other classes here are local to subpackage
 
 import enum
+import functools
 from dataclasses import dataclass
 from typing import Optional, Tuple, List, Set, Union
 
@@ -42,6 +43,22 @@ from ...core.utils import NamedValueSet, NamedKeyDict
 from .exprParser import Node, ParserYacc
 
 
+_EXPRESSION_CACHE_SIZE = 256
+"""Maximum number of parsed user expressions to keep in memory.
+"""
+
+
+@functools.lru_cache(maxsize=_EXPRESSION_CACHE_SIZE)
+def _parseExpression(expression: str) -> Node:
+    """Parse a user expression, reusing the tree from an earlier call with
+    the same string if possible.
+
+    Trees are never modified after parsing, so they may safely be shared by
+    multiple queries.
+    """
+    return ParserYacc().parse(expression)
+
+
 class GivenTime(enum.Enum):
     """Enumeration specifying when (and if) a data ID value is provided as
     a constraint on a query.
@@ -77,8 +94,7 @@ class QueryWhereExpression:
         if expression:
             from .expressions import InspectionVisitor
             try:
-                parser = ParserYacc()
-                self.tree = parser.parse(expression)
+                self.tree = _parseExpression(expression)
             except Exception as exc:
                 raise RuntimeError(f"Failed to parse user expression `{expression}'.") from exc
             visitor = InspectionVisitor(universe)
@@ -321,6 +337,7 @@ class QueryColumns:
         self.timespans = NamedKeyDict()
         self.regions = NamedKeyDict()
         self.datasets = NamedKeyDict()
+        self.records = NamedKeyDict()
 
     keys: NamedKeyDict[Dimension, List[ColumnElement]]
     """Columns that correspond to the primary key values of dimensions
@@ -362,6 +379,17 @@ class QueryColumns:
     to a collection that appears earlier in the search path.
     """
 
+    records: NamedKeyDict[DimensionElement, List[ColumnElement]]
+    """Labeled columns that correspond to all fields of the records of
+    dimension elements (`NamedKeyDict` mapping `DimensionElement` to a `list`
+    of `ColumnElement`).
+
+    Each list is ordered the same as the ``__slots__`` of the element's
+    `DimensionRecord` subclass.  This is only populated when a query is
+    finished with ``expand=True``, and even then only for elements whose
+    records are not cached in memory.
+    """
+
     def getKeyColumn(self, dimension: Dimension) -> ColumnElement:
         """ Return one of the columns in self.keys for the given dimension.
 
@@ -76,10 +76,19 @@ class ParserLex:
     """Class which defines PLY lexer.
     """
 
+    _lexers = {}
+    """Process-wide cache of master lexers, keyed by the arguments to
+    `make_lexer`.
+    """
+
     @classmethod
     def make_lexer(cls, reflags=0, **kwargs):
         """Factory for lexers.
 
+        Building a lexer compiles all token regular expressions, so one master
+        lexer is built for each distinct set of arguments and every call
+        returns a clone of it.
+
         Returns
         -------
         `ply.lex.Lexer` instance.
@@ -89,7 +98,19 @@ class ParserLex:
         kw = dict(reflags=reflags | re.IGNORECASE | re.VERBOSE)
         kw.update(kwargs)
 
-        return lex.lex(object=cls(), **kw)
+        try:
+            key = (cls, tuple(sorted(kw.items())))
+            hash(key)
+        except TypeError:
+            # unhashable arguments (e.g. custom loggers), don't cache
+            return lex.lex(object=cls(), **kw)
+        master = cls._lexers.get(key)
+        if master is None:
+            master = lex.lex(object=cls(), **kw)
+            cls._lexers[key] = master
+        lexer = master.clone()
+        lexer.lexstatestack = []
+        return lexer
 
     # literals = ""
 
@@ -27,6 +27,7 @@ __all__ = ["ParserYacc", "ParserYaccError", "ParseError", "ParserEOFError"]
 # -------------------------------
 #  Imports of standard modules --
 # -------------------------------
+import copy
 
 # -----------------------------
 #  Imports for other modules --
@@ -100,6 +101,16 @@ class ParserEOFError(ParserYaccError):
 
 class ParserYacc:
     """Class which defines PLY grammar.
+
+    Generating LALR tables from the grammar is expensive, so they are
+    generated once per process for each distinct set of keyword arguments
+    and shared by all instances.  Each instance still has its own
+    `ply.yacc.LRParser`, so instances can be used concurrently.
+    """
+
+    _parsers = {}
+    """Process-wide cache of master parsers, keyed by the arguments to
+    `ply.yacc.yacc`.
     """
 
     def __init__(self, **kwargs):
@@ -107,7 +118,21 @@ class ParserYacc:
         kw = dict(write_tables=0, debug=False)
         kw.update(kwargs)
 
-        self.parser = yacc.yacc(module=self, **kw)
+        try:
+            key = (type(self), tuple(sorted(kw.items())))
+            hash(key)
+        except TypeError:
+            # unhashable arguments (e.g. custom loggers), don't cache
+            self.parser = yacc.yacc(module=self, **kw)
+            return
+        master = self._parsers.get(key)
+        if master is None:
+            master = yacc.yacc(module=self, **kw)
+            self._parsers[key] = master
+        # Grammar rules do not use instance state, so the rules bound to the
+        # instance that built the master are fine for every instance; a
+        # shallow copy shares the tables but not the parsing state.
+        self.parser = copy.copy(master)
 
     def parse(self, input, lexer=None, debug=False, tracking=False):
         """Parse input expression ad return parsed tree object.
@@ -295,6 +295,30 @@ class DatabaseTests(ABC):
         self.assertEqual(db.query(count.select_from(tables.a)).scalar(), 0)
         self.assertEqual(db.query(count.select_from(d)).scalar(), 0)
 
+    def testBulkInsertReturnIds(self):
+        """Test that `Database.insert` with ``returnIds=True`` returns the IDs
+        in the same order as the given rows, for batches large enough to
+        require more than one statement.
+        """
+        db = self.makeEmptyDatabase(origin=1)
+        with db.declareStaticTables(create=True) as context:
+            tables = context.addTableTuple(STATIC_TABLE_SPECS)
+        self.assertEqual(db.insert(tables.b, returnIds=True), [])
+        rows = [{"name": f"b{i}", "value": i} for i in range(2500)]
+        ids = db.insert(tables.b, *rows, returnIds=True)
+        self.assertEqual(len(set(ids)), len(rows))
+        results = {r["id"]: dict(r) for r in db.query(tables.b.select()).fetchall()}
+        self.assertEqual([results[id] for id in ids], [dict(row, id=id) for row, id in zip(rows, ids)])
+        # A second batch should get new IDs.
+        moreIds = db.insert(tables.b, *[{"name": f"c{i}", "value": i} for i in range(10)], returnIds=True)
+        self.assertFalse(set(ids) & set(moreIds))
+        # Same for a table with an autoincrement+origin compound key.
+        rows = [{"origin": db.origin, "b_id": id} for id in ids]
+        cIds = db.insert(tables.c, *rows, returnIds=True)
+        self.assertEqual(len(set(cIds)), len(rows))
+        results = {r["id"]: dict(r) for r in db.query(tables.c.select()).fetchall()}
+        self.assertEqual([results[id] for id in cIds], [dict(row, id=id) for row, id in zip(rows, cIds)])
+
     def testUpdate(self):
         """Tests for `Database.update`.
         """
@@ -86,6 +86,9 @@ class RegistryTests(ABC):
         self.assertEqual(rows[0:1], list(registry.fetchOpaqueData(table, id=1)))
         self.assertEqual(rows[1:2], list(registry.fetchOpaqueData(table, name="two")))
         self.assertEqual([], list(registry.fetchOpaqueData(table, id=1, name="two")))
+        self.assertCountEqual(rows[0:2], list(registry.fetchOpaqueData(table, id=[1, 2])))
+        self.assertCountEqual(rows[1:2], list(registry.fetchOpaqueData(table, id=(1, 2), name="two")))
+        self.assertEqual([], list(registry.fetchOpaqueData(table, id=[])))
         registry.deleteOpaqueData(table, id=3)
         self.assertCountEqual(rows[:2], list(registry.fetchOpaqueData(table)))
         registry.deleteOpaqueData(table)
@@ -128,6 +131,17 @@ class RegistryTests(ABC):
         allTypes = registry.getAllDatasetTypes()
         self.assertEqual(allTypes, {outDatasetType1, outDatasetType2})
 
+        # Simulate another client registering a DatasetType (with no
+        # dimensions) behind our back; it should still be found.
+        registry._db.insert(registry._tables.dataset_type,
+                            {"dataset_type_name": "external", "storage_class": storageClass.name})
+        externalDatasetType = DatasetType("external", registry.dimensions.extract(()), storageClass)
+        self.assertEqual(registry.getAllDatasetTypes(),
+                         {outDatasetType1, outDatasetType2, externalDatasetType})
+        self.assertEqual(registry.getDatasetType("external"), externalDatasetType)
+        with self.assertRaises(KeyError):
+            registry.getDatasetType("notregistered")
+
     def testDimensions(self):
         """Tests for `Registry.insertDimensionData` and
         `Registry.expandDataId`.
@@ -172,6 +186,133 @@ class RegistryTests(ABC):
             dimensionValue2
         )
 
+    def testExpandDataIds(self):
+        """Tests for `Registry.expandDataIds`.
+        """
+        registry = self.makeRegistry()
+        registry.insertDimensionData("instrument", {"name": "DummyCam", "visit_max": 10,
+                                                    "exposure_max": 10, "detector_max": 2})
+        registry.insertDimensionData("physical_filter",
+                                     {"instrument": "DummyCam", "name": "d-r", "abstract_filter": "R"},
+                                     {"instrument": "DummyCam", "name": "d-i", "abstract_filter": "I"})
+        registry.insertDimensionData("visit", *[{"instrument": "DummyCam", "id": i, "name": f"v{i}",
+                                                 "physical_filter": "d-r" if i % 2 else "d-i"}
+                                                for i in range(8)])
+        graph = registry.dimensions["visit"].graph
+        dataIds = [{"instrument": "DummyCam", "visit": i} for i in reversed(range(8))]
+        # A pre-expanded data ID should be passed through unchanged.
+        dataIds.append(registry.expandDataId(instrument="DummyCam", visit=3))
+        expanded = registry.expandDataIds(dataIds, graph=graph)
+        self.assertEqual(len(expanded), len(dataIds))
+        for dataId, result in zip(dataIds, expanded):
+            reference = registry.expandDataId(dataId, graph=graph)
+            self.assertEqual(result, reference)
+            self.assertEqual({k: v.toDict() for k, v in result.records.items()},
+                             {k: v.toDict() for k, v in reference.records.items()})
+            self.assertEqual(result["abstract_filter"], "R" if result["visit"] % 2 else "I")
+        self.assertEqual(registry.expandDataIds([]), [])
+        # Data IDs with different dimensions may be mixed if graph is None.
+        mixed = registry.expandDataIds([{"instrument": "DummyCam"},
+                                        {"instrument": "DummyCam", "physical_filter": "d-i"}])
+        self.assertEqual([d.graph for d in mixed],
+                         [registry.dimensions["instrument"].graph,
+                          registry.dimensions["physical_filter"].graph])
+        self.assertEqual(mixed[1]["abstract_filter"], "I")
+        # A single missing record for a required dimension should raise.
+        with self.assertRaises(LookupError):
+            registry.expandDataIds([{"instrument": "DummyCam", "visit": 1},
+                                    {"instrument": "DummyCam", "visit": 100}])
+
+    def testQueryExpandedRecords(self):
+        """Test that `Registry.queryDimensions` and `Registry.queryDatasets`
+        with ``expand=True`` produce the same records as `expandDataId`.
+        """
+        registry = self.makeRegistry()
+        registry.insertDimensionData("instrument", {"name": "DummyCam", "visit_max": 10,
+                                                    "exposure_max": 10, "detector_max": 2})
+        registry.insertDimensionData("physical_filter",
+                                     {"instrument": "DummyCam", "name": "d-r", "abstract_filter": "R"})
+        registry.insertDimensionData("visit", {"instrument": "DummyCam", "id": 1, "name": "v1",
+                                               "physical_filter": "d-r"})
+        registry.insertDimensionData("exposure", *[{"instrument": "DummyCam", "id": i, "name": f"e{i}",
+                                                    "physical_filter": "d-r", "visit": 1}
+                                                   for i in range(1, 4)])
+        storageClass = StorageClass("testDataset")
+        registry.storageClasses.registerStorageClass(storageClass)
+        datasetType = DatasetType(name="raw", dimensions=registry.dimensions["exposure"].graph,
+                                  storageClass=storageClass)
+        registry.registerDatasetType(datasetType)
+        for run in ("run1", "run2"):
+            registry.registerRun(run)
+            registry.insertDatasets(datasetType, dataIds=[{"instrument": "DummyCam", "exposure": i}
+                                                          for i in range(1, 4)], run=run)
+
+        def checkRecords(dataIds):
+            self.assertEqual(len(dataIds), 3)
+            for dataId in dataIds:
+                reference = registry.expandDataId(dataId)
+                self.assertEqual(dataId.graph, reference.graph)
+                self.assertEqual(
+                    {k: v.toDict() if v is not None else None for k, v in dataId.records.items()},
+                    {k: v.toDict() if v is not None else None for k, v in reference.records.items()}
+                )
+            # Identical records from different rows should be shared.
+            visitRecords = {id(d.records["visit"]) for d in dataIds}
+            self.assertEqual(len(visitRecords), 1)
+
+        checkRecords(list(registry.queryDimensions(["exposure"], datasets={datasetType: ["run1"]},
+                                                   expand=True)))
+        checkRecords([ref.dataId for ref in registry.queryDatasets(datasetType, collections=["run1"],
+                                                                   expand=True)])
+        checkRecords([ref.dataId for ref in registry.queryDatasets(datasetType,
+                                                                   collections=["run1", "run2"],
+                                                                   deduplicate=True, expand=True)])
+
+    def testQueryDatasetsDeduplicate(self):
+        """Test `Registry.queryDatasets` with ``deduplicate=True``.
+        """
+        registry = self.makeRegistry()
+        registry.insertDimensionData("instrument", {"name": "DummyCam"})
+        registry.insertDimensionData("detector", *[{"instrument": "DummyCam", "id": i, "full_name": str(i)}
+                                                   for i in (1, 2, 3)])
+        registry.insertDimensionData("physical_filter",
+                                     {"instrument": "DummyCam", "name": "d-r", "abstract_filter": "R"},
+                                     {"instrument": "DummyCam", "name": "d-i", "abstract_filter": "I"})
+        storageClass = StorageClass("testDataset")
+        registry.storageClasses.registerStorageClass(storageClass)
+        datasetType = DatasetType(name="bias", dimensions=registry.dimensions.extract(["instrument",
+                                                                                       "detector"]),
+                                  storageClass=storageClass)
+        registry.registerDatasetType(datasetType)
+        ids = {}
+        for run, detectors in (("run1", (1, 2)), ("run2", (2, 3))):
+            registry.registerRun(run)
+            refs = registry.insertDatasets(datasetType, dataIds=[{"instrument": "DummyCam", "detector": d}
+                                                                 for d in detectors], run=run)
+            for ref in refs:
+                ids[run, ref.dataId["detector"]] = ref.id
+        # Test both the window function and GROUP BY implementations.
+        for useWindowFunctions in (True, False):
+            with self.subTest(useWindowFunctions=useWindowFunctions):
+                registry._datasetStorage._useWindowFunctions = useWindowFunctions
+                refs = list(registry.queryDatasets(datasetType, collections=["run1", "run2"],
+                                                   deduplicate=True))
+                self.assertCountEqual([ref.id for ref in refs],
+                                      [ids["run1", 1], ids["run1", 2], ids["run2", 3]])
+                refs = list(registry.queryDatasets(datasetType, collections=["run2", "run1"],
+                                                   deduplicate=True))
+                self.assertCountEqual([ref.id for ref in refs],
+                                      [ids["run1", 1], ids["run2", 2], ids["run2", 3]])
+                # Extra dimensions in the query should not result in repeated
+                # datasets.
+                refs = list(registry.queryDatasets(datasetType, collections=["run1", "run2"],
+                                                   dimensions=["physical_filter"], deduplicate=True))
+                self.assertCountEqual([ref.id for ref in refs],
+                                      [ids["run1", 1], ids["run1", 2], ids["run2", 3]])
+        # Collection wildcards cannot be used with deduplication.
+        with self.assertRaises(TypeError):
+            list(registry.queryDatasets(datasetType, collections=..., deduplicate=True))
+
     def testDataset(self):
         """Basic tests for `Registry.insertDatasets`, `Registry.getDataset`,
         and `Registry.removeDataset`.
@@ -236,6 +377,43 @@ class RegistryTests(ABC):
         self.assertIsNone(registry.find(run, childDatasetType1, dataId))
         self.assertIsNone(registry.find(run, childDatasetType2, dataId))
 
+    def testGetDatasets(self):
+        """Tests for `Registry.getDatasets`, including nested composites.
+        """
+        registry = self.makeRegistry()
+        leafStorageClass = StorageClass("testGetDatasetsLeaf")
+        childStorageClass = StorageClass("testGetDatasetsChild", components={"leaf": leafStorageClass})
+        parentStorageClass = StorageClass("testGetDatasetsParent",
+                                          components={"child": childStorageClass,
+                                                      "other": leafStorageClass})
+        for storageClass in (leafStorageClass, childStorageClass, parentStorageClass):
+            registry.storageClasses.registerStorageClass(storageClass)
+        parentDatasetType = DatasetType(name="parent",
+                                        dimensions=registry.dimensions.extract(("instrument",)),
+                                        storageClass=parentStorageClass)
+        registry.registerDatasetType(parentDatasetType)
+        for datasetType in (parentDatasetType.makeComponentDatasetType("child"),
+                            parentDatasetType.makeComponentDatasetType("other")):
+            registry.registerDatasetType(datasetType)
+            if datasetType.isComposite():
+                registry.registerDatasetType(datasetType.makeComponentDatasetType("leaf"))
+        dataIds = [{"instrument": name} for name in ("Cam1", "Cam2", "Cam3")]
+        registry.insertDimensionData("instrument", *dataIds)
+        run = "test"
+        registry.registerRun(run)
+        parents = registry.insertDatasets(parentDatasetType, dataIds=dataIds, run=run, recursive=True)
+        result = registry.getDatasets([parent.id for parent in parents] + [-1])
+        self.assertEqual(result.keys(), {parent.id for parent in parents})
+        for parent in parents:
+            outParent = result[parent.id]
+            self.assertEqual(outParent, parent)
+            self.assertEqual(outParent.run, run)
+            self.assertEqual(outParent.components, parent.components)
+            self.assertEqual(outParent.components["child"].components,
+                             parent.components["child"].components)
+            self.assertEqual(outParent, registry.getDataset(parent.id))
+        self.assertEqual(registry.getDatasets([]), {})
+
     def testFind(self):
         """Tests for `Registry.find`.
         """
@@ -289,6 +467,21 @@ class RegistryTests(ABC):
         # Check that requesting a non-existing dataId returns None
         nonExistingDataId = {"instrument": "DummyCam", "visit": 42}
         self.assertIsNone(registry.find(run, datasetType, nonExistingDataId))
+        # Bulk lookups should find the same datasets, and omit missing ones.
+        found = registry.findDatasets(datasetType, [dataId1, dataId2, dataId3, nonExistingDataId], [run])
+        self.assertEqual(len(found), 3)
+        for dataId, inputRef in ((dataId1, inputRef1), (dataId2, inputRef2), (dataId3, inputRef3)):
+            outputRef = found[DataCoordinate.standardize(dataId, graph=datasetType.dimensions)]
+            self.assertEqual(outputRef, inputRef)
+            self.assertEqual(outputRef.run, run)
+        # Collections are searched in order.
+        registry.registerRun("other")
+        otherRef1, = registry.insertDatasets(datasetType, dataIds=[dataId1], run="other")
+        found = registry.findDatasets(datasetType.name, [dataId1, dataId2], ["other", run])
+        self.assertCountEqual(found.values(), [otherRef1, inputRef2])
+        found = registry.findDatasets(datasetType, [dataId1, dataId2], [run, "other"])
+        self.assertCountEqual(found.values(), [inputRef1, inputRef2])
+        self.assertEqual(registry.findDatasets(datasetType, [], [run]), {})
 
     def testCollections(self):
         """Tests for `Registry.getAllCollections`, `Registry.registerRun`,
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+
+# This file is part of daf_butler.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+__all__ = ("main",)
+
+import argparse
+import sys
+import logging
+
+from lsst.daf.butler import Butler
+
+
+def build_argparser():
+    """Construct an argument parser for the ``verifyDatastore`` script.
+
+    Returns
+    -------
+    argparser : `argparse.ArgumentParser`
+        The argument parser that defines the script
+        command-line interface.
+    """
+    parser = argparse.ArgumentParser(description="Check that the files in a Gen3 Butler repository's "
+                                     "datastore match its records, and report missing, mismatched "
+                                     "and orphaned files.")
+    parser.add_argument("root",
+                        help="Filesystem path for an existing Butler repository.")
+    parser.add_argument("--checksum", "-c", action="store_true",
+                        help="Recompute and compare checksums (reads every file).")
+    parser.add_argument("--workers", "-j", default=None, type=int,
+                        help="Number of files to check concurrently.")
+    parser.add_argument("--quiet", "-q", action="store_true",
+                        help="Do not report individual problems.")
+    parser.add_argument("--verbose", "-v", action="store_true",
+                        help="Turn on debug reporting.")
+
+    return parser
+
+
+def verifyDatastore(root, checksum=False, workers=None, quiet=False, outfh=sys.stdout):
+    """Verify the datastore of a butler repository.
+
+    Parameters
+    ----------
+    root : `str`
+        Butler root to verify.
+    checksum : `bool`, optional
+        If `True`, recompute and compare the checksums of all files.
+    workers : `int`, optional
+        Number of files to check concurrently.  Defaults to the number of
+        threads configured for the datastore.
+    quiet : `bool`, optional
+        If `True` report only the number of problems, not the details.
+    outfh
+        File descriptor to use to write the report.
+
+    Returns
+    -------
+    valid : `bool`
+        `True` if no problems were found.
+    """
+    butler = Butler(config=root, writeable=False)
+    report = butler.datastore.verify(checksum=checksum, workers=workers)
+
+    if not quiet:
+        for path, datasetIds in sorted(report.missing.items()):
+            ids = ", ".join(str(i) for i in sorted(datasetIds))
+            print(f"MISSING {path} (datasets {ids})", file=outfh)
+        for path, problem in sorted(report.mismatched.items()):
+            print(f"MISMATCHED {path}: {problem}", file=outfh)
+        for path in report.orphaned:
+            print(f"ORPHANED {path}", file=outfh)
+
+    print(f"Checked {report.nArtifacts} files: {len(report.missing)} missing, "
+          f"{len(report.mismatched)} mismatched, {len(report.orphaned)} orphaned.", file=outfh)
+    return not report.hasProblems()
+
+
+def main():
+    args = build_argparser().parse_args()
+
+    if args.verbose:
+        logging.basicConfig(level=logging.DEBUG)
+
+    valid = verifyDatastore(args.root, args.checksum, args.workers, args.quiet, sys.stdout)
+    return 0 if valid else 1
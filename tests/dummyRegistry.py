@@ -20,7 +20,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from contextlib import contextmanager
-from typing import Any, Iterator
+from typing import Any, Iterator, Optional
 
 from lsst.daf.butler import DimensionUniverse, ddl
 
@@ -36,8 +36,9 @@ class DummyRegistry:
         self.dimensions = DimensionUniverse()
 
     def registerOpaqueTable(self, name: str, spec: ddl.TableSpec):
+        # Like a real registry, registering a table again keeps its rows.
         self._externalTableSpecs[name] = spec
-        self._externalTableRows[name] = []
+        self._externalTableRows.setdefault(name, [])
 
     def insertOpaqueData(self, name: str, *data: dict):
         spec = self._externalTableSpecs[name]
@@ -50,9 +51,18 @@ class DummyRegistry:
                     raise RuntimeError(f"Unique constraint {constraint} violation in external table {name}.")
             self._externalTableRows[name].append(d)
 
-    def fetchOpaqueData(self, name: str, **where: Any) -> Iterator[dict]:
-        for d in self._externalTableRows[name]:
-            if all(d[k] == v for k, v in where.items()):
+    @staticmethod
+    def _matches(value, constraint):
+        if isinstance(constraint, (list, tuple, set, frozenset)):
+            return value in constraint
+        return value == constraint
+
+    def fetchOpaqueData(self, name: str, orderBy: Optional[str] = None, **where: Any) -> Iterator[dict]:
+        rows = self._externalTableRows[name]
+        if orderBy is not None:
+            rows = sorted(rows, key=lambda d: d[orderBy])
+        for d in rows:
+            if all(self._matches(d[k], v) for k, v in where.items()):
                 yield d
 
     def deleteOpaqueData(self, name: str, **where: Any):
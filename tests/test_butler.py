@@ -25,6 +25,7 @@
 import os
 import posixpath
 import unittest
+import unittest.mock
 import tempfile
 import shutil
 import pickle
@@ -53,6 +54,7 @@ from lsst.daf.butler import FileDataset
 from examplePythonTypes import MetricsExample
 from lsst.daf.butler.core.repoRelocation import BUTLER_ROOT_TAG
 from lsst.daf.butler.core.location import ButlerURI
+from lsst.daf.butler.datastores.artifactCache import LocalArtifactCache
 from lsst.daf.butler.core.s3utils import (s3CheckFileExists, setAwsEnvCredentials,
                                           unsetAwsEnvCredentials)
 
@@ -570,6 +572,62 @@ class ButlerTests(ButlerPutGetTests):
         with self.assertRaises(FileNotFoundError):
             butler.getDirect(ref)
 
+    def testPutManyGetMany(self):
+        butler = Butler(self.tmpConfigFile, run="ingest")
+        dimensions = butler.registry.dimensions.extract(["instrument", "visit"])
+        butler.registry.insertDimensionData("instrument", {"name": "DummyCamComp"})
+        butler.registry.insertDimensionData("physical_filter", {"instrument": "DummyCamComp",
+                                                                "name": "d-r",
+                                                                "abstract_filter": "R"})
+        visits = (423, 424, 425)
+        for visit in visits:
+            butler.registry.insertDimensionData("visit", {"instrument": "DummyCamComp", "id": visit,
+                                                          "name": f"visit{visit}",
+                                                          "physical_filter": "d-r"})
+        concrete = self.addDatasetType("test_metric", dimensions,
+                                       self.storageClassFactory.getStorageClass("StructuredData"),
+                                       butler.registry)
+        virtual = self.addDatasetType("test_metric_comp", dimensions,
+                                      self.storageClassFactory.getStorageClass("StructuredComposite"),
+                                      butler.registry)
+        metrics = [makeExampleMetrics() for _ in visits]
+        for i, metric in enumerate(metrics):
+            metric.summary["index"] = i
+        dataIds = [{"instrument": "DummyCamComp", "visit": visit} for visit in visits]
+        datasets = [(metric, concrete, dataId) for metric, dataId in zip(metrics, dataIds)]
+        datasets.append((metrics[0], DatasetRef(virtual, dataIds[0]), None))
+        datasets.append((metrics[1], virtual.name, dataIds[1]))
+        refs = butler.putMany(datasets)
+        self.assertEqual(len(refs), len(datasets))
+        for ref in refs:
+            self.assertIsInstance(ref, DatasetRef)
+            self.assertIsNotNone(ref.id)
+
+        # Retrieve by resolved ref and by dataset type and data ID, and check
+        # that order is preserved.
+        self.assertEqual(butler.getMany(refs), metrics + metrics[:2])
+        self.assertEqual(butler.getMany([(concrete.name, dataId) for dataId in reversed(dataIds)]),
+                         list(reversed(metrics)))
+        sliced = butler.getMany(refs[:2], parameters={"slice": slice(2)})
+        self.assertEqual([s.data for s in sliced], [m.data[:2] for m in metrics[:2]])
+
+        # A failure part way through should roll back everything.
+        butler.registry.insertDimensionData("visit", {"instrument": "DummyCamComp", "id": 426,
+                                                      "name": "visit426", "physical_filter": "d-r"})
+        newDataId = {"instrument": "DummyCamComp", "visit": 426}
+        with self.assertRaises(Exception):
+            butler.putMany([(metrics[0], "test_metric", newDataId),
+                            (metrics[1], "test_metric_comp", newDataId),
+                            (metrics[2], "test_metric", dataIds[0])])
+        self.assertIsNone(butler.registry.find(butler.collection, concrete, newDataId))
+        self.assertIsNone(butler.registry.find(butler.collection, virtual, newDataId))
+
+        # Already-resolved refs are rejected.
+        with self.assertRaises(ValueError):
+            butler.putMany([(metrics[0], refs[0], None)])
+        with self.assertRaises(LookupError):
+            butler.getMany([("test_metric", newDataId)])
+
     def testMakeRepo(self):
         """Test that we can write butler configuration to a new repository via
         the Butler.makeRepo interface and then instantiate a butler from the
@@ -960,6 +1018,106 @@ class S3DatastoreButlerTestCase(FileLikeDatastoreButlerTests, unittest.TestCase)
     def testImportExport(self):
         super().testImportExport()
 
+    def testPutWithoutExistenceCheck(self):
+        storageClass = self.storageClassFactory.getStorageClass("StructuredDataNoComponents")
+        butler = Butler(self.tmpConfigFile, run="ingest")
+        butler.registry.insertDimensionData("instrument", {"name": "DummyCamComp"})
+        butler.registry.insertDimensionData("physical_filter", {"instrument": "DummyCamComp",
+                                                                "name": "d-r",
+                                                                "abstract_filter": "R"})
+        butler.registry.insertDimensionData("visit", {"instrument": "DummyCamComp", "id": 423, "name": "v423",
+                                                      "physical_filter": "d-r"})
+        dimensions = butler.registry.dimensions.extract(["instrument", "visit"])
+        self.addDatasetType("metric1", dimensions, storageClass, butler.registry)
+        metric = makeExampleMetrics()
+        dataId = {"instrument": "DummyCamComp", "visit": 423}
+
+        # Neither the existence check nor a request for the size of the
+        # uploaded object should be needed.
+        butler.datastore.checkExistsBeforePut = False
+        client = butler.datastore.client
+        with unittest.mock.patch.object(client, "head_object", wraps=client.head_object) as head:
+            ref = butler.put(metric, "metric1", dataId)
+            self.assertEqual(head.call_count, 0)
+        self.assertEqual(butler.get(ref), metric)
+
+    def testExistsMany(self):
+        storageClass = self.storageClassFactory.getStorageClass("StructuredDataNoComponents")
+        butler = Butler(self.tmpConfigFile, run="ingest")
+        butler.registry.insertDimensionData("instrument", {"name": "DummyCamComp"})
+        butler.registry.insertDimensionData("physical_filter", {"instrument": "DummyCamComp",
+                                                                "name": "d-r",
+                                                                "abstract_filter": "R"})
+        for visit in range(5):
+            butler.registry.insertDimensionData("visit", {"instrument": "DummyCamComp", "id": visit,
+                                                          "name": f"v{visit}", "physical_filter": "d-r"})
+        dimensions = butler.registry.dimensions.extract(["instrument", "visit"])
+        self.addDatasetType("metric1", dimensions, storageClass, butler.registry)
+        self.addDatasetType("metric2", dimensions, storageClass, butler.registry)
+        metric = makeExampleMetrics()
+        refs = [butler.put(metric, "metric1", instrument="DummyCamComp", visit=visit)
+                for visit in range(5)]
+        refs.append(butler.put(metric, "metric2", instrument="DummyCamComp", visit=0))
+
+        # Remove one artifact behind the datastore's back.
+        datastore = butler.datastore
+        location, _ = datastore._get_dataset_location_info(refs[2])
+        datastore.client.delete_object(Bucket=location.netloc, Key=location.relativeToPathRoot)
+
+        # The metric1 datasets share a prefix, so they should be checked with
+        # a listing rather than a request each.
+        client = datastore.client
+        with unittest.mock.patch.object(client, "head_object", wraps=client.head_object) as head:
+            self.assertEqual(datastore.existsMany(refs), [True, True, False, True, True, True])
+            self.assertEqual(head.call_count, 1)
+        self.assertEqual(datastore.existsMany(refs), [datastore.exists(ref) for ref in refs])
+
+    def testLocalCache(self):
+        storageClass = self.storageClassFactory.getStorageClass("StructuredDataNoComponents")
+        butler = Butler(self.tmpConfigFile, run="ingest")
+        butler.registry.insertDimensionData("instrument", {"name": "DummyCamComp"})
+        butler.registry.insertDimensionData("physical_filter", {"instrument": "DummyCamComp",
+                                                                "name": "d-r",
+                                                                "abstract_filter": "R"})
+        butler.registry.insertDimensionData("visit", {"instrument": "DummyCamComp", "id": 423, "name": "v423",
+                                                      "physical_filter": "d-r"})
+        dimensions = butler.registry.dimensions.extract(["instrument", "visit"])
+        self.addDatasetType("metric1", dimensions, storageClass, butler.registry)
+        dataId = {"instrument": "DummyCamComp", "visit": 423}
+        datastore = butler.datastore
+        datastore.cache = LocalArtifactCache(None, 1 << 20)
+        client = datastore.client
+
+        # With checksums the cache is keyed on them; without, on the ETag.
+        for useChecksum in (True, False):
+            with self.subTest(useChecksum=useChecksum):
+                datastore.useChecksum = useChecksum
+                metric = makeExampleMetrics()
+                ref = butler.put(metric, "metric1", dataId)
+                with unittest.mock.patch.object(client, "get_object", wraps=client.get_object) as get, \
+                        unittest.mock.patch.object(client, "head_object", wraps=client.head_object) as head:
+                    self.assertEqual(butler.getDirect(ref), metric)
+                    self.assertEqual(get.call_count, 1)
+                    self.assertEqual(len(datastore.cache), 1)
+                    # The second read comes from the cache, and only needs
+                    # the request that locates the dataset.
+                    head.reset_mock()
+                    self.assertEqual(butler.getDirect(ref), metric)
+                    self.assertEqual(get.call_count, 1)
+                    self.assertEqual(head.call_count, 1)
+
+                # Replace the dataset with different content of the same
+                # size, at the same key.
+                size = datastore.getStoredItemInfo(ref).file_size
+                butler.remove("metric1", dataId, remember=False)
+                self.assertEqual(len(datastore.cache), 0)
+                metric.summary["AM1"] += 1
+                ref = butler.put(metric, "metric1", dataId)
+                self.assertEqual(datastore.getStoredItemInfo(ref).file_size, size)
+                self.assertEqual(butler.getDirect(ref), metric)
+                self.assertEqual(butler.get("metric1", dataId), metric)
+                butler.remove("metric1", dataId, remember=False)
+
 
 if __name__ == "__main__":
     unittest.main()
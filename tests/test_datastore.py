@@ -19,16 +19,22 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import hashlib
 import os
 import unittest
 import shutil
+import sys
+import time
 import yaml
 import tempfile
+import unittest.mock
 import lsst.utils
 
 from lsst.daf.butler import StorageClassFactory, StorageClass, DimensionUniverse, FileDataset
 from lsst.daf.butler import DatastoreConfig, DatasetTypeNotSupportedError, DatastoreValidationError
-from lsst.daf.butler import ButlerURI
+from lsst.daf.butler import ButlerURI, Location, StoredFileInfo
+from lsst.daf.butler.datastores.artifactCache import LocalArtifactCache
+from lsst.daf.butler.datastores.posixDatastore import PosixDatastore
 from lsst.daf.butler.formatters.yamlFormatter import YamlFormatter
 
 from lsst.utils import doImport
@@ -192,6 +198,71 @@ class DatastoreTests(DatastoreTestsBase):
         with self.assertRaises(FileNotFoundError):
             datastore.getUri(ref)
 
+    def testGetMany(self):
+        metrics = makeExampleMetrics()
+        # Exercise the thread pool where the datastore supports it.
+        self.config["threads"] = 4
+        datastore = self.makeDatastore()
+        storageClass = self.storageClassFactory.getStorageClass("StructuredData")
+        dimensions = self.universe.extract(("visit", "physical_filter"))
+
+        refs = []
+        for visit in (52, 53, 54):
+            dataId = {"instrument": "dummy", "visit": visit, "physical_filter": "V"}
+            ref = self.makeDatasetRef("metric", dimensions, storageClass, dataId, conform=False)
+            datastore.put(metrics, ref)
+            refs.append(ref)
+
+        self.assertEqual(datastore.getMany(refs), [metrics]*len(refs))
+        self.assertEqual(datastore.getMany(reversed(refs)), [metrics]*len(refs))
+        self.assertEqual(datastore.getMany([]), [])
+
+        # Per-dataset parameters, applied to the list-valued component.
+        compRefs = [self.makeDatasetRef(ref.datasetType.componentTypeName("data"), dimensions,
+                                        storageClass.components["data"], ref.dataId, id=ref.id,
+                                        conform=False)
+                    for ref in refs]
+        parameters = [None, {"slice": slice(0, 1)}, {"slice": slice(1, 3)}]
+        self.assertEqual(datastore.getMany(compRefs, parameters=parameters),
+                         [metrics.data, metrics.data[0:1], metrics.data[1:3]])
+        with self.assertRaises(ValueError):
+            datastore.getMany(compRefs, parameters=parameters[:2])
+
+        if hasattr(datastore, "getStoredItemInfos"):
+            infos = datastore.getStoredItemInfos(refs)
+            self.assertEqual(set(infos.keys()), {ref.id for ref in refs})
+            for ref in refs:
+                self.assertEqual(infos[ref.id], datastore.getStoredItemInfo(ref))
+
+        dataId = {"instrument": "dummy", "visit": 55, "physical_filter": "V"}
+        missing = self.makeDatasetRef("metric", dimensions, storageClass, dataId, id=10000, conform=False)
+        with self.assertRaises(FileNotFoundError):
+            datastore.getMany(refs + [missing])
+        if hasattr(datastore, "getStoredItemInfos"):
+            self.assertNotIn(missing.id, datastore.getStoredItemInfos([missing]))
+
+        self.assertEqual(datastore.existsMany([refs[0], missing, refs[2]]), [True, False, True])
+        self.assertEqual(datastore.existsMany(compRefs), [True]*len(compRefs))
+        self.assertEqual(datastore.existsMany([]), [])
+
+    def testLocate(self):
+        metrics = makeExampleMetrics()
+        datastore = self.makeDatastore()
+        storageClass = self.storageClassFactory.getStorageClass("StructuredData")
+        dimensions = self.universe.extract(("visit", "physical_filter"))
+        dataId = {"instrument": "dummy", "visit": 52, "physical_filter": "V"}
+        ref = self.makeDatasetRef("metric", dimensions, storageClass, dataId, conform=False)
+
+        self.assertIsNone(datastore.locate(ref))
+        datastore.put(metrics, ref)
+        located = datastore.locate(ref)
+        self.assertIsNotNone(located)
+        self.assertEqual(located.ref, ref)
+        self.assertEqual(datastore.getLocated(located), metrics)
+
+        datastore.remove(ref)
+        self.assertIsNone(datastore.locate(ref))
+
     def testCompositePutGet(self):
         metrics = makeExampleMetrics()
         datastore = self.makeDatastore()
@@ -464,6 +535,23 @@ class PosixDatastoreTestCase(DatastoreTests, unittest.TestCase):
         self.root = tempfile.mkdtemp(dir=TESTDIR)
         super().setUp()
 
+    def testLocateWithoutStat(self):
+        """Test that datastores not implementing _stat_artifact can still
+        locate datasets."""
+        metrics = makeExampleMetrics()
+        datastore = self.makeDatastore()
+        storageClass = self.storageClassFactory.getStorageClass("StructuredData")
+        dimensions = self.universe.extract(("visit", "physical_filter"))
+        dataId = {"instrument": "dummy", "visit": 52, "physical_filter": "V"}
+        ref = self.makeDatasetRef("metric", dimensions, storageClass, dataId, conform=False)
+        datastore.put(metrics, ref)
+
+        with unittest.mock.patch.object(PosixDatastore, "_stat_artifact", side_effect=NotImplementedError):
+            located = datastore.locate(ref)
+        self.assertIsNotNone(located)
+        self.assertIsNone(located.stat)
+        self.assertEqual(datastore.getLocated(located), metrics)
+
 
 class PosixDatastoreNoChecksumsTestCase(PosixDatastoreTestCase):
     """Posix datastore tests but with checksums disabled."""
@@ -495,6 +583,143 @@ class PosixDatastoreNoChecksumsTestCase(PosixDatastoreTestCase):
         self.assertIsNotNone(info.checksum)
 
 
+class ChecksumPosixDatastoreTestCase(DatastoreTestsBase, unittest.TestCase):
+    """Tests of checksums and verification in PosixDatastore."""
+    configFile = os.path.join(TESTDIR, "config/basic/butler.yaml")
+
+    def setUp(self):
+        # Override the working directory before calling the base class
+        self.root = tempfile.mkdtemp(dir=TESTDIR)
+        super().setUp()
+
+    def testComputeChecksum(self):
+        for content in (b"", b"0123456789" * 1000):
+            path = os.path.join(self.root, "checksum.dat")
+            with open(path, "wb") as fd:
+                fd.write(content)
+            for algorithm in ("blake2b", "md5", "sha256"):
+                expected = hashlib.new(algorithm, content).hexdigest()
+                for kwargs in ({}, {"block_size": 7}, {"use_mmap": True}):
+                    with self.subTest(size=len(content), algorithm=algorithm, **kwargs):
+                        self.assertEqual(self.datastoreType.computeChecksum(path, algorithm=algorithm,
+                                                                            **kwargs),
+                                         expected)
+
+    def testChecksumOptions(self):
+        storageClass = self.storageClassFactory.getStorageClass("StructuredData")
+        dimensions = self.universe.extract(("visit", "physical_filter"))
+        metrics = makeExampleMetrics()
+        dataId = {"instrument": "dummy", "visit": 0, "physical_filter": "V"}
+
+        for onWrite in (False, True):
+            with self.subTest(onWrite=onWrite):
+                self.config["checksumAlgorithm"] = "sha256"
+                self.config["checksumUseMmap"] = True
+                self.config["checksumOnWrite"] = onWrite
+                datastore = self.makeDatastore(f"onWrite{onWrite}")
+                ref = self.makeDatasetRef("metric", dimensions, storageClass, dataId, conform=False)
+                datastore.put(metrics, ref)
+                info = datastore.getStoredItemInfo(ref)
+                self.assertEqual(info.checksum_algorithm, "sha256")
+                path = ButlerURI(datastore.getUri(ref)).ospath
+                self.assertEqual(info.checksum, datastore.computeChecksum(path, algorithm="sha256"))
+                self.assertEqual(info.file_size, os.stat(path).st_size)
+                self.assertEqual(datastore.get(ref), metrics)
+
+        self.config["checksumAlgorithm"] = "not_a_hash"
+        with self.assertRaises(ValueError):
+            self.makeDatastore("bad")
+
+        # Too long to record with its name.
+        self.config["checksumAlgorithm"] = "sha512"
+        with self.assertRaises(ValueError):
+            self.makeDatastore("long")
+
+    def testChecksumAlgorithmChange(self):
+        storageClass = self.storageClassFactory.getStorageClass("StructuredData")
+        dimensions = self.universe.extract(("visit", "physical_filter"))
+        metrics = makeExampleMetrics()
+        refs = []
+        for visit, algorithm in enumerate(("blake2b", "sha256", "md5")):
+            self.config["checksumAlgorithm"] = algorithm
+            datastore = self.makeDatastore()
+            dataId = {"instrument": "dummy", "visit": visit, "physical_filter": "V"}
+            ref = self.makeDatasetRef("metric", dimensions, storageClass, dataId, conform=False)
+            datastore.put(metrics, ref)
+            refs.append(ref)
+
+        # Each record keeps the algorithm it was written with; the default
+        # algorithm is recorded without a prefix, as it always was.
+        records = {record["dataset_id"]: record["checksum"]
+                   for record in self.registry.fetchOpaqueData(datastore._tableName)}
+        self.assertNotIn(":", records[refs[0].id])
+        self.assertTrue(records[refs[1].id].startswith("sha256:"))
+        self.assertTrue(records[refs[2].id].startswith("md5:"))
+        datastore = self.makeDatastore()
+        self.assertEqual([datastore.getStoredItemInfo(ref).checksum_algorithm for ref in refs],
+                         ["blake2b", "sha256", "md5"])
+        report = datastore.verify(checksum=True)
+        self.assertFalse(report.hasProblems())
+        self.assertEqual(report.nArtifacts, 3)
+
+    def testVerify(self):
+        datastore = self.makeDatastore()
+        storageClass = self.storageClassFactory.getStorageClass("StructuredData")
+        dimensions = self.universe.extract(("visit", "physical_filter"))
+        metrics = makeExampleMetrics()
+        refs = []
+        for visit in range(5):
+            dataId = {"instrument": "dummy", "visit": visit, "physical_filter": "V"}
+            ref = self.makeDatasetRef("metric", dimensions, storageClass, dataId, conform=False)
+            datastore.put(metrics, ref)
+            refs.append(ref)
+        paths = [datastore.getStoredItemInfo(ref).path for ref in refs]
+
+        for workers in (1, 3):
+            report = datastore.verify(checksum=True, workers=workers)
+            self.assertFalse(report.hasProblems())
+            self.assertEqual(report.nArtifacts, len(refs))
+
+        # Remove one file, change the size of another, and change the
+        # content of a third without changing its size.
+        os.remove(os.path.join(datastore.root, paths[0]))
+        with open(os.path.join(datastore.root, paths[1]), "a") as fd:
+            fd.write("# extra\n")
+        with open(os.path.join(datastore.root, paths[2]), "r+b") as fd:
+            content = fd.read()
+            fd.seek(0)
+            fd.write(content.swapcase())
+        orphan = os.path.join("extra", "orphan.txt")
+        os.makedirs(os.path.join(datastore.root, "extra"))
+        with open(os.path.join(datastore.root, orphan), "w") as fd:
+            fd.write("orphan")
+
+        listed = list(datastore._list_artifacts())
+        self.assertEqual(listed, sorted(listed))
+        self.assertIn(orphan, listed)
+
+        # Orphans are found with a single query for all the records (and
+        # one to check the candidates), however many files there are.
+        with unittest.mock.patch.object(self.registry, "fetchOpaqueData",
+                                        wraps=self.registry.fetchOpaqueData) as fetch:
+            report = datastore.verify(workers=3)
+        self.assertEqual(report.missing, {paths[0]: {refs[0].id}})
+        self.assertEqual(set(report.mismatched.keys()), {paths[1]})
+        self.assertEqual(report.orphaned, [orphan])
+        self.assertEqual(fetch.call_count, 3)
+
+        report = datastore.verify(checksum=True, workers=3)
+        self.assertEqual(set(report.mismatched.keys()), {paths[1], paths[2]})
+        self.assertIn("checksum", report.mismatched[paths[2]])
+
+        # Verifying only some datasets does not look for orphans.
+        report = datastore.verify(refs[2:], checksum=True)
+        self.assertEqual(report.nArtifacts, 3)
+        self.assertEqual(report.missing, {})
+        self.assertEqual(set(report.mismatched.keys()), {paths[2]})
+        self.assertEqual(report.orphaned, [])
+
+
 class CleanupPosixDatastoreTestCase(DatastoreTestsBase, unittest.TestCase):
     configFile = os.path.join(TESTDIR, "config/basic/butler.yaml")
 
@@ -554,6 +779,186 @@ class CleanupPosixDatastoreTestCase(DatastoreTestsBase, unittest.TestCase):
         self.assertFalse(os.path.exists(expectedFile), f"Check for existence of now removed {expectedFile}")
 
 
+class RecordCachePosixDatastoreTestCase(DatastoreTestsBase, unittest.TestCase):
+    configFile = os.path.join(TESTDIR, "config/basic/butler.yaml")
+
+    def setUp(self):
+        # Override the working directory before calling the base class
+        self.root = tempfile.mkdtemp(dir=TESTDIR)
+        super().setUp()
+
+    def testRecordCache(self):
+        """Test the LRU cache of datastore records."""
+        self.config["records", "cacheSize"] = 2
+        datastore = self.makeDatastore()
+        metrics = makeExampleMetrics()
+        storageClass = self.storageClassFactory.getStorageClass("StructuredData")
+        dimensions = self.universe.extract(("visit", "physical_filter"))
+        refs = [self.makeDatasetRef("metric", dimensions, storageClass,
+                                    {"instrument": "dummy", "visit": visit, "physical_filter": "V"},
+                                    conform=False)
+                for visit in (1, 2, 3)]
+        for ref in refs:
+            datastore.put(metrics, ref)
+        # Only the most recently stored records are retained.
+        self.assertEqual(list(datastore._recordCache.keys()), [refs[1].id, refs[2].id])
+
+        with unittest.mock.patch.object(datastore.registry, "fetchOpaqueData",
+                                        wraps=datastore.registry.fetchOpaqueData) as fetch:
+            self.assertEqual(datastore.get(refs[2]), metrics)
+            self.assertEqual(fetch.call_count, 0)
+            self.assertEqual(datastore.get(refs[0]), metrics)
+            self.assertEqual(fetch.call_count, 1)
+            self.assertEqual(list(datastore._recordCache.keys()), [refs[2].id, refs[0].id])
+            self.assertEqual(datastore.getMany(refs), [metrics]*len(refs))
+            self.assertEqual(fetch.call_count, 2)
+
+        # Removal invalidates the cached record.
+        datastore.remove(refs[2])
+        self.assertNotIn(refs[2].id, datastore._recordCache)
+
+        # As does rolling back a transaction.
+        with self.assertRaises(TransactionTestError):
+            with datastore.transaction():
+                datastore.put(metrics, refs[2])
+                self.assertIn(refs[2].id, datastore._recordCache)
+                raise TransactionTestError("This should roll back the transaction")
+        self.assertEqual(len(datastore._recordCache), 0)
+        self.assertFalse(datastore.exists(refs[2]))
+
+
+class ParallelIngestPosixDatastoreTestCase(DatastoreTestsBase, unittest.TestCase):
+    configFile = os.path.join(TESTDIR, "config/basic/butler.yaml")
+
+    def setUp(self):
+        # Override the working directory before calling the base class
+        self.root = tempfile.mkdtemp(dir=TESTDIR)
+        super().setUp()
+        self.config["threads"] = 4
+
+    def testParallelIngest(self):
+        """Test that ingest transfers files concurrently and still rolls
+        back every transfer on failure."""
+        datastore = self.makeDatastore()
+        storageClass = self.storageClassFactory.getStorageClass("StructuredData")
+        dimensions = self.universe.extract(("visit", "physical_filter"))
+        metrics = makeExampleMetrics()
+        inputDir = tempfile.mkdtemp(dir=self.root)
+
+        def makeDataset(visit, datasetTypeName="metric"):
+            dataId = {"instrument": "dummy", "visit": visit, "physical_filter": "V"}
+            ref = self.makeDatasetRef(datasetTypeName, dimensions, storageClass, dataId, conform=False)
+            path = os.path.join(inputDir, f"{datasetTypeName}_{visit}.yaml")
+            with open(path, "w") as fd:
+                yaml.dump(metrics._asdict(), stream=fd)
+            return FileDataset(path=path, refs=ref)
+
+        datasets = [makeDataset(visit) for visit in range(10)]
+        datastore.ingest(*datasets, transfer="copy")
+        for dataset in datasets:
+            self.assertEqual(datastore.get(dataset.refs[0]), metrics)
+
+        # The last of these clashes with an existing file, so none of the
+        # others should be left behind.
+        datasets = [makeDataset(visit, "other") for visit in range(10)] + [makeDataset(0)]
+        with self.assertRaises(FileExistsError):
+            datastore.ingest(*datasets, transfer="copy")
+        for dataset in datasets[:-1]:
+            self.assertFalse(datastore.exists(dataset.refs[0]))
+            uri = datastore.getUri(dataset.refs[0], predict=True)
+            self.assertFalse(os.path.exists(ButlerURI(uri).ospath))
+
+
+class LocalArtifactCacheTestCase(unittest.TestCase):
+    """Tests for the local cache of remote datastore artifacts."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(dir=TESTDIR)
+        self.storageClass = StorageClass("TestCache")
+        self.downloads = []
+
+    def tearDown(self):
+        if os.path.exists(self.root):
+            shutil.rmtree(self.root, ignore_errors=True)
+
+    def use(self, cache, path, data, versioned=True):
+        """Read an artifact through the cache, returning its contents (or
+        `None` if it was not cached).  Its version is a hash of the contents,
+        like an S3 ETag."""
+        location = Location("s3://bucket/repo", path)
+        version = hashlib.md5(data).hexdigest() if versioned else None
+        info = StoredFileInfo(formatter=YamlFormatter, path=path, storageClass=self.storageClass,
+                              checksum=None, checksum_algorithm=None, file_size=len(data))
+
+        def download(filename):
+            self.downloads.append(path)
+            with open(filename, "wb") as fd:
+                fd.write(data)
+
+        with cache.use(location, info, download, version) as cachedPath:
+            if cachedPath is None:
+                return None
+            self.assertTrue(cachedPath.endswith(".yaml"))
+            with open(cachedPath, "rb") as fd:
+                return fd.read()
+
+    def testCache(self):
+        cache = LocalArtifactCache(self.root, 20)
+        self.assertEqual(self.use(cache, "a/x.yaml", b"x" * 10), b"x" * 10)
+        self.assertEqual(self.use(cache, "a/x.yaml", b"x" * 10), b"x" * 10)
+        self.assertEqual(self.downloads, ["a/x.yaml"])
+
+        # A new artifact at the same path has a different size and so is not
+        # confused with the cached one.
+        self.assertEqual(self.use(cache, "a/x.yaml", b"y" * 5), b"y" * 5)
+        self.assertEqual(cache.size, 15)
+
+        # Going over budget evicts the least recently used artifact.
+        self.use(cache, "a/x.yaml", b"x" * 10)
+        self.use(cache, "b/z.yaml", b"z" * 10)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.size, 20)
+        self.use(cache, "a/x.yaml", b"y" * 5)
+        self.assertEqual(self.downloads, ["a/x.yaml", "a/x.yaml", "b/z.yaml", "a/x.yaml"])
+        self.assertEqual(cache.size, 15)
+
+        # Artifacts larger than the budget are never cached.
+        self.assertIsNone(self.use(cache, "big.yaml", b"b" * 30))
+        self.assertEqual(cache.size, 15)
+
+        # A new cache adopts the files in the directory, within its budget.
+        cache = LocalArtifactCache(self.root, 10)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(self.use(cache, "a/x.yaml", b"y" * 5), b"y" * 5)
+        self.assertEqual(len(self.downloads), 4)
+
+    def testVersion(self):
+        cache = LocalArtifactCache(None, 100)
+        self.assertEqual(self.use(cache, "a/x.yaml", b"x" * 10), b"x" * 10)
+        # A replacement of the same size has a new version, so is not read
+        # from the stale copy.
+        self.assertEqual(self.use(cache, "a/x.yaml", b"w" * 10), b"w" * 10)
+        self.assertEqual(self.downloads, ["a/x.yaml", "a/x.yaml"])
+        # Without a checksum or version the contents cannot be identified.
+        self.assertIsNone(self.use(cache, "a/x.yaml", b"x" * 10, versioned=False))
+
+    def testFailedDownload(self):
+        cache = LocalArtifactCache(None, 100)
+        location = Location("s3://bucket/repo", "a/x.yaml")
+        info = StoredFileInfo(formatter=YamlFormatter, path="a/x.yaml", storageClass=self.storageClass,
+                              checksum=None, checksum_algorithm=None, file_size=10)
+
+        def download(filename):
+            raise FileNotFoundError(filename)
+
+        with self.assertRaises(FileNotFoundError):
+            with cache.use(location, info, download, "etag"):
+                pass
+        self.assertEqual(len(cache), 0)
+        for _, _, filenames in os.walk(cache.root):
+            self.assertEqual(filenames, [])
+
+
 class InMemoryDatastoreTestCase(DatastoreTests, unittest.TestCase):
     """PosixDatastore specialization"""
     configFile = os.path.join(TESTDIR, "config/basic/inMemoryDatastore.yaml")
@@ -565,6 +970,71 @@ class InMemoryDatastoreTestCase(DatastoreTests, unittest.TestCase):
     validationCanFail = False
 
 
+class LimitedInMemoryDatastoreTestCase(DatastoreTestsBase, unittest.TestCase):
+    """Tests of the memory budget and expiry of InMemoryDatastore."""
+    configFile = os.path.join(TESTDIR, "config/basic/inMemoryDatastore.yaml")
+
+    def makeRefs(self, n):
+        storageClass = self.storageClassFactory.getStorageClass("StructuredData")
+        dimensions = self.universe.extract(("visit", "physical_filter"))
+        return [self.makeDatasetRef("metric", dimensions, storageClass,
+                                    {"instrument": "dummy", "visit": visit, "physical_filter": "V"},
+                                    conform=False)
+                for visit in range(n)]
+
+    def testMaxSize(self):
+        metrics = makeExampleMetrics()
+        size = sys.getsizeof(metrics)
+        self.config["sizeEstimators"] = {"StructuredData": "sys.getsizeof"}
+        self.config["maxSize"] = 2*size
+        datastore = self.makeDatastore()
+        refs = self.makeRefs(4)
+
+        datastore.put(metrics, refs[0])
+        datastore.put(metrics, refs[1])
+        self.assertEqual(datastore.totalSize, 2*size)
+
+        # Reading the first dataset makes the second the least recently used.
+        self.assertEqual(datastore.get(refs[0]), metrics)
+        datastore.put(metrics, refs[2])
+        self.assertEqual(datastore.existsMany(refs[:3]), [True, False, True])
+        self.assertEqual(datastore.totalSize, 2*size)
+        with self.assertRaises(FileNotFoundError):
+            datastore.get(refs[1])
+
+        # Eviction does not touch the registry, but an evicted dataset can
+        # be stored again or removed.
+        self.assertIn(datastore.name, datastore.registry.getDatasetLocations(refs[1]))
+        datastore.put(metrics, refs[1])
+        self.assertEqual(datastore.existsMany(refs[:3]), [False, True, True])
+        datastore.remove(refs[0])
+        self.assertNotIn(datastore.name, datastore.registry.getDatasetLocations(refs[0]))
+        with self.assertRaises(FileNotFoundError):
+            datastore.remove(refs[0])
+
+        # A dataset over budget on its own is still stored.
+        datastore.maxSize = size // 2
+        datastore.put(metrics, refs[3])
+        self.assertEqual(datastore.existsMany(refs), [False, False, False, True])
+        self.assertEqual(datastore.totalSize, size)
+        datastore.remove(refs[3])
+        self.assertEqual(datastore.totalSize, 0)
+
+    def testExpiry(self):
+        metrics = makeExampleMetrics()
+        self.config["expiry"] = 60
+        datastore = self.makeDatastore()
+        refs = self.makeRefs(2)
+        datastore.put(metrics, refs[0])
+        with unittest.mock.patch("time.time", return_value=time.time() + 45):
+            datastore.put(metrics, refs[1])
+        with unittest.mock.patch("time.time", return_value=time.time() + 90):
+            self.assertEqual(datastore.existsMany(refs), [False, True])
+            with self.assertRaises(FileNotFoundError):
+                datastore.get(refs[0])
+            self.assertEqual(datastore.get(refs[1]), metrics)
+
+
 class ChainedDatastoreTestCase(PosixDatastoreTestCase):
     """ChainedDatastore specialization using a POSIXDatastore"""
     configFile = os.path.join(TESTDIR, "config/basic/chainedDatastore.yaml")
@@ -574,6 +1044,60 @@ class ChainedDatastoreTestCase(PosixDatastoreTestCase):
     rootKeys = (".datastores.1.root", ".datastores.2.root")
     validationCanFail = True
 
+    def testPromotion(self):
+        """Test that a dataset read from the last child is copied to the
+        earlier children."""
+        self.config["promote"] = True
+        datastore = self.makeDatastore()
+        storageClass = self.storageClassFactory.getStorageClass("StructuredData")
+        dimensions = self.universe.extract(("visit", "physical_filter"))
+        metrics = makeExampleMetrics()
+        dataId = {"instrument": "dummy", "visit": 0, "physical_filter": "V"}
+        ref = self.makeDatasetRef("metric", dimensions, storageClass, dataId, conform=False)
+        datastore.datastores[2].put(metrics, ref)
+
+        # A component read does not promote the dataset.
+        compRef = self.makeDatasetRef(ref.datasetType.componentTypeName("data"), dimensions,
+                                      storageClass.components["data"], dataId, id=ref.id, conform=False)
+        self.assertEqual(datastore.get(compRef), metrics.data)
+        self.assertFalse(datastore.datastores[0].exists(ref))
+
+        self.assertEqual(datastore.get(ref), metrics)
+        for child in datastore.datastores:
+            self.assertEqual(child.get(ref), metrics)
+        self.assertFalse(datastore.datastores[1].verify().hasProblems())
+
+        # Removal takes the dataset out of every child.
+        datastore.remove(ref)
+        for child in datastore.datastores:
+            self.assertFalse(child.exists(ref))
+
+
+class ParallelPutChainedDatastoreTestCase(ChainedDatastoreTestCase):
+    """ChainedDatastore specialization writing to its children
+    concurrently."""
+
+    def setUp(self):
+        super().setUp()
+        self.config["threads"] = 2
+
+    def testParallelPutRollback(self):
+        """Test that a failed write to one child removes the artifacts
+        written concurrently to the others."""
+        datastore = self.makeDatastore()
+        storageClass = self.storageClassFactory.getStorageClass("StructuredData")
+        dimensions = self.universe.extract(("visit", "physical_filter"))
+        metrics = makeExampleMetrics()
+        dataId = {"instrument": "dummy", "visit": 0, "physical_filter": "V"}
+        ref = self.makeDatasetRef("metric", dimensions, storageClass, dataId, conform=False)
+
+        # The file already exists in the last child.
+        datastore.datastores[2].put(metrics, ref)
+        with self.assertRaises(FileExistsError):
+            datastore.put(metrics, ref)
+        self.assertFalse(datastore.datastores[1].exists(ref))
+        self.assertTrue(datastore.datastores[2].exists(ref))
+
 
 class ChainedDatastoreMemoryTestCase(InMemoryDatastoreTestCase):
     """ChainedDatastore specialization using all InMemoryDatastore"""
@@ -58,6 +58,20 @@ class ParserLexTestCase(unittest.TestCase):
         lexer = ParserLex.make_lexer(reflags=re.DOTALL)
         self.assertEqual(lexer.lexreflags, re.DOTALL | default_reflags)
 
+    def testLexerCache(self):
+        """Test that cached lexers are independent of each other"""
+        lexer1 = ParserLex.make_lexer()
+        lexer2 = ParserLex.make_lexer()
+        self.assertIsNot(lexer1, lexer2)
+        lexer1.input("a = 1")
+        lexer2.input("\nb")
+        self._assertToken(lexer1.token(), 'IDENTIFIER', 'a')
+        self._assertToken(lexer2.token(), 'IDENTIFIER', 'b', lineno=2)
+        self._assertToken(lexer1.token(), 'EQ', '=', lineno=1)
+        self._assertToken(lexer1.token(), 'NUMERIC_LITERAL', '1')
+        self.assertIsNone(lexer1.token())
+        self.assertIsNone(lexer2.token())
+
     def testSimpleTokens(self):
         """Test for simple tokens"""
         lexer = ParserLex.make_lexer()
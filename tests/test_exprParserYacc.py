@@ -77,6 +77,15 @@ class ParserLexTestCase(unittest.TestCase):
         """
         parser = ParserYacc()  # noqa: F841
 
+    def testParserCache(self):
+        """Tests that parser tables are shared between instances
+        """
+        parser1 = ParserYacc()
+        parser2 = ParserYacc()
+        self.assertIsNot(parser1.parser, parser2.parser)
+        self.assertIs(parser1.parser.action, parser2.parser.action)
+        self.assertEqual(str(parser1.parse("a = 1")), str(parser2.parse("a = 1")))
+
     def testEmpty(self):
         """Tests for empty expression
         """
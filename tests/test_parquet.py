@@ -26,6 +26,7 @@ Tests in this module are disabled unless pandas and pyarrow are importable.
 
 import os
 import unittest
+import unittest.mock
 import tempfile
 import shutil
 
@@ -36,7 +37,20 @@ try:
 except ImportError:
     pyarrow = None
 
-from lsst.daf.butler import Butler, DatasetType
+try:
+    import boto3
+    from moto import mock_s3
+except ImportError:
+    boto3 = None
+
+    def mock_s3(cls):
+        """A no-op decorator in case moto mock_s3 can not be imported.
+        """
+        return cls
+
+from lsst.daf.butler import Butler, ButlerURI, Config, DatasetType, FileDescriptor, Location
+from lsst.daf.butler.core.s3utils import setAwsEnvCredentials, unsetAwsEnvCredentials
+from lsst.daf.butler.formatters.parquetFormatter import ParquetFormatter
 
 
 TESTDIR = os.path.abspath(os.path.dirname(__file__))
@@ -111,6 +125,83 @@ class ParquetFormatterTestCase(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.butler.get(self.datasetType, dataId={}, parameters={"columns": ["d"]})
 
+    def testFromFile(self):
+        columns1 = pd.Index(["a", "b", "c"])
+        df1 = pd.DataFrame(np.random.randn(5, 3), index=np.arange(5, dtype=int), columns=columns1)
+        self.butler.put(df1, self.datasetType, dataId={})
+        path = ButlerURI(self.butler.getUri(self.datasetType, dataId={})).ospath
+        location = Location(os.path.dirname(path), os.path.basename(path))
+        storageClass = self.datasetType.storageClass
+
+        def fromFile(parameters=None, component=None):
+            formatter = ParquetFormatter(FileDescriptor(location, storageClass, parameters=parameters))
+            with open(path, "rb") as fd:
+                return formatter.fromFile(fd, component=component)
+
+        self.assertTrue(df1.equals(fromFile()))
+        self.assertTrue(df1.columns.equals(fromFile(component="columns")))
+        self.assertTrue(df1.loc[:, ["a", "c"]].equals(fromFile({"columns": ["a", "c"]})))
+
+
+@unittest.skipUnless(pyarrow is not None, "Cannot test ParquetFormatter without pyarrow.")
+@unittest.skipIf(not boto3, "Warning: boto3 AWS SDK not found!")
+@mock_s3
+class ParquetFormatterS3TestCase(unittest.TestCase):
+    """Tests for ParquetFormatter, using S3Datastore.
+    """
+
+    bucketName = "anybucketname"
+
+    def setUp(self):
+        """Create a new butler, with its datastore in a mock S3 bucket."""
+        self.usingDummyCredentials = setAwsEnvCredentials()
+        boto3.resource("s3").create_bucket(Bucket=self.bucketName)
+        self.root = tempfile.mkdtemp(dir=TESTDIR)
+        config = Config()
+        config["datastore", "cls"] = "lsst.daf.butler.datastores.s3Datastore.S3Datastore"
+        config["datastore", "root"] = f"s3://{self.bucketName}/butlerRoot"
+        Butler.makeRepo(self.root, config=config, forceConfigRoot=False)
+        self.butler = Butler(self.root, run="test_run")
+        self.datasetType = DatasetType("data", dimensions=(), storageClass="DataFrame",
+                                       universe=self.butler.registry.dimensions)
+        self.butler.registry.registerDatasetType(self.datasetType)
+
+    def tearDown(self):
+        bucket = boto3.resource("s3").Bucket(self.bucketName)
+        bucket.objects.all().delete()
+        bucket.delete()
+        if self.usingDummyCredentials:
+            unsetAwsEnvCredentials()
+        if os.path.exists(self.root):
+            shutil.rmtree(self.root, ignore_errors=True)
+
+    def testRangeReads(self):
+        columns1 = pd.Index(["a", "b", "c"])
+        df1 = pd.DataFrame(np.random.randn(1000, 3), index=np.arange(1000, dtype=int), columns=columns1)
+        self.butler.put(df1, self.datasetType, dataId={})
+        client = self.butler.datastore.client
+
+        # Columns and components are read with range requests.
+        with unittest.mock.patch.object(client, "get_object", wraps=client.get_object) as get:
+            df2 = self.butler.get(self.datasetType, dataId={}, parameters={"columns": ["a", "c"]})
+            self.assertTrue(df1.loc[:, ["a", "c"]].equals(df2))
+            self.assertGreater(get.call_count, 0)
+            for call in get.call_args_list:
+                self.assertIn("Range", call[1])
+            get.reset_mock()
+            columns2 = self.butler.get(f"{self.datasetType.name}.columns", dataId={})
+            self.assertTrue(df1.columns.equals(columns2))
+            self.assertGreater(get.call_count, 0)
+            for call in get.call_args_list:
+                self.assertIn("Range", call[1])
+
+            # The whole dataset is read with a single request.
+            get.reset_mock()
+            df3 = self.butler.get(self.datasetType, dataId={})
+            self.assertTrue(df1.equals(df3))
+            self.assertEqual(get.call_count, 1)
+            self.assertNotIn("Range", get.call_args[1])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -33,7 +33,7 @@ except ImportError:
         """
         return cls
 
-from lsst.daf.butler.core.s3utils import (bucketExists, s3CheckFileExists,
+from lsst.daf.butler.core.s3utils import (bucketExists, s3CheckFileExists, S3RangeFile,
                                           setAwsEnvCredentials, unsetAwsEnvCredentials)
 from lsst.daf.butler.core.location import Location, ButlerURI
 
@@ -104,6 +104,30 @@ class S3UtilsTestCase(unittest.TestCase):
         self.assertTrue(s3CheckFileExists(uri, client=s3))
         self.assertTrue(s3CheckFileExists(uri))
 
+    def testRangeFile(self):
+        s3 = boto3.client("s3")
+        with S3RangeFile(s3, self.bucketName, self.fileName) as fd:
+            self.assertEqual(fd.size, len(b"test content"))
+            fd.seek(5)
+            self.assertEqual(fd.read(3), b"con")
+            self.assertEqual(fd.tell(), 8)
+            fd.seek(-4, 2)
+            self.assertEqual(fd.read(10), b"tent")
+            self.assertEqual(fd.read(), b"")
+            fd.seek(0)
+            self.assertEqual(fd.read(), b"test content")
+
+        # A size that does not match the object is an integrity failure.
+        with S3RangeFile(s3, self.bucketName, self.fileName, size=4) as fd:
+            with self.assertRaises(RuntimeError):
+                fd.read(2)
+
+        with self.assertRaises(FileNotFoundError):
+            S3RangeFile(s3, self.bucketName, self.fileName + "_NO_EXIST")
+        with S3RangeFile(s3, self.bucketName, self.fileName + "_NO_EXIST", size=10) as fd:
+            with self.assertRaises(FileNotFoundError):
+                fd.read(2)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -25,9 +25,11 @@ import shutil
 import os
 import io
 
+from lsst.daf.butler import Butler
 from lsst.daf.butler.script.makeButlerRepo import makeButlerRepo
 from lsst.daf.butler.script.validateButlerConfiguration import validateButlerConfiguration
 from lsst.daf.butler.script.dumpButlerConfig import dumpButlerConfig
+from lsst.daf.butler.script.verifyDatastore import verifyDatastore
 
 TESTDIR = os.path.abspath(os.path.dirname(__file__))
 
@@ -53,6 +55,18 @@ class ScriptsTestCase(unittest.TestCase):
         v = validateButlerConfiguration(self.root)
         self.assertTrue(v)
 
+        # The datastore only creates its records table when first used by a
+        # writeable butler.
+        Butler(config=self.root, writeable=True)
+        with io.StringIO() as fh:
+            self.assertTrue(verifyDatastore(self.root, checksum=True, outfh=fh))
+            # Add a file the datastore does not know about.
+            os.makedirs(os.path.join(self.root, "extra"))
+            with open(os.path.join(self.root, "extra", "orphan.txt"), "w") as orphan:
+                orphan.write("orphan")
+            self.assertFalse(verifyDatastore(self.root, outfh=fh))
+            self.assertIn(f"ORPHANED {os.path.join('extra', 'orphan.txt')}", fh.getvalue())
+
 
 if __name__ == "__main__":
     unittest.main()
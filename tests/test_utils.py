@@ -22,7 +22,7 @@
 import unittest
 from collections import namedtuple
 
-from lsst.daf.butler.core.utils import iterable, getFullTypeName, Singleton, NamedKeyDict
+from lsst.daf.butler.core.utils import iterable, getFullTypeName, Singleton, NamedKeyDict, chunkIterable
 from lsst.daf.butler.core.formatter import Formatter
 from lsst.daf.butler import StorageClass
 
@@ -42,6 +42,16 @@ class IterableTestCase(unittest.TestCase):
         self.assertEqual(list(iterable(["hello", "world"])), ["hello", "world"])
 
 
+class ChunkIterableTestCase(unittest.TestCase):
+    """Tests for `chunkIterable` helper.
+    """
+
+    def testChunks(self):
+        self.assertEqual(list(chunkIterable(range(7), 3)), [[0, 1, 2], [3, 4, 5], [6]])
+        self.assertEqual(list(chunkIterable(iter(range(4)), 2)), [[0, 1], [2, 3]])
+        self.assertEqual(list(chunkIterable([], 2)), [])
+
+
 class SingletonTestCase(unittest.TestCase):
     """Tests of the Singleton metaclass"""
 